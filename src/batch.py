@@ -0,0 +1,166 @@
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Deque, Iterable, Iterator, List, Optional
+
+from src.diagnostics import ERROR, Diagnostic, DiagnosticCollector
+from src.lexer import BarrelmanLexer
+
+# Files tokenized per task submitted to the pool
+DEFAULT_FILES_PER_TASK = 8
+
+EXECUTORS = ("process", "thread")
+
+
+@dataclass
+class FileResult:
+    """The tokens and diagnostics of one file passed to `tokenize_files`.
+
+    ``lines`` is the number of lines of the document, blank lines within
+    it included. ``error`` holds the message of the exception raised while
+    reading the file, in which case there are no lines, tokens or
+    diagnostics.
+    """
+
+    path: str
+    tokens: list = field(default_factory=list)
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+    error: Optional[str] = None
+    lines: int = 0
+
+    @property
+    def failed(self) -> bool:
+        """Whether the file could not be read or reported an error."""
+        return self.error is not None or any(
+            diagnostic.severity == ERROR for diagnostic in self.diagnostics
+        )
+
+
+def tokenize_file(
+    path: str,
+    max_errors: Optional[int] = None,
+    stop_on_first_error: bool = False,
+    cache=None,
+    spans: bool = False,
+) -> FileResult:
+    """Reads and tokenizes one file, capturing read errors in the result."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return FileResult(path, error=str(e))
+    lexer = BarrelmanLexer(
+        content,
+        DiagnosticCollector(
+            max_errors=max_errors, stop_on_first_error=stop_on_first_error
+        ),
+    )
+    tokens = lexer.tokenize(spans=spans, cache=cache)
+    return FileResult(
+        path, tokens, lexer.diagnostics.diagnostics, lines=len(lexer.source)
+    )
+
+
+def _tokenize_batch(
+    paths: List[str],
+    max_errors: Optional[int],
+    stop_on_first_error: bool,
+    cache,
+    spans: bool,
+) -> List[FileResult]:
+    return [
+        tokenize_file(path, max_errors, stop_on_first_error, cache, spans)
+        for path in paths
+    ]
+
+
+def tokenize_files(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    executor: str = "process",
+    max_errors: Optional[int] = None,
+    stop_on_first_error: bool = False,
+    cache=None,
+    files_per_task: int = DEFAULT_FILES_PER_TASK,
+    spans: bool = False,
+) -> Iterator[FileResult]:
+    """Tokenizes many files in a worker pool, yielding results in path order.
+
+    Every file gets its own `DiagnosticCollector`, configured with
+    ``max_errors`` and ``stop_on_first_error``, and a file that cannot be
+    read yields a `FileResult` with ``error`` set instead of stopping the
+    run. Passing a `TokenCache` as ``cache`` reuses the tokens of
+    unchanged files. With ``spans=True`` the tokens are `SpanToken`
+    objects, as from ``BarrelmanLexer.tokenize(spans=True)``.
+
+    With ``workers`` greater than one, files are tokenized in a pool of
+    that many processes, or threads with ``executor="thread"``, in tasks
+    of ``files_per_task`` files. Results are yielded as soon as every
+    earlier file is done, and at most two tasks per worker are in flight,
+    so neither ``paths`` nor the results are ever held in full.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(
+            f"Unknown executor {executor!r}; expected one of {', '.join(EXECUTORS)}"
+        )
+    if workers is None or workers <= 1:
+        for path in paths:
+            yield tokenize_file(path, max_errors, stop_on_first_error, cache, spans)
+        return
+
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        yield from _iter_pool_results(
+            pool,
+            paths,
+            workers,
+            files_per_task,
+            max_errors,
+            stop_on_first_error,
+            cache,
+            spans,
+        )
+
+
+def _iter_pool_results(
+    pool: Executor,
+    paths: Iterable[str],
+    workers: int,
+    files_per_task: int,
+    max_errors: Optional[int],
+    stop_on_first_error: bool,
+    cache,
+    spans: bool,
+) -> Iterator[FileResult]:
+    pending: Deque[Future] = deque()
+    paths = iter(paths)
+    try:
+        while True:
+            batch = list(islice(paths, files_per_task))
+            if batch:
+                pending.append(
+                    pool.submit(
+                        _tokenize_batch,
+                        batch,
+                        max_errors,
+                        stop_on_first_error,
+                        cache,
+                        spans,
+                    )
+                )
+            if not pending:
+                break
+            if batch and len(pending) < 2 * workers:
+                continue
+            yield from pending.popleft().result()
+    finally:
+        # The caller stopped early; drop the work nobody will read
+        for future in pending:
+            future.cancel()
+
+
+def default_workers() -> int:
+    """Returns the number of workers to use when none is configured."""
+    return os.cpu_count() or 1
@@ -0,0 +1,289 @@
+"""Binary serialization of Barrelman tokens (``.bmanc`` files).
+
+Layout, all integers little-endian:
+
+- header: magic ``BMNC``, format version, flags, record count, string
+  count and string blob size
+- string offsets: ``string count + 1`` uint64 byte offsets into the blob
+- string blob: UTF-8 strings, each followed by a NUL byte
+- records: one fixed-width record per token (indent level, flags and
+  the string ids of the line, declaration, relation, modifier, trigger
+  and outcome; -1 is None and -2 an outcome still to be inferred)
+- tree, when the header flag is set: the parent, depth and subtree size
+  columns of a `BarrelmanDocument`
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate, chain, count
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List
+
+from src.lexer import INFER_OUTCOME, BarrelmanToken
+from src.tree import BarrelmanDocument, build_tree
+
+MAGIC = b"BMNC"
+FORMAT_VERSION = 1
+
+FLAG_TREE = 1
+RECORD_NESTING_PORT = 1
+
+_HEADER = struct.Struct("<4sHHIIQ")
+_RECORD = struct.Struct("<IIiiiiii")
+_NONE = -1
+_INFER = -2
+
+
+_LINE = attrgetter("line")
+_INDENT = attrgetter("indent_level")
+_IS_PORT = attrgetter("is_nesting_port")
+_OUTCOME_SLOT = attrgetter("_zone_4_outcome")
+_ZONE_GETTERS = [
+    attrgetter(name)
+    for name in (
+        "zone_1_declaration",
+        "zone_1_relation",
+        "zone_2_modifier",
+        "zone_3_trigger",
+    )
+]
+
+
+def _outcome_of(token):
+    """Returns a token's stored outcome, keeping an uninferred one lazy."""
+    try:
+        return token._zone_4_outcome
+    except AttributeError:
+        return token.zone_4_outcome
+
+
+def _little_endian(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(typecode: str, data) -> array:
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def encode_tokens(tokens: Iterable) -> bytes:
+    """Returns the ``.bmanc`` encoding of tokens.
+
+    ``tokens`` may be any iterable of tokens. Passing a
+    `BarrelmanDocument` also stores its tree, so `load_document` does not
+    have to rebuild it. Equal strings are stored once.
+    """
+    document = tokens if isinstance(tokens, BarrelmanDocument) else None
+    if document is not None:
+        tokens = document.tokens
+    if not isinstance(tokens, (list, tuple)):
+        tokens = list(tokens)
+
+    # Every column is gathered and deduplicated by C-level map and dict
+    # calls. Lines are nearly always unique, so they take the first string
+    # ids without a lookup; the other zones share the remaining ids.
+    lines = list(map(_LINE, tokens))
+    try:
+        outcomes = list(map(_OUTCOME_SLOT, tokens))
+    except AttributeError:
+        outcomes = [_outcome_of(token) for token in tokens]
+    zones = [list(map(getter, tokens)) for getter in _ZONE_GETTERS]
+    zones.append(outcomes)
+    unique = dict.fromkeys(chain.from_iterable(zones))
+    unique.pop(None, None)
+    unique.pop(INFER_OUTCOME, None)
+    strings = lines + list(unique)
+    string_ids = dict(zip(unique, count(len(lines))))
+    string_ids[None] = _NONE
+    string_ids[INFER_OUTCOME] = _INFER
+    lookup = string_ids.__getitem__
+
+    width = _RECORD.size // 4
+    records = array("i", bytes(_RECORD.size * len(tokens)))
+    records[0::width] = array("i", map(_INDENT, tokens))
+    records[1::width] = array("i", map(_IS_PORT, tokens))
+    records[2::width] = array("i", range(len(tokens)))
+    for column, values in enumerate(zones, start=3):
+        records[column::width] = array("i", map(lookup, values))
+
+    encoded = [text.encode("utf-8", "surrogatepass") for text in strings]
+    offsets = array("Q", accumulate(map((1).__add__, map(len, encoded)), initial=0))
+    position = offsets[-1]
+
+    flags = FLAG_TREE if document is not None else 0
+    parts = [
+        _HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(tokens), len(strings), position),
+        _little_endian(offsets),
+        b"\0".join(encoded) + b"\0" if encoded else b"",
+        _little_endian(records),
+    ]
+    if document is not None:
+        parts.append(_little_endian(document.parents))
+        parts.append(_little_endian(document.depths))
+        parts.append(_little_endian(document.subtree_sizes))
+    return b"".join(parts)
+
+
+def dump_tokens(tokens: Iterable, path: str):
+    """Writes tokens to a ``.bmanc`` file; see `encode_tokens`."""
+    with open(path, "wb") as f:
+        f.write(encode_tokens(tokens))
+
+
+class TokenBlock:
+    """Tokens encoded in the ``.bmanc`` layout, decoded on access.
+
+    ``buffer`` may be any object supporting the buffer protocol, such as
+    bytes, a memory map or shared memory. Creating a block only reads the
+    header and the string offsets. Indexing decodes a single record into
+    a `BarrelmanToken`, and each string is decoded the first time a
+    record refers to it, so reading a few tokens from a large block costs
+    little more than those tokens. Use `tokens` to decode every record at
+    once.
+    """
+
+    def __init__(self, buffer, name: str = "buffer"):
+        """Reads the header; raises ValueError if ``buffer`` is not a .bmanc block."""
+        if len(buffer) < _HEADER.size:
+            raise ValueError(f"{name} is not a .bmanc file")
+        magic, version, flags, records, strings, blob_size = _HEADER.unpack_from(
+            buffer
+        )
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{name} is not a version {FORMAT_VERSION} .bmanc file")
+        self._buffer = buffer
+        self.flags = flags
+        self._count = records
+        offsets_start = _HEADER.size
+        self._blob_start = offsets_start + 8 * (strings + 1)
+        self._offsets = _read_column(
+            "Q", self._buffer[offsets_start : self._blob_start]
+        )
+        self._records_start = self._blob_start + blob_size
+        self._tree_start = self._records_start + _RECORD.size * records
+        self._strings: Dict[int, object] = {_NONE: None, _INFER: INFER_OUTCOME}
+
+    def _string(self, ident: int):
+        text = self._strings.get(ident)
+        if text is None and ident != _NONE:
+            start = self._blob_start + self._offsets[ident]
+            end = self._blob_start + self._offsets[ident + 1] - 1
+            text = self._strings[ident] = str(
+                self._buffer[start:end], "utf-8", "surrogatepass"
+            )
+        return text
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> BarrelmanToken:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("token index out of range")
+        indent, flags, *ids = _RECORD.unpack_from(
+            self._buffer, self._records_start + index * _RECORD.size
+        )
+        string = self._string
+        return BarrelmanToken(
+            *[string(ident) for ident in ids],
+            indent_level=indent,
+            is_nesting_port=bool(flags & RECORD_NESTING_PORT),
+        )
+
+    def __iter__(self) -> Iterator[BarrelmanToken]:
+        for index in range(self._count):
+            yield self[index]
+
+    def tokens(self) -> List[BarrelmanToken]:
+        """Decodes every record, with one pass over the string table."""
+        blob = self._buffer[self._blob_start : self._records_start]
+        strings = str(blob, "utf-8", "surrogatepass").split("\0")
+        del blob
+        if len(strings) != len(self._offsets):
+            # A string contains NUL itself; fall back to the offsets
+            strings = [self._string(ident) for ident in range(len(self._offsets) - 1)]
+            strings.append(None)
+        # The empty string after the last NUL becomes the slot for -2, and
+        # -1 reads the None appended after it
+        strings[-1] = INFER_OUTCOME
+        strings.append(None)
+        records = _read_column("i", self._buffer[self._records_start : self._tree_start])
+        width = _RECORD.size // 4
+        string = strings.__getitem__
+        return list(
+            map(
+                BarrelmanToken,
+                map(string, records[2::width]),
+                map(string, records[3::width]),
+                map(string, records[4::width]),
+                map(string, records[5::width]),
+                map(string, records[6::width]),
+                map(string, records[7::width]),
+                records[0::width],
+                map(bool, records[1::width]),
+            )
+        )
+
+    def document(self) -> BarrelmanDocument:
+        """Returns the tokens as a `BarrelmanDocument`, using the stored tree if any."""
+        tokens = self.tokens()
+        if not self.flags & FLAG_TREE:
+            return build_tree(tokens)
+        document = BarrelmanDocument(tokens)
+        count = self._count
+        start = self._tree_start
+        for name, typecode in (("parents", "q"), ("depths", "I"), ("subtree_sizes", "Q")):
+            size = array(typecode).itemsize * count
+            setattr(document, name, _read_column(typecode, self._buffer[start : start + size]))
+            start += size
+        return document
+
+
+class TokenFile(TokenBlock):
+    """A memory-mapped ``.bmanc`` file; see `TokenBlock`."""
+
+    def __init__(self, path: str):
+        """Opens and maps the file at ``path``; raises ValueError if it is not a .bmanc file."""
+        self._file = open(path, "rb")
+        if os.fstat(self._file.fileno()).st_size < _HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a .bmanc file")
+        self._mapping = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            super().__init__(self._mapping, path)
+        except ValueError:
+            self.close()
+            raise
+
+    def close(self):
+        """Unmaps the buffer and closes the underlying file."""
+        self._mapping.close()
+        self._file.close()
+
+    def __enter__(self) -> "TokenFile":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def load_tokens(path: str) -> List[BarrelmanToken]:
+    """Reads every token from a ``.bmanc`` file written by `dump_tokens`."""
+    with TokenFile(path) as token_file:
+        return token_file.tokens()
+
+
+def load_document(path: str) -> BarrelmanDocument:
+    """Reads a ``.bmanc`` file as a `BarrelmanDocument`."""
+    with TokenFile(path) as token_file:
+        return token_file.document()
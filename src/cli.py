@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import argparse
 import asyncio
 import atexit
 import json
@@ -32,6 +33,11 @@ try:
     from src.exporters.markdown_exporter import export_markdown
     from src.lexer import BarrelmanLexer
     from src.preview_server import run_preview_server
+    from src.stats import corpus_stats, parse_stats_args
+    from src.subtrees import find_duplicates, render_duplicates
+    from src.token_cache import TokenCache
+    from src.token_index import ZONES, TokenIndex
+    from src.tree import build_tree
 except ImportError:
     # Adjust imports if running from a different directory
     sys.path.append(os.path.dirname(
@@ -41,6 +47,11 @@ except ImportError:
     from src.exporters.markdown_exporter import export_markdown
     from src.lexer import BarrelmanLexer
     from src.preview_server import run_preview_server
+    from src.stats import corpus_stats, parse_stats_args
+    from src.subtrees import find_duplicates, render_duplicates
+    from src.token_cache import TokenCache
+    from src.token_index import ZONES, TokenIndex
+    from src.tree import build_tree
 
 console = Console()
 
@@ -139,6 +150,11 @@ menu_options = [
             "name": "Start BARRELMAN Preview Server",
             "action": "start_preview_server",
         },
+        {
+            "key": "8",
+            "name": "Search BARRELMAN File",
+            "action": "search_barrelman_file",
+        },
     ],
 ]
 
@@ -668,9 +684,16 @@ def _lexer_processing(content, file_path, preferences, view_recent_files):
     view_recent_files()
 
 
+def _print_diagnostics(lexer):
+    """Prints the errors the lexer recorded while tokenizing."""
+    for diagnostic in lexer.diagnostics:
+        console.print(str(diagnostic), style="bold red", markup=False)
+
+
 def _tokenize_export(lexer, preferences):
     # Now we need to tokenize for export
-    tokens = lexer.tokenize()
+    tokens = lexer.tokenize(cache=TokenCache())
+    _print_diagnostics(lexer)
 
     # Get export preferences
     export_defaults = preferences.get("export_defaults", {})
@@ -1087,6 +1110,7 @@ def execute_action(action):
         "process_barrelman_file": process_barrelman_file,
         "start_preview_server": start_preview_server,
         "run_cli_with_args": run_cli_with_args,
+        "search_barrelman_file": search_barrelman_file,
     }
     func = action_map.get(action)
     if func:
@@ -1138,6 +1162,48 @@ def search_menu():
     Prompt.ask("Press Enter to return to the main menu")
 
 
+def search_barrelman_file():
+    """Search the zones of a BARRELMAN file through a token index."""
+    file_path = select_barrelman_file()
+    if not file_path:
+        Prompt.ask("Press Enter to return to the main menu")
+        return
+
+    with open(file_path, "r") as f:
+        content = f.read()
+    lexer = BarrelmanLexer(content)
+    tokens = lexer.tokenize(cache=TokenCache())
+    _print_diagnostics(lexer)
+    index = TokenIndex.from_tokens(tokens)
+
+    zone = Prompt.ask("Search which zone?", choices=list(ZONES), default="keyword")
+    mode = Prompt.ask(
+        "Match a whole word, a prefix or the exact value?",
+        choices=["word", "prefix", "exact"],
+        default="word",
+    )
+    query = Prompt.ask("Enter search term")
+    lookups = {"word": index.search, "prefix": index.prefix, "exact": index.lookup}
+    ids = lookups[mode](zone, query)
+
+    if not ids:
+        console.print("[bold yellow]No matching lines found.[/bold yellow]")
+    else:
+        table = Table(title=f"{zone.capitalize()} matches", style="bold blue")
+        table.add_column("#", style="dim")
+        table.add_column(zone.capitalize(), style="cyan")
+        table.add_column("Line", style="white")
+        for token_id in ids:
+            # Text cells keep brackets such as [2] from being read as markup
+            table.add_row(
+                str(token_id),
+                Text(index.value(zone, token_id)),
+                Text(tokens[token_id].line.strip()),
+            )
+        console.print(table)
+    Prompt.ask("Press Enter to return to the main menu")
+
+
 def fuzzy_search_menu():
     query = Prompt.ask("Enter search term")
     results, scores = process.extract(query, menu_options, limit=5)
@@ -1386,7 +1452,8 @@ def process_barrelman_file():
     try:
         # Create lexer and tokenize
         lexer = BarrelmanLexer(content)
-        tokens = lexer.tokenize()
+        tokens = lexer.tokenize(cache=TokenCache())
+        _print_diagnostics(lexer)
 
         # Apply selected options
         if highlight:
@@ -1550,7 +1617,8 @@ def run_cli_with_args():
             content = f.read()
 
         lexer = BarrelmanLexer(content)
-        tokens = lexer.tokenize()
+        tokens = lexer.tokenize(cache=TokenCache())
+        _print_diagnostics(lexer)
 
         for option in options:
             if option == "--highlight":
@@ -1588,6 +1656,96 @@ def run_cli_with_args():
     Prompt.ask("Press Enter to return to the main menu")
 
 
+def run_dupes(argv):
+    """Runs ``barrelman dupes``: reports the repeated subtrees of a file."""
+    parser = argparse.ArgumentParser(
+        prog="barrelman dupes",
+        description="Report subtrees that occur more than once in a BARRELMAN file",
+    )
+    parser.add_argument("file", help="Input .bman file")
+    parser.add_argument(
+        "--min-size", type=int, default=2, help="Smallest subtree to report, in tokens"
+    )
+    parser.add_argument(
+        "--top", type=int, default=20, help="Groups to list, 0 for all (default: 20)"
+    )
+    args = parser.parse_args(argv)
+
+    with BarrelmanLexer.from_path(args.file) as lexer:
+        document = build_tree(lexer.tokenize())
+    _print_diagnostics(lexer)
+    groups = find_duplicates(document, min_size=args.min_size)
+    console.print(render_duplicates(document, groups, args.top or None), markup=False)
+
+
+def run_stats(argv):
+    """Runs ``barrelman stats``: reports statistics of files and directories."""
+    args = parse_stats_args(argv)
+
+    stats = corpus_stats(args.paths, capacity=args.capacity, top=args.top)
+    if args.json:
+        print(json.dumps(stats.as_dict(args.top), indent=2))
+    else:
+        console.print(stats.summary(args.top), markup=False)
+
+
+# Subcommands of `run_cli`; any other first argument is the file to process
+COMMANDS = {"dupes": run_dupes, "stats": run_stats}
+
+
+def run_cli(argv=None):
+    """
+    The ``barrelman`` command.
+
+    ``barrelman FILE [--highlight] [--html [--dark-mode]] [--markdown]
+    [--dot [--dedupe]] [--preview]`` tokenizes a file and exports it,
+    like `run_cli_with_args` does interactively. A first argument naming
+    one of `COMMANDS`, such as ``barrelman dupes FILE``, runs that
+    subcommand instead.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(
+        prog="barrelman",
+        description="BARRELMAN CLI",
+        epilog=f"Subcommands: {', '.join(COMMANDS)} (barrelman COMMAND --help)",
+    )
+    parser.add_argument("file", help="Input .bman file")
+    parser.add_argument("--highlight", action="store_true", help="Syntax highlighting")
+    parser.add_argument("--html", action="store_true", help="Export as HTML")
+    parser.add_argument("--dark-mode", action="store_true", help="Dark mode HTML")
+    parser.add_argument("--markdown", action="store_true", help="Export as Markdown")
+    parser.add_argument("--dot", action="store_true", help="Export as GraphViz DOT")
+    parser.add_argument("--preview", action="store_true", help="Start preview server")
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Write repeated subtrees once in the DOT export",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.file, "r") as f:
+        content = f.read()
+
+    lexer = BarrelmanLexer(content)
+    tokens = lexer.tokenize()
+    _print_diagnostics(lexer)
+
+    if args.highlight:
+        lexer.highlight()
+    if args.html:
+        export_html(tokens, options={"dark_mode": args.dark_mode})
+    if args.markdown:
+        export_markdown(tokens)
+    if args.dot:
+        export_dot_graph(tokens, options={"dedupe": args.dedupe})
+    if args.preview:
+        run_preview_server(content)
+
+
 def main():
     """
     BARRELMAN's interactive CLI, providing a user-friendly interface for:
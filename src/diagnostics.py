@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+ERROR = "error"
+WARNING = "warning"
+
+# Codes of the diagnostics reported by the lexer
+NESTED_SPACING = "E101"
+PORT_SPACING = "E102"
+PARSE_FAILURE = "E201"
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """A problem found in a Barrelman document.
+
+    ``line`` and ``column`` are 1-based. ``str()`` renders the diagnostic
+    in the ``[Line N] ERROR: message`` form the lexer has always printed.
+    """
+
+    line: int
+    column: int
+    code: str
+    severity: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"[Line {self.line}] {self.severity.upper()}: {self.message}"
+
+
+class DiagnosticCollector:
+    """Collects the diagnostics reported while tokenizing.
+
+    Nothing is printed; callers decide how to render the collected
+    diagnostics. With ``max_errors`` set, the collector stops accepting
+    diagnostics once that many errors were recorded and `stopped` turns
+    true, which tells the lexer to stop reading further lines.
+    ``stop_on_first_error`` is shorthand for ``max_errors=1``. Warnings
+    never count towards the limit.
+    """
+
+    def __init__(
+        self, max_errors: Optional[int] = None, stop_on_first_error: bool = False
+    ):
+        """Initializes an empty collector with an optional error limit."""
+        self.max_errors = 1 if stop_on_first_error else max_errors
+        self.diagnostics: List[Diagnostic] = []
+        self.error_count = 0
+
+    @property
+    def stopped(self) -> bool:
+        """True once the error limit has been reached."""
+        return self.max_errors is not None and self.error_count >= self.max_errors
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Errors that can still be recorded, or None without a limit."""
+        if self.max_errors is None:
+            return None
+        return max(self.max_errors - self.error_count, 0)
+
+    def add(self, diagnostic: Diagnostic):
+        """Records a diagnostic, unless the error limit was already reached."""
+        if self.stopped:
+            return
+        self.diagnostics.append(diagnostic)
+        if diagnostic.severity == ERROR:
+            self.error_count += 1
+
+    def extend(self, diagnostics: Iterable[Diagnostic]):
+        """Records several diagnostics in order."""
+        for diagnostic in diagnostics:
+            self.add(diagnostic)
+
+    def clear(self):
+        """Forgets every recorded diagnostic."""
+        self.diagnostics.clear()
+        self.error_count = 0
+
+    def render(self) -> str:
+        """Returns the diagnostics as text, one per line."""
+        return "\n".join(str(diagnostic) for diagnostic in self.diagnostics)
+
+    def __iter__(self) -> Iterator[Diagnostic]:
+        return iter(self.diagnostics)
+
+    def __len__(self) -> int:
+        return len(self.diagnostics)
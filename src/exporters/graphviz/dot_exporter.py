@@ -1,55 +1,74 @@
+from src.subtrees import shared_nodes
+from src.tree import build_tree
+
+
 def export_dot_graph(tokens, filename="barrelman_tree.dot", options=None):
     """
     Export BARRELMAN tokens to Graphviz DOT format
 
     Args:
-        tokens: List of BarrelmanToken objects
+        tokens: Iterable of BarrelmanToken objects (a list, or a generator
+            such as `iter_tokens`), or a `BarrelmanDocument` from `build_tree`
         filename: Output filename
         options: Dict of optional parameters
             - show_outcome: Boolean to include outcome info (default: True)
             - node_shape: Shape for graph nodes (default: "box")
+            - dedupe: Boolean to write each repeated subtree once and
+              point every parent of it at that copy, and to link each
+              top-level node to the previous one (default: False)
     """
     if options is None:
         options = {}
 
     show_outcome = options.get("show_outcome", True)
     node_shape = options.get("node_shape", "box")
+    dedupe = options.get("dedupe", False)
 
     with open(filename, "w") as f:
         f.write(
             f"digraph BARRELMAN {{\n  node [shape={node_shape} style=filled fontname=Courier];\n"
         )
 
+        document = build_tree(tokens)
+        parents = document.parents
+
+        # Nodes of repeated subtrees, mapped to their first occurrence
+        aliases = shared_nodes(document) if dedupe else {}
+        previous_root = None
+
         # Create node structure
-        for i, token in enumerate(tokens):
-            label = token.zone_1_relation or "UNKNOWN"
+        for i, token in enumerate(document.tokens):
+            if i not in aliases:
+                label = token.zone_1_relation or "UNKNOWN"
 
-            if token.zone_2_modifier:
-                label += f"\\n% {token.zone_2_modifier}"
+                if token.zone_2_modifier:
+                    label += f"\\n% {token.zone_2_modifier}"
 
-            if token.zone_3_trigger:
-                label += f"\\n-> {token.zone_3_trigger}"
+                if token.zone_3_trigger:
+                    label += f"\\n-> {token.zone_3_trigger}"
 
-            if show_outcome and token.zone_4_outcome:
-                label += f"\\n[{token.zone_4_outcome}]"
+                if show_outcome and token.zone_4_outcome:
+                    label += f"\\n[{token.zone_4_outcome}]"
 
-            color = "lightblue" if token.is_nesting_port else "lightgrey"
-            f.write(f'  node{i} [label="{label}", fillcolor={color}];\n')
+                color = "lightblue" if token.is_nesting_port else "lightgrey"
+                f.write(f'  node{i} [label="{label}", fillcolor={color}];\n')
 
             # Create edges based on nesting level or sequential order
             if i > 0 and token.indent_level > 0:
-                # Find parent node (nearest node with indent level - 1)
-                parent_idx = i - 1
-                while (
-                    parent_idx >= 0
-                    and tokens[parent_idx].indent_level >= token.indent_level
-                ):
-                    parent_idx -= 1
-
-                if parent_idx >= 0:
-                    f.write(f"  node{parent_idx} -> node{i};\n")
+                source = parents[i] if parents[i] != -1 else None
             elif i > 0:
-                f.write(f"  node{i-1} -> node{i};\n")
+                # Shared subtrees make the previous token ambiguous, so a
+                # deduped graph chains the top-level nodes themselves
+                source = previous_root if dedupe else i - 1
+            else:
+                source = None
+            if parents[i] == -1:
+                previous_root = i
+            # Edges inside a shared subtree were written with its first occurrence
+            if source is not None and not (i in aliases and source in aliases):
+                f.write(
+                    f"  node{aliases.get(source, source)} -> node{aliases.get(i, i)};\n"
+                )
 
         f.write("}\n")
     print(f"DOT graph exported to {filename}")
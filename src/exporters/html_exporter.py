@@ -3,7 +3,8 @@ def export_html(tokens, filename="barrelman_syntax.html", options=None):
     Export BARRELMAN tokens to HTML format
 
     Args:
-        tokens: List of BarrelmanToken objects
+        tokens: Iterable of BarrelmanToken objects (a list, or a generator
+            such as `iter_tokens`)
         filename: Output filename
         options: Dict of optional parameters
             - dark_mode: Boolean to set dark mode (default: False)
@@ -3,7 +3,8 @@ def export_markdown(tokens, filename="barrelman_syntax.md", options=None):
     Export BARRELMAN tokens to Markdown format
 
     Args:
-        tokens: List of BarrelmanToken objects
+        tokens: Iterable of BarrelmanToken objects (a list, or a generator
+            such as `iter_tokens`)
         filename: Output filename
         options: Dict of optional parameters (none used for markdown currently)
     """
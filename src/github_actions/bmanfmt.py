@@ -1,39 +1,47 @@
 #!/usr/bin/env python3
 import argparse
-import re
 import sys
 
-ZONE_REGEX = re.compile(
-    r"^(\s*)(::|:\^:)?\s*(.*?)\s*//\s*(.*?)\s*(%\s+[^->\n]+)?\s*(->\s+.+)?$"
-)
+from src.diagnostics import DiagnosticCollector
+from src.lexer import BarrelmanLexer
+
+
+def token_zones(token):
+    """Returns the zones of a lexer token as the formatter's dictionary.
+
+    Args:
+        token: A `SpanToken` produced by the lexer's ``spans=True`` mode.
+
+    Returns:
+        A dictionary with the indentation, the declaration marker and the
+        text of the four zones; absent zones are empty strings.
+    """
+    return {
+        "indent": token.line[: token.indent_level],
+        "port": token.zone_1_declaration or "",
+        "zone1": token.keyword,
+        "zone2": token.function or "",
+        "zone3": token.zone_2_modifier or "",
+        "zone4": token.zone_3_trigger or "",
+    }
 
 
 def parse_line(line):
     """Parses a single line of BARRELMAN syntax.
 
-    This function takes a line of BARRELMAN syntax and parses it into its
-    constituent parts, returning a dictionary containing the extracted
-    information.
+    This function takes a line of BARRELMAN syntax and parses it with the
+    lexer into its constituent parts, returning a dictionary containing
+    the extracted information.
 
     Args:
         line: The line of BARRELMAN syntax to parse.
 
     Returns:
         A dictionary containing the parsed information, or None if the line
-        does not match the expected syntax.
+        is blank or the lexer rejects it.
     """
-    match = ZONE_REGEX.match(line)
-    if not match:
-        return None
-    indent, port, decl, rel, mod, trig = match.groups()
-    return {
-        "indent": indent or "",
-        "port": (port or "").strip(),
-        "zone1": decl.strip(),
-        "zone2": rel.strip(),
-        "zone3": (mod or "").strip()[1:].strip() if mod else "",
-        "zone4": (trig or "").strip()[2:].strip() if trig else "",
-    }
+    token = BarrelmanLexer("").tokenize_line(line, 1, spans=True)
+    return token_zones(token) if token is not None else None
 
 
 def align(tokens):
@@ -50,7 +58,7 @@ def align(tokens):
     """
     col1 = max(len(t["port"] + " " + t["zone1"]) for t in tokens)
     col2 = max(len(t["zone2"]) for t in tokens)
-    col3 = max(len(t["zone3"]) for t in tokens if t["zone3"])
+    col3 = max((len(t["zone3"]) for t in tokens if t["zone3"]), default=0)
     lines = []
     for t in tokens:
         part1 = f"{t['port']:<4} {t['zone1']}".ljust(col1 + 2)
@@ -61,11 +69,25 @@ def align(tokens):
     return lines
 
 
+def format_tokens(tokens):
+    """Formats tokens already produced by the lexer.
+
+    Args:
+        tokens: The `SpanToken` objects of a document, as returned by
+            ``BarrelmanLexer.tokenize(spans=True)``.
+
+    Returns:
+        A list of formatted lines.
+    """
+    return align([token_zones(token) for token in tokens]) if tokens else []
+
+
 def format_content(content):
     """Formats the given BARRELMAN content.
 
-    This function takes the content of a BARRELMAN file, parses each line,
-    and then aligns the parsed tokens into formatted lines.
+    This function tokenizes the content of a BARRELMAN file with the
+    lexer, and then aligns the zones of its tokens into formatted lines.
+    Blank lines are dropped.
 
     Args:
         content: The BARRELMAN content to format.
@@ -74,20 +96,13 @@ def format_content(content):
         A list of formatted lines.
 
     Raises:
-        ValueError: If the content contains invalid BARRELMAN syntax.
+        ValueError: If the lexer reports an error in the content.
     """
-    lines = content.strip().splitlines()
-    tokens = []
-    raw_lines = []
-    for line in lines:
-        if not line.strip():
-            raw_lines.append("")
-            continue
-        parsed = parse_line(line)
-        if not parsed:
-            raise ValueError(f"Invalid BARRELMAN syntax: {line}")
-        tokens.append(parsed)
-    return align(tokens)
+    lexer = BarrelmanLexer(content, DiagnosticCollector(stop_on_first_error=True))
+    tokens = lexer.tokenize(spans=True)
+    if lexer.diagnostics.error_count:
+        raise ValueError(f"Invalid BARRELMAN syntax: {lexer.diagnostics.diagnostics[0]}")
+    return format_tokens(tokens)
 
 
 def main():
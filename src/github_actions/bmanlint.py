@@ -2,54 +2,93 @@
 import argparse
 import sys
 
-from bmanfmt import format_content
+from src.batch import default_workers, tokenize_file, tokenize_files
+from src.diagnostics import ERROR
+from src.github_actions.bmanfmt import format_tokens
+from src.token_cache import TokenCache
 
 
-def lint_file(path):
-    """Lints a single BARRELMAN file.
+def lint_result(result):
+    """Reports whether a tokenized BARRELMAN file is valid and formatted.
 
-    This function reads the content of the file, formats it using bmanfmt,
-    and checks if the original content matches the formatted content.
-    If they don't match, a style error is reported.
+    The file was read and tokenized once, in spans mode, by
+    `tokenize_files`. A read error or a lexer error is reported as a
+    syntax error. Otherwise the zones of its tokens are aligned by
+    bmanfmt, and a style error is reported unless every line of the file
+    is already the formatted line; blank lines inside the document are
+    style errors too, since the formatter drops them.
 
     Args:
-        path: The path to the BARRELMAN file.
+        result: The `FileResult` of the file, tokenized with ``spans=True``.
 
     Returns:
         0 if the file is properly formatted, 1 otherwise.
     """
-    with open(path) as f:
-        content = f.read()
-    try:
-        formatted = "\n".join(format_content(content)) + "\n"
-    except ValueError as e:
-        print(f"[SYNTAX ERROR] {path}: {e}")
+    if result.error is not None:
+        print(f"[SYNTAX ERROR] {result.path}: {result.error}")
+        return 1
+    errors = [d for d in result.diagnostics if d.severity == ERROR]
+    if errors:
+        print(f"[SYNTAX ERROR] {result.path}: Invalid BARRELMAN syntax: {errors[0]}")
         return 1
 
-    if content.strip() != formatted.strip():
-        print(f"[STYLE ERROR] {path} is not properly formatted.")
+    formatted = format_tokens(result.tokens)
+    if len(result.tokens) != result.lines or any(
+        token.line != line for token, line in zip(result.tokens, formatted)
+    ):
+        print(f"[STYLE ERROR] {result.path} is not properly formatted.")
         return 1
-    print(f"[OK] {path}")
+    print(f"[OK] {result.path}")
     return 0
 
 
+def lint_file(path, cache=None):
+    """Lints a single BARRELMAN file; see `lint_result`.
+
+    Args:
+        path: The path to the BARRELMAN file.
+        cache: An optional `TokenCache` reusing the tokens of unchanged files.
+
+    Returns:
+        0 if the file is properly formatted, 1 otherwise.
+    """
+    return lint_result(
+        tokenize_file(path, stop_on_first_error=True, cache=cache, spans=True)
+    )
+
+
 def main():
     """Main function for the BARRELMAN linter.
 
     This function parses command-line arguments for files to lint,
     then lints each file and exits with a non-zero status code if
-    any errors are found.
+    any errors are found. Files are tokenized in parallel, one worker
+    per CPU by default, and unchanged files reuse their cached tokens.
     """
     parser = argparse.ArgumentParser()
     parser.add_argument("files", nargs="+", help=".bman files to check")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Tokenize with N worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Do not reuse cached tokens"
+    )
     args = parser.parse_args()
 
-    errors = sum(lint_file(file) for file in args.files)
+    results = tokenize_files(
+        args.files,
+        workers=args.workers or default_workers(),
+        stop_on_first_error=True,
+        cache=None if args.no_cache else TokenCache(),
+        spans=True,
+    )
+    errors = sum(lint_result(result) for result in results)
     if errors:
         sys.exit(1)
 
 
 if __name__ == "__main__":
     main()
-if __name__ == "__main__":
-    main()
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 import os
 
-from src.lexer import BarrelmanLexer
+from src.batch import default_workers, tokenize_files
+from src.token_cache import TokenCache
 
 TESTS_DIR = "./testcases"
 
@@ -11,32 +12,38 @@ def run_tests():
 
     This function iterates through the test files in the testcases directory,
     tokenizes each file using the BarrelmanLexer, and checks if the expected
-    outcome (pass or fail) matches the actual outcome. The results are
-    summarized at the end.
+    outcome (pass or fail) matches the actual outcome. A file fails when
+    it cannot be read or tokenizing it reports an error. Files are
+    tokenized in parallel, one worker per CPU, and unchanged files reuse
+    their cached tokens. The results are summarized at the end.
     """
     results = {"pass": 0, "fail": 0}
-    for file in os.listdir(TESTS_DIR):
-        if not file.endswith(".bman"):
-            continue
-        path = os.path.join(TESTS_DIR, file)
-        with open(path) as f:
-            content = f.read()
-        try:
-            lexer = BarrelmanLexer(content)
-            lexer.tokenize()
-            if file.startswith("fail_"):
-                print(f"[FAIL] {file} - should have errored")
-                results["fail"] += 1
-            else:
-                print(f"[PASS] {file}")
-                results["pass"] += 1
-        except Exception as e:
+    paths = [
+        os.path.join(TESTS_DIR, file)
+        for file in sorted(os.listdir(TESTS_DIR))
+        if file.endswith(".bman")
+    ]
+    for result in tokenize_files(
+        paths,
+        workers=default_workers(),
+        stop_on_first_error=True,
+        cache=TokenCache(),
+    ):
+        file = os.path.basename(result.path)
+        if result.failed:
             if file.startswith("fail_"):
                 print(f"[PASS] {file} (expected failure)")
                 results["pass"] += 1
             else:
-                print(f"[FAIL] {file} - {e}")
+                error = result.error or "\n".join(map(str, result.diagnostics))
+                print(f"[FAIL] {file} - {error}")
                 results["fail"] += 1
+        elif file.startswith("fail_"):
+            print(f"[FAIL] {file} - should have errored")
+            results["fail"] += 1
+        else:
+            print(f"[PASS] {file}")
+            results["pass"] += 1
     print(f"Passed: {results['pass']} | Failed: {results['fail']}")
     exit(results["fail"])
 
@@ -0,0 +1,208 @@
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Tuple
+
+from src.diagnostics import Diagnostic
+from src.lexer import BarrelmanLexer, BarrelmanToken
+
+
+class _LineEntry:
+    """One source line with its token, diagnostics and a link to its parent line."""
+
+    __slots__ = ("text", "token", "diagnostics", "parent")
+
+    def __init__(
+        self,
+        text: str,
+        token: Optional[BarrelmanToken],
+        diagnostics: Tuple[Diagnostic, ...] = (),
+    ):
+        self.text = text
+        self.token = token
+        self.diagnostics = diagnostics
+        self.parent: Optional["_LineEntry"] = None
+
+
+@dataclass
+class EditResult:
+    """Describes the effect of one `IncrementalLexer.edit` call.
+
+    Indices are line indices into `IncrementalLexer.line_tokens` after the
+    edit. ``changed`` covers the lines that were re-lexed, and
+    ``reparented`` lists the lines after the edit whose parent changed.
+    """
+
+    changed: range
+    reparented: List[int] = field(default_factory=list)
+
+
+class IncrementalLexer:
+    """Keeps per-line tokens of a document up to date as it is edited.
+
+    Each line holds its own token (None for blank or invalid lines) and a
+    link to its parent, the nearest previous token with a smaller indent
+    level. An edit re-lexes only the replaced lines and then re-links the
+    lines that follow until the first one whose parent cannot have
+    changed, so the work done depends on the edit and the block it sits
+    in rather than on the size of the document.
+
+    `line_tokens` and `parent_of` describe the lines exactly as they are.
+    `tokens` and `diagnostics` describe the document as
+    `BarrelmanLexer.tokenize` sees it, which strips the whole source:
+    blank lines at either end are dropped, and so is the whitespace
+    before the first line and after the last.
+    """
+
+    def __init__(self, source: str):
+        """Tokenizes ``source`` line by line and links every line to its parent."""
+        self._lexer = BarrelmanLexer("")
+        self._entries: List[_LineEntry] = [
+            self._lex(text, index)
+            for index, text in enumerate(source.strip().splitlines())
+        ]
+        self._relink(0, [])
+
+    def _lex(self, text: str, index: int) -> _LineEntry:
+        collector = self._lexer.diagnostics
+        collector.clear()
+        token = self._lexer.tokenize_line(text, index + 1)
+        return _LineEntry(text, token, tuple(collector))
+
+    @property
+    def lines(self) -> List[str]:
+        """The current source lines."""
+        return [entry.text for entry in self._entries]
+
+    @property
+    def line_tokens(self) -> List[Optional[BarrelmanToken]]:
+        """The token of every line, None for lines that produce no token."""
+        return [entry.token for entry in self._entries]
+
+    def _document(self) -> List[_LineEntry]:
+        """Returns the lines of the document as `BarrelmanLexer.tokenize` sees them.
+
+        Blank lines at either end are skipped, and the first and last of
+        the remaining lines are re-lexed when stripping the document
+        changes them; every other entry is reused as is.
+        """
+        entries = self._entries
+        first = 0
+        while first < len(entries) and not entries[first].text.strip():
+            first += 1
+        last = len(entries)
+        while last > first and not entries[last - 1].text.strip():
+            last -= 1
+        document = entries[first:last]
+        if document:
+            for position, strip in ((0, str.lstrip), (-1, str.rstrip)):
+                text = document[position].text
+                if strip(text) != text:
+                    document[position] = self._lex(strip(text), position)
+        return document
+
+    @property
+    def tokens(self) -> List[BarrelmanToken]:
+        """The tokens of the document, as `BarrelmanLexer.tokenize` returns them."""
+        return [entry.token for entry in self._document() if entry.token is not None]
+
+    @property
+    def diagnostics(self) -> List[Diagnostic]:
+        """The diagnostics of the document, as `BarrelmanLexer.tokenize` reports them.
+
+        Every diagnostic is numbered by its line's current position in
+        the stripped document.
+        """
+        return [
+            replace(diagnostic, line=index + 1)
+            for index, entry in enumerate(self._document())
+            for diagnostic in entry.diagnostics
+        ]
+
+    def parent_of(self, index: int) -> Optional[BarrelmanToken]:
+        """Returns the parent token of the line at ``index``, if any."""
+        parent = self._entries[index].parent
+        return parent.token if parent is not None else None
+
+    def _ancestors_before(self, index: int) -> List[_LineEntry]:
+        """Rebuilds the open ancestor stack as it stands before ``index``."""
+        for previous in range(index - 1, -1, -1):
+            entry = self._entries[previous]
+            if entry.token is not None:
+                stack = []
+                while entry is not None:
+                    stack.append(entry)
+                    entry = entry.parent
+                stack.reverse()
+                return stack
+        return []
+
+    def _relink(
+        self,
+        start: int,
+        stack: List[_LineEntry],
+        stop_from: Optional[int] = None,
+        stop_indent: int = 0,
+    ) -> List[int]:
+        """Re-links parents from ``start`` and returns the lines that changed.
+
+        From line ``stop_from`` onwards, stops at the first token whose
+        indent level is at most ``stop_indent``: neither it nor anything
+        after it can have a parent inside the edited lines.
+        """
+        reparented = []
+        entries = self._entries
+        for index in range(start, len(entries)):
+            entry = entries[index]
+            token = entry.token
+            if token is None:
+                continue
+            indent = token.indent_level
+            if stop_from is not None and index >= stop_from:
+                if indent <= stop_indent:
+                    break
+            while stack and stack[-1].token.indent_level >= indent:
+                stack.pop()
+            parent = stack[-1] if stack else None
+            if entry.parent is not parent:
+                entry.parent = parent
+                reparented.append(index)
+            stack.append(entry)
+        return reparented
+
+    def edit(self, start_line: int, end_line: int, new_text: str) -> EditResult:
+        """Replaces lines ``start_line`` to ``end_line`` (exclusive) with ``new_text``.
+
+        Line indices are zero-based. An empty ``new_text`` deletes the
+        lines, and ``start_line == end_line`` inserts before that line.
+        """
+        if not 0 <= start_line <= end_line <= len(self._entries):
+            raise IndexError(
+                f"Edit range {start_line}:{end_line} is outside the document"
+            )
+        removed = self._entries[start_line:end_line]
+        inserted = [
+            self._lex(text, start_line + offset)
+            for offset, text in enumerate(new_text.splitlines())
+        ]
+        self._entries[start_line:end_line] = inserted
+
+        # Lines indented at most as far as the shallowest edited token keep
+        # their parents, and so does everything after them.
+        indents = [
+            entry.token.indent_level
+            for entry in removed + inserted
+            if entry.token is not None
+        ]
+        changed = range(start_line, start_line + len(inserted))
+        if not indents:
+            return EditResult(changed=changed)
+
+        reparented = self._relink(
+            start_line,
+            self._ancestors_before(start_line),
+            stop_from=changed.stop,
+            stop_indent=min(indents),
+        )
+        return EditResult(
+            changed=changed,
+            reparented=[index for index in reparented if index >= changed.stop],
+        )
@@ -1,25 +1,493 @@
 import argparse
-from dataclasses import dataclass
-from typing import List, Optional
+import mmap
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from operator import attrgetter
+from time import perf_counter
+from typing import (
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from src.diagnostics import (
+    ERROR,
+    NESTED_SPACING,
+    PARSE_FAILURE,
+    PORT_SPACING,
+    Diagnostic,
+    DiagnosticCollector,
+)
+from src.profiling import CONSTRUCT, INTERN, READ, SCAN, SPACING, LexerProfile
+from src.symbols import SymbolTable
+from src.tree import build_tree
+
+# Version of the token output; bump whenever tokenization results change,
+# so that cached tokens from older lexers are not reused
+LEXER_VERSION = "2"
+
+# Lines per chunk when tokenizing with multiple worker processes
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Stands for an outcome that is inferred when first read; Ellipsis keeps
+# its identity through pickling, so tokens sent to workers stay lazy
+INFER_OUTCOME = ...
 
 
-@dataclass
 class BarrelmanToken:
     """Represents a token in the Barrelman language.
 
     A token encapsulates various components of a Barrelman statement,
     including its declaration, relation, modifier, trigger, outcome,
     indentation level, and whether it's a nesting port.
+
+    Tokens use ``__slots__`` rather than a per-instance ``__dict__`` to
+    keep large token lists compact; see `TokenTable` for a columnar
+    alternative.
+
+    The outcome zone is only needed by the syntax tree and the DOT
+    exporter, so the lexer leaves it as `INFER_OUTCOME` and it is
+    inferred from the modifier and trigger the first time it is read.
     """
 
-    line: str
-    zone_1_declaration: Optional[str]
-    zone_1_relation: Optional[str]
-    zone_2_modifier: Optional[str]
-    zone_3_trigger: Optional[str]
-    zone_4_outcome: Optional[str]
-    indent_level: int = 0
-    is_nesting_port: bool = False
+    FIELDS = (
+        "line",
+        "zone_1_declaration",
+        "zone_1_relation",
+        "zone_2_modifier",
+        "zone_3_trigger",
+        "zone_4_outcome",
+        "indent_level",
+        "is_nesting_port",
+    )
+
+    __slots__ = FIELDS[:5] + ("_zone_4_outcome",) + FIELDS[6:]
+
+    def __init__(
+        self,
+        line: str,
+        zone_1_declaration: Optional[str],
+        zone_1_relation: Optional[str],
+        zone_2_modifier: Optional[str],
+        zone_3_trigger: Optional[str],
+        zone_4_outcome: Optional[str] = INFER_OUTCOME,
+        indent_level: int = 0,
+        is_nesting_port: bool = False,
+    ):
+        self.line = line
+        self.zone_1_declaration = zone_1_declaration
+        self.zone_1_relation = zone_1_relation
+        self.zone_2_modifier = zone_2_modifier
+        self.zone_3_trigger = zone_3_trigger
+        self._zone_4_outcome = zone_4_outcome
+        self.indent_level = indent_level
+        self.is_nesting_port = is_nesting_port
+
+    @property
+    def zone_4_outcome(self) -> Optional[str]:
+        outcome = self._zone_4_outcome
+        if outcome is INFER_OUTCOME:
+            outcome = self._zone_4_outcome = infer_outcome(
+                self.zone_2_modifier, self.zone_3_trigger
+            )
+        return outcome
+
+    @zone_4_outcome.setter
+    def zone_4_outcome(self, value: Optional[str]):
+        self._zone_4_outcome = value
+
+    def _astuple(self) -> tuple:
+        return _token_fields(self)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Positional arguments pickle much faster than the default slot
+        # state; the raw slots keep an uninferred outcome lazy
+        return self.__class__, _token_state(self)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{self.__class__.__name__}({fields})"
+
+
+_token_fields = attrgetter(*BarrelmanToken.FIELDS)
+_token_state = attrgetter(*BarrelmanToken.__slots__)
+
+
+def infer_outcome(modifier: Optional[str], trigger: Optional[str]) -> Optional[str]:
+    """Infers the outcome zone of a token from its modifier and trigger."""
+    if modifier and trigger:
+        return f"Outcome inferred from % {modifier} -> {trigger}"
+    elif modifier:
+        return f"Modifier only outcome: {modifier}"
+    elif trigger:
+        return f"Trigger only outcome: {trigger}"
+    return None
+
+
+def find_markers(text: str, start: int = 0) -> Tuple[int, int, int]:
+    """Finds the relation, modifier and trigger markers of a Barrelman line.
+
+    Scans ``text`` left to right from ``start``: the first "//", then the
+    first "%" after it, then the first "->" after that. Each search
+    resumes where the previous marker was found, so no part of the line
+    is copied or searched for the same marker twice. Returns the
+    ``(relation, modifier, trigger)`` indices, -1 for absent markers.
+    """
+    relation = text.find("//", start)
+    if relation != -1:
+        start = relation + 2
+    modifier = text.find("%", start)
+    trigger = text.find("->", start if modifier == -1 else modifier + 1)
+    return relation, modifier, trigger
+
+
+def scan_zones(
+    line: str,
+) -> Tuple[Optional[str], str, Optional[str], Optional[str], int]:
+    """Splits a Barrelman line into its zones.
+
+    Returns ``(declaration, relation, modifier, trigger, indent_level)``,
+    the values `BarrelmanLexer.tokenize_line` builds a token from.
+    Spacing is not validated here.
+    """
+    stripped = line.lstrip()
+    if stripped.startswith("::"):
+        declaration = "::"
+    elif stripped.startswith(":^:"):
+        declaration = ":^:"
+    else:
+        declaration = None
+    start = len(declaration) if declaration else 0
+
+    relation_idx, modifier_idx, trigger_idx = find_markers(stripped, start)
+
+    # KEYWORD // FUNCTION % PARAMETER -> OUTCOME, each zone optional
+    if modifier_idx != -1:
+        body_end = modifier_idx
+        modifier = stripped[
+            modifier_idx + 1 : trigger_idx if trigger_idx != -1 else None
+        ].strip()
+    else:
+        body_end = trigger_idx if trigger_idx != -1 else None
+        modifier = None
+    if trigger_idx != -1:
+        trigger = stripped[trigger_idx + 2 :].strip()
+    else:
+        trigger = None
+
+    if relation_idx != -1:
+        keyword = stripped[start:relation_idx].strip()
+        function = stripped[relation_idx + 2 : body_end].strip()
+        relation = f"{keyword} // {function}" if function else keyword
+    else:
+        relation = stripped[start:body_end].strip()
+
+    return declaration, relation, modifier, trigger, len(line) - len(stripped)
+
+
+def _parse_failure(lineno: int, line: str, error: Exception) -> Diagnostic:
+    return Diagnostic(
+        lineno,
+        1,
+        PARSE_FAILURE,
+        ERROR,
+        f"Failed to parse syntax — {line} - {str(error)}",
+    )
+
+
+def _trim(line: str, start: int, end: int) -> Tuple[int, int]:
+    """Narrows ``line[start:end]`` to exclude surrounding whitespace."""
+    while start < end and line[start].isspace():
+        start += 1
+    while end > start and line[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def scan_spans(line: str) -> Tuple[int, ...]:
+    """Locates the zones of a Barrelman line without copying any text.
+
+    Uses the same marker scan as `scan_zones`, but returns indices into
+    ``line`` instead of zone strings. Returns a
+    tuple of ``(indent_level, declaration_length, keyword_start,
+    keyword_end, function_start, function_end, modifier_start,
+    modifier_end, trigger_start, trigger_end)``, where absent zones have
+    a start of -1.
+    """
+    end = len(line)
+    indent = 0
+    while indent < end and line[indent].isspace():
+        indent += 1
+
+    if line.startswith("::", indent):
+        declaration_length = 2
+    elif line.startswith(":^:", indent):
+        declaration_length = 3
+    else:
+        declaration_length = 0
+
+    start = indent + declaration_length
+    relation_idx, modifier_idx, trigger_idx = find_markers(line, start)
+    if modifier_idx != -1:
+        body_end = modifier_idx
+        trigger_end = end
+        modifier = _trim(
+            line, modifier_idx + 1, trigger_idx if trigger_idx != -1 else end
+        )
+    else:
+        body_end = trigger_idx if trigger_idx != -1 else end
+        modifier = (-1, -1)
+    trigger = _trim(line, trigger_idx + 2, end) if trigger_idx != -1 else (-1, -1)
+
+    if relation_idx != -1:
+        keyword = _trim(line, start, relation_idx)
+        function = _trim(line, relation_idx + 2, body_end)
+        # An empty function leaves the relation as the bare keyword
+        if function[0] == function[1]:
+            function = (-1, -1)
+    else:
+        keyword = _trim(line, start, body_end)
+        function = (-1, -1)
+
+    return (indent, declaration_length) + keyword + function + modifier + trigger
+
+
+class SpanToken:
+    """A token whose zones are (start, end) spans into its source line.
+
+    Produced by the lexer's ``spans=True`` mode. No zone text is copied
+    during tokenization; each zone attribute slices the line when it is
+    read. Exposes the same attributes as `BarrelmanToken`, so it can be
+    passed to the exporters as-is.
+    """
+
+    __slots__ = ("line", "spans")
+
+    def __init__(self, line: str, spans: Tuple[int, ...]):
+        self.line = line
+        self.spans = spans
+
+    def _slice(self, start: int, end: int) -> Optional[str]:
+        return None if start == -1 else self.line[start:end]
+
+    @property
+    def indent_level(self) -> int:
+        return self.spans[0]
+
+    @property
+    def is_nesting_port(self) -> bool:
+        return self.spans[1] == 3
+
+    @property
+    def zone_1_declaration(self) -> Optional[str]:
+        indent, length = self.spans[0], self.spans[1]
+        return self.line[indent : indent + length] if length else None
+
+    @property
+    def keyword(self) -> str:
+        return self.line[self.spans[2] : self.spans[3]]
+
+    @property
+    def function(self) -> Optional[str]:
+        return self._slice(self.spans[4], self.spans[5])
+
+    @property
+    def zone_1_relation(self) -> str:
+        function = self.function
+        if function is None:
+            return self.keyword
+        return f"{self.keyword} // {function}"
+
+    @property
+    def zone_2_modifier(self) -> Optional[str]:
+        return self._slice(self.spans[6], self.spans[7])
+
+    @property
+    def zone_3_trigger(self) -> Optional[str]:
+        return self._slice(self.spans[8], self.spans[9])
+
+    @property
+    def zone_4_outcome(self) -> Optional[str]:
+        return infer_outcome(self.zone_2_modifier, self.zone_3_trigger)
+
+    def __reduce__(self):
+        return self.__class__, (self.line, self.spans)
+
+    def to_token(self) -> BarrelmanToken:
+        """Materializes every zone into a regular `BarrelmanToken`."""
+        return BarrelmanToken(
+            line=self.line,
+            zone_1_declaration=self.zone_1_declaration,
+            zone_1_relation=self.zone_1_relation,
+            zone_2_modifier=self.zone_2_modifier,
+            zone_3_trigger=self.zone_3_trigger,
+            zone_4_outcome=self.zone_4_outcome,
+            indent_level=self.indent_level,
+            is_nesting_port=self.is_nesting_port,
+        )
+
+    def __repr__(self) -> str:
+        return f"SpanToken(line={self.line!r}, spans={self.spans!r})"
+
+
+# ANSI color codes used by `BarrelmanLexer.highlight`, one per zone
+_HL_RESET = "\033[0m"
+_HL_DECLARATION = "\033[95m"
+_HL_PORT = "\033[96m"
+_HL_KEYWORD = "\033[94m"
+_HL_RELATION = f"\033[93m // {_HL_RESET}"
+_HL_FUNCTION = "\033[92m"
+_HL_MODIFIER_MARK = f"\033[92m% {_HL_RESET}"
+_HL_MODIFIER = "\033[91m"
+_HL_TRIGGER_MARK = f"\033[90m -> {_HL_RESET}"
+_HL_TRIGGER = "\033[89m"
+
+# Lines gathered before each write to the output stream
+WRITE_BATCH_LINES = 4096
+
+
+def write_lines(out: TextIO, lines: Iterable[str]):
+    """Writes lines to a text stream in large batches instead of one by one."""
+    batch: List[str] = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= WRITE_BATCH_LINES:
+            batch.append("")
+            out.write("\n".join(batch))
+            batch.clear()
+    if batch:
+        batch.append("")
+        out.write("\n".join(batch))
+
+
+def iter_source_lines(fileobj: Iterable[str]) -> Iterator[str]:
+    """Lazily yields the lines of a Barrelman document from a file object.
+
+    Mirrors ``source.strip().splitlines()`` as used by `BarrelmanLexer`:
+    leading blank lines are dropped, the first line loses its leading
+    whitespace, and line endings are removed. Line numbers therefore
+    match those reported by `BarrelmanLexer.tokenize`.
+    """
+    lines = iter(fileobj)
+    for line in lines:
+        if line.strip():
+            yield line.lstrip().rstrip("\r\n")
+            break
+    for line in lines:
+        yield line.rstrip("\r\n")
+
+
+class MappedSource:
+    """Iterates over the lines of a memory-mapped Barrelman file.
+
+    Line boundaries are found directly in the mapped buffer, so the file
+    is never read into a single string. Blank lines are yielded as empty
+    strings without being decoded; only lines that can become tokens are
+    decoded. Iteration follows the same ``strip().splitlines()`` rules
+    as `BarrelmanLexer` for ``\\n`` and ``\\r\\n`` line endings.
+    """
+
+    _WHITESPACE = b" \t\r\n\x0b\x0c"
+
+    def __init__(self, path: str, encoding: str = "utf-8"):
+        """Opens and maps the file at ``path`` read-only."""
+        self.encoding = encoding
+        self._file = open(path, "rb")
+        if os.fstat(self._file.fileno()).st_size:
+            self._buffer = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        else:
+            # Empty files cannot be mapped
+            self._buffer = b""
+
+        # Bounds of the document once surrounding whitespace is stripped
+        start, end = 0, len(self._buffer)
+        while start < end and self._buffer[start] in self._WHITESPACE:
+            start += 1
+        while end > start and self._buffer[end - 1] in self._WHITESPACE:
+            end -= 1
+        self._start = start
+        self._end = end
+
+    def __iter__(self) -> Iterator[str]:
+        buffer = self._buffer
+        pos = self._start
+        end = self._end
+        while pos < end:
+            newline = buffer.find(b"\n", pos, end)
+            if newline == -1:
+                newline = end
+            stop = newline
+            if stop > pos and buffer[stop - 1] == 13:  # "\r"
+                stop -= 1
+            raw = buffer[pos:stop]
+            yield raw.decode(self.encoding) if raw.strip() else ""
+            pos = newline + 1
+
+    def close(self):
+        """Unmaps the buffer and closes the underlying file."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file.close()
+
+
+def iter_tokens(
+    fileobj: Iterable[str],
+    spans: bool = False,
+    diagnostics: Optional[DiagnosticCollector] = None,
+) -> Iterator[Union[BarrelmanToken, SpanToken]]:
+    """Streams `BarrelmanToken` objects from a file object, one line at a time.
+
+    The tokens can be passed straight to the exporters, which consume
+    any iterable of tokens. Errors are recorded in ``diagnostics`` when
+    one is given.
+    """
+    return BarrelmanLexer("", diagnostics).iter_tokens(fileobj, spans=spans)
+
+
+def _tokenize_chunk(
+    lexer_class: type,
+    lines: List[str],
+    first_lineno: int,
+    spans: bool,
+    max_errors: Optional[int],
+) -> Tuple[list, List[Tuple[int, Diagnostic]]]:
+    """Tokenizes a chunk of lines in a worker process.
+
+    Returns the tokens together with the diagnostics, each paired with
+    the number of tokens produced before it, so the parent can merge
+    them in source order and stop exactly where a serial run would.
+    """
+    lexer = lexer_class("", DiagnosticCollector(max_errors=max_errors))
+    collector = lexer.diagnostics
+    tokens = []
+    reported = []
+    for lineno, line in enumerate(lines, start=first_lineno):
+        if collector.stopped:
+            break
+        token = lexer.tokenize_line(line, lineno, spans=spans)
+        if token is not None:
+            tokens.append(token)
+        elif len(collector) > len(reported):
+            reported.append((len(tokens), collector.diagnostics[-1]))
+    return tokens, reported
 
 
 class BarrelmanLexer:
@@ -30,14 +498,57 @@ class BarrelmanLexer:
     `tokens` list.
     """
 
-    def __init__(self, source: str):
+    def __init__(
+        self,
+        source: str,
+        diagnostics: Optional[DiagnosticCollector] = None,
+        profile: Optional[LexerProfile] = None,
+    ):
         """Initializes the BarrelmanLexer.
 
         Splits the source code into lines, initializes an empty list
-        to store tokens.
+        to store tokens. Errors found while tokenizing are recorded in
+        ``diagnostics``, a new `DiagnosticCollector` by default. The zones
+        of the tokens are interned in the document's `symbols` table.
+        With a `LexerProfile` as ``profile``, the time spent in each phase
+        of tokenization is recorded in it.
         """
         self.source = source.strip().splitlines()
         self.tokens: List[BarrelmanToken] = []
+        self.diagnostics = (
+            diagnostics if diagnostics is not None else DiagnosticCollector()
+        )
+        self.symbols = SymbolTable()
+        self.profile = profile
+
+    @classmethod
+    def from_path(
+        cls, path: str, mmap: bool = True, encoding: str = "utf-8"
+    ) -> "BarrelmanLexer":
+        """Creates a lexer for the Barrelman file at ``path``.
+
+        With ``mmap=True`` the file is memory-mapped and its lines are
+        decoded lazily during tokenization, instead of holding the whole
+        file and its split lines in memory at once. Call `close` (or use
+        the lexer as a context manager) to release the mapping.
+        """
+        if not mmap:
+            with open(path, "r", encoding=encoding) as f:
+                return cls(f.read())
+        lexer = cls("")
+        lexer.source = MappedSource(path, encoding=encoding)
+        return lexer
+
+    def close(self):
+        """Releases the memory-mapped source, if any."""
+        if isinstance(self.source, MappedSource):
+            self.source.close()
+
+    def __enter__(self) -> "BarrelmanLexer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def validate_spacing(self, line: str, lineno: int) -> Optional[str]:
         """Validates spacing rules for a given line of Barrelman code.
@@ -45,10 +556,27 @@ class BarrelmanLexer:
         Checks for extra spacing on nested '::' blocks and ensures ':^:'
         is at the start of the line or has a single space before it.
         """
+        diagnostic = self.check_spacing(line, lineno)
+        return str(diagnostic) if diagnostic else None
+
+    def check_spacing(self, line: str, lineno: int) -> Optional[Diagnostic]:
+        """Returns the spacing error of a line as a `Diagnostic`, if any."""
         if line.startswith("::") and "  ::" in line:
-            return f"[Line {lineno}] ERROR: Extra spacing on nested '::' block."
+            return Diagnostic(
+                lineno,
+                line.index("  ::") + 1,
+                NESTED_SPACING,
+                ERROR,
+                "Extra spacing on nested '::' block.",
+            )
         if ":^:" in line and not line.startswith(":^:") and not line.startswith(" :^:"):
-            return f"[Line {lineno}] ERROR: ':^:' must be at the start of the line or have a single space before it."
+            return Diagnostic(
+                lineno,
+                line.index(":^:") + 1,
+                PORT_SPACING,
+                ERROR,
+                "':^:' must be at the start of the line or have a single space before it.",
+            )
         return None
 
     def get_indent_level(self, line: str) -> int:
@@ -68,257 +596,327 @@ class BarrelmanLexer:
         Constructs an outcome string based on the presence of a modifier
         and/or a trigger.
         """
-        if modifier and trigger:
-            return f"Outcome inferred from % {modifier} -> {trigger}"
-        elif modifier:
-            return f"Modifier only outcome: {modifier}"
-        elif trigger:
-            return f"Trigger only outcome: {trigger}"
-        return None
-
-    def tokenize(self):
+        return infer_outcome(modifier, trigger)
+
+    def tokenize(
+        self,
+        table: bool = False,
+        spans: bool = False,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        cache=None,
+    ):
         """Tokenizes the Barrelman source code.
 
         This method iterates through each line of the source code,
         validates spacing, extracts tokens, and appends them to the
-        `tokens` list.
-        """
-        for lineno, line in enumerate(self.source, start=1):
-            original_line = line.rstrip("\n")
-            stripped = original_line.lstrip()
-
-            if not stripped:
-                continue
-
-            spacing_error = self.validate_spacing(original_line, lineno)
-            if spacing_error:
-                print(spacing_error)
-                continue
-
-            # Custom parsing logic for BARRELMAN syntax
-            try:
-                # Calculate the indent level based on leading spaces
-                indent_level = len(original_line) - len(original_line.lstrip())
-
-                # Check for and extract the declaration part (:: or :^:)
-                # This handles both indented and non-indented declarations
-                stripped_line = original_line.lstrip()
-                is_nesting = False
-
-                if stripped_line.startswith("::"):
-                    declaration = "::"
-                elif stripped_line.startswith(":^:"):
-                    declaration = ":^:"
-                    is_nesting = True
-                else:
-                    declaration = None
-
-                # Remove declaration from the line
-                if declaration:
-                    # Extract the rest of the line without requiring a space after declaration
-                    rest = stripped_line[len(declaration):].lstrip()
-                else:
-                    rest = stripped_line
-
-                # Initialize token components
-                relation = None
-                modifier = None
-                trigger = None
+        `tokens` list. With ``table=True`` the tokens are stored in a
+        columnar `TokenTable` instead of a list of token objects, and
+        with ``spans=True`` each token is a `SpanToken`.
 
-                # CORRECTED PARSING LOGIC FOR BARRELMAN SYNTAX
+        With ``workers`` greater than one, the source is split into
+        chunks of ``chunk_size`` lines that are tokenized in a process
+        pool. Every line is parsed independently, so the merged result
+        is identical to a serial run, and errors are reported in source
+        order with their original line numbers.
 
-                # Step 1: Find relation marker //
-                relation_idx = rest.find("//")
-                if relation_idx != -1:
-                    # Everything before // is the KEYWORD
-                    keyword = rest[:relation_idx].strip()
-                    rest_after_relation = rest[relation_idx+2:].strip()
+        Passing a `TokenCache` as ``cache`` reuses the stored tokens of an
+        unchanged source instead of parsing it again.
 
-                    # Step 2: Find modifier marker %
-                    modifier_idx = rest_after_relation.find("%")
-                    if modifier_idx != -1:
-                        # Everything between // and % is the FUNCTION
-                        function = rest_after_relation[:modifier_idx].strip()
+        Errors are recorded in `diagnostics` rather than printed. Once
+        its error limit is reached, no further lines are read.
 
-                        # Store the KEYWORD as the relation for now
-                        relation = keyword
+        A lexer with a `profile` always tokenizes serially, so the phases
+        of every line are timed in this process.
+        """
+        if table:
+            from src.token_table import TokenTable
+
+            self.tokens = TokenTable.from_tokens(self.tokens)
+        if workers is not None and workers > 1 and self.profile is None:
+            tokens = self._iter_parallel_tokens(workers, chunk_size, spans)
+        else:
+            tokens = self.iter_tokens(spans=spans, intern=True)
+        if cache is not None:
+            tokens = cache.load_or_store(
+                self.source, tokens, spans=spans, diagnostics=self.diagnostics
+            )
+            if not spans:
+                # Tokens loaded from the cache were interned by another lexer
+                for token in tokens:
+                    self.symbols.intern_token(token)
+        self.tokens.extend(tokens)
+        return self.tokens
 
-                        # If there is FUNCTION content, add it to relation
-                        if function:
-                            relation = f"{keyword} // {function}"
+    def _iter_parallel_tokens(
+        self, workers: int, chunk_size: int, spans: bool
+    ) -> Iterator[Union[BarrelmanToken, SpanToken]]:
+        """Tokenizes chunks of the source in a process pool, in order.
 
-                        # Get content after % marker - this is the PARAMETER
-                        parameter_content = rest_after_relation[modifier_idx+1:].strip(
+        At most two chunks per worker are in flight, so a lazily read
+        source (see `from_path`) is never fully materialized.
+        """
+        diagnostics = self.diagnostics
+        if diagnostics.stopped:
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending: Deque[Future] = deque()
+            lines = iter(self.source)
+            first_lineno = 1
+            while True:
+                chunk = list(islice(lines, chunk_size))
+                if chunk:
+                    pending.append(
+                        executor.submit(
+                            _tokenize_chunk,
+                            type(self),
+                            chunk,
+                            first_lineno,
+                            spans,
+                            diagnostics.remaining,
                         )
+                    )
+                    first_lineno += len(chunk)
+                if not pending:
+                    break
+                if chunk and len(pending) < 2 * workers:
+                    continue
+                tokens, reported = pending.popleft().result()
+                if not spans:
+                    # Share strings across chunks and fill this lexer's table
+                    for token in tokens:
+                        self.symbols.intern_token(token)
+                start = 0
+                for position, diagnostic in reported:
+                    yield from islice(tokens, start, position)
+                    start = position
+                    diagnostics.add(diagnostic)
+                    if diagnostics.stopped:
+                        for future in pending:
+                            future.cancel()
+                        return
+                yield from islice(tokens, start, None)
+
+    def iter_tokens(
+        self,
+        fileobj: Optional[Iterable[str]] = None,
+        spans: bool = False,
+        intern: bool = False,
+    ) -> Iterator[Union[BarrelmanToken, SpanToken]]:
+        """Yields tokens one at a time instead of building the `tokens` list.
+
+        Lines are read lazily from ``fileobj`` when one is given, otherwise
+        from the lexer's own source. Only the current line is held in
+        memory, so peak memory stays flat regardless of the input size.
+        With ``intern=True``, as `tokenize` does, token zones are interned
+        in `symbols`, whose table grows with the number of distinct zones;
+        spans mode never interns, as no zone text is copied in the first
+        place.
+        """
+        lines = self.source if fileobj is None else iter_source_lines(fileobj)
+        diagnostics = self.diagnostics
+        if diagnostics.stopped:
+            return
+        intern_token = self.symbols.intern_token if intern and not spans else None
+        if self.profile is not None:
+            yield from self._iter_profiled_tokens(lines, spans, intern_token)
+            return
+        for lineno, line in enumerate(lines, start=1):
+            token = self.tokenize_line(line, lineno, spans=spans)
+            if token is not None:
+                if intern_token is not None:
+                    intern_token(token)
+                yield token
+            elif diagnostics.stopped:
+                break
+
+    def _iter_profiled_tokens(
+        self,
+        lines: Iterable[str],
+        spans: bool,
+        intern_token: Optional[Callable[[BarrelmanToken], None]],
+    ) -> Iterator[Union[BarrelmanToken, SpanToken]]:
+        """Yields the tokens of `iter_tokens`, timing each phase in `profile`.
+
+        Reading a line and interning a token are timed here, and the
+        phases of `tokenize_line` by `tokenize_line` itself.
+        """
+        profile = self.profile
+        record = profile.record
+        diagnostics = self.diagnostics
+        lines = iter(lines)
+        lineno = 0
+        while True:
+            start = perf_counter()
+            line = next(lines, None)
+            record(READ, perf_counter() - start)
+            if line is None:
+                break
+            lineno += 1
+            profile.lines += 1
+
+            token = self.tokenize_line(line, lineno, spans, profile)
+            if token is None:
+                if diagnostics.stopped:
+                    break
+                continue
 
-                        # Step 3: Find trigger marker ->
-                        trigger_idx = parameter_content.find("->")
-                        if trigger_idx != -1:
-                            # Split at -> marker
-                            # This is the PARAMETER
-                            modifier = parameter_content[:trigger_idx].strip()
-                            # This is the OUTCOME
-                            trigger = parameter_content[trigger_idx+2:].strip()
-                        else:
-                            # No trigger, all is parameter
-                            modifier = parameter_content
-                    else:
-                        # No % marker, check for -> marker
-                        trigger_idx = rest_after_relation.find("->")
-                        if trigger_idx != -1:
-                            # Split at -> marker - everything before -> is FUNCTION
-                            function_part = rest_after_relation[:trigger_idx].strip(
-                            )
-                            relation = keyword
-                            if function_part:
-                                # Store function as part of relation for now
-                                relation = f"{keyword} // {function_part}"
-                            trigger = rest_after_relation[trigger_idx+2:].strip()
-                        else:
-                            # No % or ->, everything after // is FUNCTION
-                            relation = keyword
-                            if rest_after_relation:
-                                relation = f"{keyword} // {rest_after_relation}"
+            if intern_token is not None:
+                start = perf_counter()
+                intern_token(token)
+                record(INTERN, perf_counter() - start)
+            profile.tokens += 1
+            yield token
+
+    def tokenize_line(
+        self,
+        line: str,
+        lineno: int,
+        spans: bool = False,
+        profile: Optional[LexerProfile] = None,
+    ) -> Optional[Union[BarrelmanToken, SpanToken]]:
+        """Tokenizes a single line of Barrelman source code.
+
+        Returns None for blank lines and for lines that fail spacing
+        validation or parsing; the error is recorded in `diagnostics`.
+        With ``spans=True`` a `SpanToken` is returned, whose zones are
+        only sliced out of the line when they are read.
+
+        With a `LexerProfile` as ``profile``, the spacing check, the zone
+        scan and the token construction are timed in it, and blank lines
+        and errors are counted.
+        """
+        original_line = line.rstrip("\n")
+
+        if not original_line or original_line.isspace():
+            if profile is not None:
+                profile.skipped += 1
+            return None
+
+        error = None
+        # Spacing rules only apply to lines containing these markers
+        if "  ::" in original_line or ":^:" in original_line:
+            start = perf_counter() if profile is not None else 0.0
+            error = self.check_spacing(original_line, lineno)
+            if profile is not None:
+                profile.record(SPACING, perf_counter() - start)
+
+        if error is None:
+            start = perf_counter() if profile is not None else 0.0
+            try:
+                if spans:
+                    zones = scan_spans(original_line)
                 else:
-                    # No // marker, check for % marker
-                    modifier_idx = rest.find("%")
-                    if modifier_idx != -1:
-                        # Split at % marker
-                        relation = rest[:modifier_idx].strip()
-                        modifier_content = rest[modifier_idx+1:].strip()
-
-                        # Check for -> in modifier content
-                        trigger_idx = modifier_content.find("->")
-                        if trigger_idx != -1:
-                            # Split at -> marker
-                            modifier = modifier_content[:trigger_idx].strip()
-                            trigger = modifier_content[trigger_idx+2:].strip()
-                        else:
-                            # No trigger, all is modifier
-                            modifier = modifier_content
-                    else:
-                        # No // or %, check for -> marker
-                        trigger_idx = rest.find("->")
-                        if trigger_idx != -1:
-                            # Split at -> marker
-                            relation = rest[:trigger_idx].strip()
-                            trigger = rest[trigger_idx+2:].strip()
-                        else:
-                            # No markers, everything is relation
-                            relation = rest.strip()
-
-                self.tokens.append(
-                    BarrelmanToken(
-                        line=original_line,
-                        zone_1_declaration=declaration,
-                        zone_1_relation=relation,
-                        zone_2_modifier=modifier,
-                        zone_3_trigger=trigger,
-                        zone_4_outcome=self.infer_outcome(modifier, trigger),
-                        indent_level=indent_level,
-                        is_nesting_port=is_nesting,
-                    )
-                )
+                    zones = scan_zones(original_line)
             except Exception as e:
-                print(
-                    f"[Line {lineno}] ERROR: Failed to parse syntax — {original_line} - {str(e)}"
-                )
-
-        return self.tokens
-
-    def render_syntax_tree(self):
+                error = _parse_failure(lineno, original_line, e)
+            if profile is not None:
+                profile.record(SCAN, perf_counter() - start)
+
+        if error is not None:
+            if profile is not None:
+                profile.errors += 1
+            self.diagnostics.add(error)
+            return None
+
+        start = perf_counter() if profile is not None else 0.0
+        if spans:
+            token = SpanToken(original_line, zones)
+        else:
+            declaration, relation, modifier, trigger, indent = zones
+            token = BarrelmanToken(
+                original_line,
+                declaration,
+                relation,
+                modifier,
+                trigger,
+                INFER_OUTCOME,
+                indent,
+                declaration == ":^:",
+            )
+        if profile is not None:
+            profile.record(CONSTRUCT, perf_counter() - start)
+        return token
+
+    def render_syntax_tree(
+        self, out: Optional[TextIO] = None, start: int = 0, end: Optional[int] = None
+    ):
         """Renders a visual representation of the Barrelman syntax tree.
 
-        Prints a tree-like structure to the console, showing the
-        relationships between tokens based on their indentation levels
-        and nesting ports.
+        Writes a tree-like structure to ``out`` (standard output by
+        default), showing the relationships between tokens and nesting
+        ports. Each token is drawn at its depth in the tree built by
+        `build_tree`. Only tokens ``start`` to ``end`` (exclusive) are
+        rendered; depths still account for the tokens before them.
         """
-
-        def indent_prefix(level):
-            """Generates a string prefix for indentation based on the specified level.
-            Parameters:
-            level (int): The indentation level, where each level adds a '│   ' prefix.
-
-            Returns:
-            str: A string representing the indentation prefix.
-
-            Exceptions:
-            None
-            """
-            return "│   " * level
-
-        print("\nBARRELMAN SYNTAX TREE:\n")
-        for token in self.tokens:
-            prefix = indent_prefix(token.indent_level)
-            node = f"{prefix}├── {token.zone_1_relation}"
-            if token.is_nesting_port:
-                node += "  [PORT]"
-            print(node)
-            if token.zone_2_modifier:
-                print(f"{prefix}│   ├── Modifier: {token.zone_2_modifier}")
-            if token.zone_3_trigger:
-                print(f"{prefix}│   ├── Trigger: {token.zone_3_trigger}")
-            if token.zone_4_outcome:
-                print(f"{prefix}│   └── Outcome: {token.zone_4_outcome}")
-
-    def highlight(self):
+        document = build_tree(self.tokens)
+        prefixes: List[str] = []
+
+        def lines():
+            yield "\nBARRELMAN SYNTAX TREE:\n"
+            visible = islice(zip(document.tokens, document.depths), start, end)
+            for token, depth in visible:
+                while len(prefixes) <= depth:
+                    prefixes.append("│   " * len(prefixes))
+                prefix = prefixes[depth]
+                if token.is_nesting_port:
+                    yield f"{prefix}├── {token.zone_1_relation}  [PORT]"
+                else:
+                    yield f"{prefix}├── {token.zone_1_relation}"
+                if token.zone_2_modifier:
+                    yield f"{prefix}│   ├── Modifier: {token.zone_2_modifier}"
+                if token.zone_3_trigger:
+                    yield f"{prefix}│   ├── Trigger: {token.zone_3_trigger}"
+                if token.zone_4_outcome:
+                    yield f"{prefix}│   └── Outcome: {token.zone_4_outcome}"
+
+        write_lines(sys.stdout if out is None else out, lines())
+
+    def highlight(
+        self, out: Optional[TextIO] = None, start: int = 0, end: Optional[int] = None
+    ):
+        """Writes ANSI-highlighted syntax for each token to ``out``.
+
+        Writes to standard output by default. Only tokens ``start`` to
+        ``end`` (exclusive) are highlighted. The color codes of every zone
+        are prepared once, not per token.
         """
-        Formats and prints highlighted syntax for each token in the tokens list.
 
-        Parameters:
-        None
+        def lines():
+            yield "\nBARRELMAN HIGHLIGHTED SYNTAX:\n"
+            for token in islice(self.tokens, start, end):
+                parts = []
 
-        Returns:
-        None
+                # Zone 1: Declaration, with the port color for nesting ports
+                if token.zone_1_declaration:
+                    color = _HL_PORT if token.is_nesting_port else _HL_DECLARATION
+                    parts.append(
+                        f"{' ' * token.indent_level}{color}"
+                        f"{token.zone_1_declaration}{_HL_RESET} "
+                    )
 
-        Exceptions:
-        None
-        """
-        print("\nBARRELMAN HIGHLIGHTED SYNTAX:\n")
-        for token in self.tokens:
-            indent_spaces = " " * token.indent_level
-            parts = []
+                # Zone 1: Keyword & Relation; no function part without '//'
+                relation = token.zone_1_relation
+                if relation:
+                    keyword, separator, function = relation.partition(" // ")
+                    parts.append(f"{_HL_KEYWORD}{keyword}{_HL_RESET}")
+                    parts.append(_HL_RELATION)
+                    if separator:
+                        parts.append(f"{_HL_FUNCTION}{function}{_HL_RESET}")
 
-            # Zone 1: Declaration
-            if token.zone_1_declaration:
-                if token.is_nesting_port:
-                    # port color with proper spacing
-                    parts.append(
-                        f"{indent_spaces}\033[96m{token.zone_1_declaration}\033[0m ")
-                else:
-                    # declaration with proper spacing
-                    parts.append(
-                        f"{indent_spaces}\033[95m{token.zone_1_declaration}\033[0m ")
-
-            # Zone 1: Keyword & Relation
-            if token.zone_1_relation:
-                # Check if the relation contains a function part (indicated by '//')
-                if " // " in token.zone_1_relation:
-                    keyword, function = token.zone_1_relation.split(" // ", 1)
-                    parts.append(f"\033[94m{keyword}\033[0m")  # keyword
-                    parts.append("\033[93m // \033[0m")  # relation marker
-                    parts.append(f"\033[92m{function}\033[0m")  # function
-                else:
-                    # Just a keyword, no function
-                    parts.append(
-                        f"\033[94m{token.zone_1_relation}\033[0m")  # keyword
-                    parts.append("\033[93m // \033[0m")  # relation marker
+                # Zone 2: Modifier (Parameter)
+                if token.zone_2_modifier:
+                    parts.append(_HL_MODIFIER_MARK)
+                    parts.append(f"{_HL_MODIFIER}{token.zone_2_modifier}{_HL_RESET}")
 
-            # Zone 2: Modifier (Parameter)
-            if token.zone_2_modifier:
-                # modifier symbol with proper spacing
-                parts.append("\033[92m% \033[0m")
-                # parameter
-                parts.append(f"\033[91m{token.zone_2_modifier}\033[0m")
+                # Zone 3: Trigger (Outcome)
+                if token.zone_3_trigger:
+                    parts.append(_HL_TRIGGER_MARK)
+                    parts.append(f"{_HL_TRIGGER}{token.zone_3_trigger}{_HL_RESET}")
 
-            # Zone 3: Trigger (Outcome)
-            if token.zone_3_trigger:
-                # trigger symbol with proper spacing
-                parts.append("\033[90m -> \033[0m")
-                parts.append(
-                    f"\033[89m{token.zone_3_trigger}\033[0m")  # outcome
+                yield " ".join(parts)
 
-            print(" ".join(parts))
+        write_lines(sys.stdout if out is None else out, lines())
 
 
 # CLI tool
@@ -339,16 +937,60 @@ if __name__ == "__main__":
     parser.add_argument(
         "--dark-mode", action="store_true", help="Use dark mode for HTML export"
     )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Tokenize with N worker processes"
+    )
+    parser.add_argument(
+        "--cache", action="store_true", help="Reuse cached tokens for unchanged files"
+    )
+    parser.add_argument(
+        "--max-errors", type=int, default=None, help="Stop after N errors"
+    )
+    parser.add_argument(
+        "--check-ports", action="store_true", help="Report unresolved ':^:' ports"
+    )
+    parser.add_argument(
+        "--start", type=int, default=0, help="First token to highlight and render"
+    )
+    parser.add_argument(
+        "--end", type=int, default=None, help="Stop rendering before token N"
+    )
+    parser.add_argument(
+        "--profile-lexer",
+        action="store_true",
+        help="Print the time spent in each tokenizer phase",
+    )
     args = parser.parse_args()
 
-    with open(args.file, "r") as f:
-        content = f.read()
-
-    lexer = BarrelmanLexer(content)
-    tokens = lexer.tokenize()
+    cache = None
+    if args.cache:
+        from src.token_cache import TokenCache
+
+        cache = TokenCache()
+
+    lexer = BarrelmanLexer.from_path(args.file)
+    lexer.diagnostics = DiagnosticCollector(max_errors=args.max_errors)
+    if args.profile_lexer:
+        lexer.profile = LexerProfile()
+    tokens = lexer.tokenize(workers=args.workers, cache=cache)
+    lexer.close()
+    for diagnostic in lexer.diagnostics:
+        print(diagnostic)
+    if args.profile_lexer:
+        print(lexer.profile.summary())
+
+    if args.check_ports:
+        from src.ports import resolve_ports, token_keyword
+
+        for index in resolve_ports(tokens).unresolved:
+            token = tokens[index]
+            print(
+                f"[Port] Unresolved reference '{token_keyword(token)}': "
+                f"{token.line.strip()}"
+            )
 
     if args.highlight:
-        lexer.highlight()
+        lexer.highlight(start=args.start, end=args.end)
 
     if args.html:
         from src.exporters.html_exporter import export_html
@@ -365,4 +1007,4 @@ if __name__ == "__main__":
 
         export_dot_graph(tokens)
 
-    lexer.render_syntax_tree()
+    lexer.render_syntax_tree(start=args.start, end=args.end)
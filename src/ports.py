@@ -0,0 +1,121 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from src.tree import build_tree
+
+# A word of a line, or a bracketed index such as the "[2]" of "RACE[2]"
+_WORD = re.compile(r"\[[^\]]*\]|[^\s\[\]]+")
+
+
+@dataclass
+class PortLinks:
+    """The targets of the ``:^:`` ports of a document.
+
+    ``targets`` maps the index of every resolved port to the index of the
+    declaration it references; ``unresolved`` lists the ports that
+    reference no visible declaration, in document order.
+    """
+
+    targets: Dict[int, int] = field(default_factory=dict)
+    unresolved: List[int] = field(default_factory=list)
+
+    def target(self, index: int) -> Optional[int]:
+        """Returns the declaration a port references, or None."""
+        return self.targets.get(index)
+
+
+def token_keyword(token) -> str:
+    """Returns the keyword of a token: its relation up to the first ``//``."""
+    return (token.zone_1_relation or "").partition(" // ")[0]
+
+
+def keyword_words(keyword: str) -> FrozenSet[str]:
+    """Returns the words of a keyword, with ``RACE[2]`` split into RACE and [2]."""
+    return frozenset(_WORD.findall(keyword))
+
+
+def reference_words(token) -> FrozenSet[str]:
+    """Returns the words a declaration offers to the ports below it.
+
+    These are the words of its relation, keyword and function alike,
+    and of its modifier, as in ``:: THREAT // AWAKENING CANDIDATE RACE
+    % [2]``, which a ``:^: RACE[2]`` port references.
+    """
+    return keyword_words(
+        f"{token.zone_1_relation or ''} {token.zone_2_modifier or ''}"
+    )
+
+
+def resolve_ports(tokens: Iterable) -> PortLinks:
+    """Links every ``:^:`` port to the declaration it references.
+
+    As described in SYNTAX.md, a port references keywords of the visible
+    lines above it: it resolves to the most recent visible declaration (a
+    token that is not itself a port) whose relation or modifier holds
+    every word of the port's keyword, so ``:^: EARTH`` references
+    ``:: INTELLIGENCE // EARTH NOT RARE`` and ``:^: RACE[2]`` references
+    ``:: THREAT // AWAKENING CANDIDATE RACE % [2]``. A top-level port
+    whose keyword appears nowhere above is a hierarchical modifier port,
+    which connects the preceding line string: it resolves to the most
+    recent top-level declaration. A port without a keyword never
+    resolves.
+
+    Declarations are scoped like the tree built by `build_tree`: a
+    declaration stays visible to the rest of its parent's block, and goes
+    out of scope when that block closes, so ports never reach into a
+    sibling's closed subtree.
+
+    Runs in a single pass. The index maps each word to a stack of the
+    visible declarations holding it; every block remembers the
+    declarations made directly inside it and pops them when it closes,
+    so each binding is pushed and popped at most once. A port scans the
+    stack of one of its words, most recent first, for a declaration that
+    holds the others.
+    """
+    document = build_tree(tokens)
+    parents = document.parents
+    links = PortLinks()
+    visible: Dict[str, List[int]] = {}
+    words: Dict[int, FrozenSet[str]] = {}
+    last_root: Optional[int] = None
+    # Open blocks as (node index, declarations made directly inside it)
+    open_blocks: List[Tuple[int, List[int]]] = []
+
+    for index, token in enumerate(document.tokens):
+        parent = parents[index]
+        while open_blocks and open_blocks[-1][0] != parent:
+            for declaration in open_blocks.pop()[1]:
+                for word in words.pop(declaration):
+                    declarations = visible[word]
+                    declarations.pop()
+                    if not declarations:
+                        del visible[word]
+
+        keyword = token_keyword(token)
+        if token.is_nesting_port:
+            target = None
+            wanted = keyword_words(keyword)
+            if wanted:
+                first = next(iter(wanted))
+                for candidate in reversed(visible.get(first, ())):
+                    if wanted <= words[candidate]:
+                        target = candidate
+                        break
+                if target is None and parent == -1:
+                    target = last_root
+            if target is None:
+                links.unresolved.append(index)
+            else:
+                links.targets[index] = target
+        elif keyword:
+            words[index] = reference_words(token)
+            for word in words[index]:
+                visible.setdefault(word, []).append(index)
+            if open_blocks:
+                # Top-level declarations stay visible to the end
+                open_blocks[-1][1].append(index)
+            else:
+                last_root = index
+        open_blocks.append((index, []))
+    return links
@@ -1,10 +1,14 @@
 import logging
 import os
 
-from flask import Flask, jsonify, render_template_string, send_from_directory
+from flask import Flask, jsonify, render_template_string, request, send_from_directory
 
 from src.exporters.html_exporter import export_html
 from src.lexer import BarrelmanLexer
+from src.ports import resolve_ports
+from src.token_cache import TokenCache
+from src.token_index import TokenIndex
+from src.tree import build_tree
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -84,8 +88,15 @@ def run_preview_server(content):
 
     try:
         lexer = BarrelmanLexer(content)
-        tokens = lexer.tokenize()
+        tokens = lexer.tokenize(cache=TokenCache())
         logger.info(f"Tokenized {len(tokens)} tokens from content")
+        for diagnostic in lexer.diagnostics:
+            logger.warning(str(diagnostic))
+        document = build_tree(tokens)
+        ports = resolve_ports(document)
+        for index in ports.unresolved:
+            logger.warning(f"Unresolved port reference: {tokens[index].line}")
+        token_index = TokenIndex.from_tokens(tokens)
 
         # Debug token information
         for i, token in enumerate(tokens):
@@ -104,6 +115,9 @@ def run_preview_server(content):
     except Exception as e:
         logger.error(f"Error processing content: {str(e)}")
         tokens = []  # Empty tokens to prevent template rendering errors
+        document = build_tree(tokens)
+        ports = resolve_ports(document)
+        token_index = TokenIndex.from_tokens(tokens)
 
     # Get the absolute path to the static directory
     static_dir = os.path.join(os.path.dirname(
@@ -140,6 +154,10 @@ def run_preview_server(content):
                 "is_nesting_port": token.is_nesting_port,
                 "relation": str(token.zone_1_relation),
                 "indent_level": token.indent_level,
+                "parent": document.parent(i),
+                "depth": document.depths[i],
+                "subtree_size": document.subtree_sizes[i],
+                "port_target": ports.target(i),
                 "modifier": str(token.zone_2_modifier),
                 "trigger": str(token.zone_3_trigger),
                 "outcome": str(token.zone_4_outcome)
@@ -150,6 +168,30 @@ def run_preview_server(content):
             "total_tokens": len(tokens)
         })
 
+    @app.route("/api/search")
+    def search():
+        """Find tokens by zone: ?zone=trigger&q=PLANETARY&mode=word|prefix|exact"""
+        zone = request.args.get("zone", "keyword")
+        query = request.args.get("q", "")
+        mode = request.args.get("mode", "word")
+        lookups = {
+            "word": token_index.search,
+            "prefix": token_index.prefix,
+            "exact": token_index.lookup,
+        }
+        if mode not in lookups:
+            return jsonify({"error": f"Unknown mode: {mode}"}), 400
+        try:
+            ids = lookups[mode](zone, query)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({
+            "zone": zone,
+            "query": query,
+            "mode": mode,
+            "results": [{"index": i, "line": tokens[i].line} for i in ids],
+        })
+
     @app.route("/")
     def preview():
         logger.info("Preview request received")
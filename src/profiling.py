@@ -0,0 +1,65 @@
+from typing import Callable, Dict, Optional
+
+READ = "read"
+SPACING = "spacing"
+SCAN = "scan"
+CONSTRUCT = "construct"
+INTERN = "intern"
+
+PHASES = (READ, SPACING, SCAN, CONSTRUCT, INTERN)
+
+
+class LexerProfile:
+    """Per-phase timings and counts collected while tokenizing.
+
+    Pass one to `BarrelmanLexer` as ``profile`` to time each phase of
+    every line: reading it from the source, spacing validation, zone
+    scanning, token construction and interning. Outcomes are not part of
+    tokenization: tokens infer them lazily, when a consumer reads them.
+    Lines read, tokens produced, skipped blank lines and errors are
+    counted as well.
+
+    ``callback``, when given, is called with the phase name and the
+    elapsed seconds of every measurement, for callers that want to
+    aggregate the timings themselves.
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, float], None]] = None):
+        """Initializes empty counters."""
+        self.times: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.calls: Dict[str, int] = dict.fromkeys(PHASES, 0)
+        self.lines = 0
+        self.tokens = 0
+        self.skipped = 0
+        self.errors = 0
+        self.callback = callback
+
+    def record(self, phase: str, seconds: float):
+        """Adds one measurement of ``phase``."""
+        self.times[phase] += seconds
+        self.calls[phase] += 1
+        if self.callback is not None:
+            self.callback(phase, seconds)
+
+    @property
+    def total(self) -> float:
+        """The time spent in all phases, in seconds."""
+        return sum(self.times.values())
+
+    def summary(self) -> str:
+        """Returns the timings and counts as a small text table."""
+        total = self.total
+        rows = [f"{'phase':<10} {'calls':>10} {'seconds':>10} {'share':>7} {'us/call':>9}"]
+        for phase in PHASES:
+            seconds = self.times[phase]
+            calls = self.calls[phase]
+            share = seconds / total if total else 0.0
+            per_call = seconds / calls * 1e6 if calls else 0.0
+            rows.append(
+                f"{phase:<10} {calls:>10,} {seconds:>10.4f} {share:>7.1%} {per_call:>9.2f}"
+            )
+        rows.append(
+            f"lines: {self.lines:,}  tokens: {self.tokens:,}  "
+            f"skipped: {self.skipped:,}  errors: {self.errors:,}"
+        )
+        return "\n".join(rows)
@@ -0,0 +1,99 @@
+import sys
+from multiprocessing import shared_memory
+from typing import Iterable
+
+from src.bmanc import TokenBlock, encode_tokens
+
+
+class SharedTokenBlock(TokenBlock):
+    """A `TokenBlock` in a named `multiprocessing.shared_memory` segment.
+
+    The owner encodes tokens once with `create`, in the ``.bmanc``
+    layout: fixed-width records, one string heap and, for a
+    `BarrelmanDocument`, its tree columns. Other processes `attach` to the
+    segment by `name` and decode tokens straight from the shared pages,
+    so fanning a parsed document out to several workers costs one
+    encoding instead of pickling the tokens once per worker.
+
+    Ownership and cleanup:
+
+    - The process that calls `create` owns the segment and must call
+      `unlink` once every reader is done with it; leaving the owner's
+      ``with`` block does this. Until then the segment outlives the
+      owner's `close`.
+    - Readers call `close` (or use ``with``) when done, and never
+      `unlink`. Tokens already decoded stay valid after `close`; the
+      block itself cannot be read afterwards.
+    - If the owner dies without unlinking, the multiprocessing resource
+      tracker removes the segment when the owner's process tree exits.
+    - Before Python 3.13, readers must be processes started by the owner,
+      such as the workers of its `ProcessPoolExecutor`, which share the
+      owner's resource tracker. An unrelated process would register the
+      segment with its own tracker, which unlinks it when that process
+      exits.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        """Wraps an open segment; use `create` or `attach` instead."""
+        self._memory = memory
+        self.owner = owner
+        try:
+            super().__init__(memory.buf, memory.name)
+        except ValueError:
+            self.close()
+            raise
+
+    @classmethod
+    def create(cls, tokens: Iterable) -> "SharedTokenBlock":
+        """Encodes tokens (or a document) into a new segment owned by the caller."""
+        data = encode_tokens(tokens)
+        memory = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        memory.buf[: len(data)] = data
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedTokenBlock":
+        """Opens the segment created under ``name`` by another process."""
+        if sys.version_info >= (3, 13):
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # Registers the segment again with the resource tracker, which
+            # processes started by the owner share with it, so nothing
+            # changes there
+            memory = shared_memory.SharedMemory(name=name)
+        return cls(memory, owner=False)
+
+    @property
+    def name(self) -> str:
+        """The name readers pass to `attach`."""
+        return self._memory.name
+
+    def close(self):
+        """Detaches this process from the segment."""
+        # Drop our view of the segment first; closing fails while it exists
+        self._buffer = None
+        self._memory.close()
+
+    def unlink(self):
+        """Destroys the segment; only the owner may call this."""
+        if not self.owner:
+            raise ValueError("Only the process that created a block may unlink it")
+        self._memory.unlink()
+
+    def __enter__(self) -> "SharedTokenBlock":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        if self.owner:
+            self.unlink()
+
+
+def read_shared_tokens(name: str) -> list:
+    """Decodes every token of a shared block, detaching before returning.
+
+    A convenient worker function argument: submit the block's `name` to
+    a pool, and each worker calls this to get its own list of tokens.
+    """
+    with SharedTokenBlock.attach(name) as block:
+        return block.tokens()
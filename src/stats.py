@@ -0,0 +1,345 @@
+import argparse
+import heapq
+import os
+from collections import Counter
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.lexer import BarrelmanLexer
+
+# Items tracked per heavy-hitter counter, for each of the top-N reported
+DEFAULT_CAPACITY_PER_ITEM = 10
+
+DEFAULT_TOP = 10
+
+# Tokens whose zones are aggregated before being added to the heavy
+# hitters, which bounds the memory of the aggregation
+HEAVY_HITTER_BATCH = 16384
+
+
+class HeavyHitters:
+    """Approximate counts of the most frequent items of a stream.
+
+    Implements the Space-Saving algorithm with at most ``capacity``
+    counters, whatever the number of distinct items. When an untracked
+    item arrives and every counter is taken, the item with the smallest
+    count is evicted and the newcomer inherits its count, recorded as
+    the newcomer's possible overestimate. Every item seen more than
+    ``total / capacity`` times is guaranteed to be tracked, and reported
+    counts exceed the true ones by at most their error.
+
+    The smallest counter is found through a heap whose entries may lag
+    behind their counts; stale entries are refreshed as they surface, so
+    each ``add`` takes amortized O(log capacity) time.
+    """
+
+    def __init__(self, capacity: int):
+        """Initializes an empty counter tracking up to ``capacity`` items."""
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        # (count, item) for every tracked item; a count may be stale (lower)
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(self, item: str, count: int = 1):
+        """Counts ``count`` more occurrences of ``item``."""
+        self.total += count
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+            return
+        if len(counts) < self.capacity:
+            counts[item] = count
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (count, item))
+            return
+
+        heap = self._heap
+        while True:
+            stored, smallest = heap[0]
+            current = counts[smallest]
+            if stored == current:
+                break
+            heapq.heapreplace(heap, (current, smallest))
+        del counts[smallest]
+        del self.errors[smallest]
+        counts[item] = current + count
+        self.errors[item] = current
+        heapq.heapreplace(heap, (current + count, item))
+
+    def update(self, items: Iterable[str]):
+        """Counts every item of ``items``.
+
+        Equal items are aggregated first and added with one weighted
+        `add` each, which keeps the guarantees and saves most evictions.
+        """
+        for item, count in Counter(items).items():
+            self.add(item, count)
+
+    def top(self, n: int) -> List[Tuple[str, int, int]]:
+        """Returns the ``n`` most frequent items as (item, count, error)."""
+        errors = self.errors
+        return [
+            (item, count, errors[item])
+            for item, count in sorted(
+                self.counts.items(), key=lambda entry: (-entry[1], entry[0])
+            )[:n]
+        ]
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+def iter_bman_files(paths: Iterable[str]) -> Iterator[str]:
+    """Yields the given files, and the ``.bman`` files under given directories.
+
+    Directories are walked recursively, in sorted order.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories.sort()
+            for file in sorted(files):
+                if file.endswith(".bman"):
+                    yield os.path.join(directory, file)
+
+
+class CorpusStats:
+    """Statistics of one or more Barrelman documents, gathered in one pass.
+
+    Every document is read line by line through the streaming tokenizer,
+    in spans mode, so memory stays bounded on corpora of any size: a
+    file is memory-mapped rather than read, no token outlives its line,
+    diagnostics are counted and discarded, the tree structure is tracked
+    with a stack of open blocks, and keywords, modifiers and triggers
+    are counted with `HeavyHitters` of fixed ``capacity``.
+
+    Collected are the number of files, bytes, lines, blank lines and
+    tokens; the number of tokens at each depth; the number of nodes with
+    each number of children (leaves included); the number of ``:^:``
+    ports; the number of diagnostics per code; and the time spent, from
+    which the throughput is derived.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY_PER_ITEM * DEFAULT_TOP):
+        """Initializes empty statistics; see `HeavyHitters` for ``capacity``."""
+        self.files = 0
+        self.bytes = 0
+        self.lines = 0
+        self.blank_lines = 0
+        self.tokens = 0
+        self.ports = 0
+        self.seconds = 0.0
+        self.depths: Counter = Counter()
+        self.fan_out: Counter = Counter()
+        self.diagnostics: Counter = Counter()
+        self.keywords = HeavyHitters(capacity)
+        self.modifiers = HeavyHitters(capacity)
+        self.triggers = HeavyHitters(capacity)
+
+    def add_file(self, path: str):
+        """Adds the statistics of the document at ``path``."""
+        start = perf_counter()
+        with BarrelmanLexer.from_path(path) as lexer:
+            self._add_lines(lexer, lexer.source)
+        self.bytes += os.path.getsize(path)
+        self.files += 1
+        self.seconds += perf_counter() - start
+
+    def add_text(self, source: str):
+        """Adds the statistics of a document held in a string."""
+        start = perf_counter()
+        lexer = BarrelmanLexer(source)
+        self._add_lines(lexer, lexer.source)
+        self.bytes += len(source.encode("utf-8", "surrogatepass"))
+        self.files += 1
+        self.seconds += perf_counter() - start
+
+    def add_paths(self, paths: Iterable[str]):
+        """Adds every file, and every ``.bman`` file under every directory."""
+        for path in iter_bman_files(paths):
+            self.add_file(path)
+
+    def _add_lines(self, lexer: BarrelmanLexer, lines: Iterable[str]):
+        tokenize_line = lexer.tokenize_line
+        collected = lexer.diagnostics.diagnostics
+        depths = self.depths
+        fan_out = self.fan_out
+        # Zones waiting to be added to the heavy hitters
+        keywords: List[str] = []
+        modifiers: List[str] = []
+        triggers: List[str] = []
+        # Open blocks as [indent level, children so far], innermost last
+        stack: List[List[int]] = []
+        lineno = 0
+        for lineno, line in enumerate(lines, start=1):
+            token = tokenize_line(line, lineno, spans=True)
+            if token is None:
+                if collected:
+                    for diagnostic in collected:
+                        self.diagnostics[diagnostic.code] += 1
+                    lexer.diagnostics.clear()
+                else:
+                    self.blank_lines += 1
+                continue
+
+            indent = token.indent_level
+            while stack and stack[-1][0] >= indent:
+                fan_out[stack.pop()[1]] += 1
+            if stack:
+                stack[-1][1] += 1
+            depths[len(stack)] += 1
+            stack.append([indent, 0])
+
+            if token.is_nesting_port:
+                self.ports += 1
+            keywords.append(token.keyword)
+            modifier = token.zone_2_modifier
+            if modifier:
+                modifiers.append(modifier)
+            trigger = token.zone_3_trigger
+            if trigger:
+                triggers.append(trigger)
+            if len(keywords) == HEAVY_HITTER_BATCH:
+                self._add_zones(keywords, modifiers, triggers)
+        self._add_zones(keywords, modifiers, triggers)
+        for _, children in stack:
+            fan_out[children] += 1
+        self.lines += lineno
+
+    def _add_zones(
+        self, keywords: List[str], modifiers: List[str], triggers: List[str]
+    ):
+        self.tokens += len(keywords)
+        for hitters, values in (
+            (self.keywords, keywords),
+            (self.modifiers, modifiers),
+            (self.triggers, triggers),
+        ):
+            hitters.update(values)
+            values.clear()
+
+    @property
+    def errors(self) -> int:
+        """The number of diagnostics reported."""
+        return sum(self.diagnostics.values())
+
+    @property
+    def port_ratio(self) -> float:
+        """The share of tokens that are ``:^:`` ports."""
+        return self.ports / self.tokens if self.tokens else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """The throughput of the pass, in input bytes per second."""
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def as_dict(self, top: int = DEFAULT_TOP) -> dict:
+        """Returns the statistics as JSON-serializable data."""
+
+        def heavy(hitters: HeavyHitters) -> List[dict]:
+            return [
+                {"value": item, "count": count, "error": error}
+                for item, count, error in hitters.top(top)
+            ]
+
+        return {
+            "files": self.files,
+            "bytes": self.bytes,
+            "lines": self.lines,
+            "blank_lines": self.blank_lines,
+            "tokens": self.tokens,
+            "ports": self.ports,
+            "port_ratio": self.port_ratio,
+            "errors": self.errors,
+            "diagnostics": dict(sorted(self.diagnostics.items())),
+            "depths": dict(sorted(self.depths.items())),
+            "fan_out": dict(sorted(self.fan_out.items())),
+            "keywords": heavy(self.keywords),
+            "modifiers": heavy(self.modifiers),
+            "triggers": heavy(self.triggers),
+            "seconds": self.seconds,
+            "bytes_per_second": self.bytes_per_second,
+        }
+
+    def summary(self, top: int = DEFAULT_TOP) -> str:
+        """Returns the statistics as text."""
+        rows = [
+            f"files: {self.files:,}  bytes: {self.bytes:,}  lines: {self.lines:,}  "
+            f"blank: {self.blank_lines:,}  tokens: {self.tokens:,}",
+            f"ports: {self.ports:,} ({self.port_ratio:.1%})  errors: {self.errors:,}"
+            + "".join(
+                f"  {code}: {count:,}"
+                for code, count in sorted(self.diagnostics.items())
+            ),
+            f"seconds: {self.seconds:.3f}  bytes/sec: {self.bytes_per_second:,.0f}",
+        ]
+        for title, histogram in (("depth", self.depths), ("fan-out", self.fan_out)):
+            rows.append("")
+            rows.append(f"{title:<8} {'count':>12} {'share':>7}")
+            total = sum(histogram.values())
+            for value, count in sorted(histogram.items()):
+                rows.append(f"{value:<8} {count:>12,} {count / total:>7.1%}")
+        for title, hitters in (
+            ("keyword", self.keywords),
+            ("modifier", self.modifiers),
+            ("trigger", self.triggers),
+        ):
+            rows.append("")
+            rows.append(f"{'count':>12} {'error':>8}  {title}")
+            for item, count, error in hitters.top(top):
+                rows.append(f"{count:>12,} {error:>8,}  {item}")
+        return "\n".join(rows)
+
+
+def corpus_stats(
+    paths: Iterable[str], capacity: Optional[int] = None, top: int = DEFAULT_TOP
+) -> CorpusStats:
+    """Gathers the `CorpusStats` of files and directories in one pass.
+
+    ``capacity`` defaults to `DEFAULT_CAPACITY_PER_ITEM` counters per
+    item of the ``top`` reported, and to at least one counter.
+    """
+    stats = CorpusStats(capacity or max(1, DEFAULT_CAPACITY_PER_ITEM * top))
+    stats.add_paths(paths)
+    return stats
+
+
+def parse_stats_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses the arguments of ``barrelman stats``.
+
+    ``--top`` and ``--capacity`` below 1 are usage errors, which exit
+    through `argparse`.
+    """
+    parser = argparse.ArgumentParser(
+        prog="barrelman stats",
+        description="Report statistics of BARRELMAN files, read in a single pass",
+    )
+    parser.add_argument(
+        "paths", nargs="+", help=".bman files, or directories to search for them"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=DEFAULT_TOP,
+        help="Keywords, modifiers and triggers to list",
+    )
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        help="Counters per heavy-hitter table (default: 10 per listed item)",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the statistics as JSON"
+    )
+    args = parser.parse_args(argv)
+    if args.top < 1:
+        parser.error("--top must be at least 1")
+    if args.capacity is not None and args.capacity < 1:
+        parser.error("--capacity must be at least 1")
+    return args
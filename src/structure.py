@@ -0,0 +1,327 @@
+import mmap
+import os
+from array import array
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+from src.diagnostics import Diagnostic
+from src.lexer import INFER_OUTCOME, BarrelmanLexer, BarrelmanToken, scan_zones
+from src.tree import BarrelmanDocument, build_tree_from_indents
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to a per-line scan
+    np = None
+
+# Line kinds
+BLANK = 0
+TEXT = 1
+DECLARATION = 2
+PORT = 3
+
+# Spacing errors, as found by BarrelmanLexer.check_spacing
+NESTED_SPACING_ERROR = 1
+PORT_SPACING_ERROR = 2
+
+_WHITESPACE = b" \t\r\x0b\x0c"
+
+
+def _find_all(data, pattern: bytes):
+    """Returns the offsets of every occurrence of ``pattern`` in a uint8 array.
+
+    Candidates are the positions of the pattern's first ':' byte, which
+    is rare in Barrelman text, and are then checked against the other
+    bytes of the pattern.
+    """
+    anchor = pattern.index(b":")
+    positions = np.flatnonzero(data == 58) - anchor
+    positions = positions[
+        (positions >= 0) & (positions <= len(data) - len(pattern))
+    ]
+    for offset, byte in enumerate(pattern):
+        if offset != anchor:
+            positions = positions[data[positions + offset] == byte]
+    return positions
+
+
+# Bytes of leading whitespace examined per line and step, and the number
+# of lines examined at once, which bounds the temporary arrays
+_WINDOW = 32
+_BLOCK_LINES = 1 << 18
+
+
+def _skip_whitespace(padded, starts, ends):
+    """Returns the offset of the first non-whitespace byte of every line.
+
+    Each step gathers a window of ``_WINDOW`` bytes at the current
+    offset of every line still inside its indentation, and advances it
+    to the first non-whitespace byte in the window; only lines indented
+    by more than a whole window take another step. Blank lines end up at
+    their end offset.
+    """
+    space = np.zeros(256, dtype=bool)
+    space[list(_WHITESPACE)] = True
+    windows = np.lib.stride_tricks.sliding_window_view(padded, _WINDOW)
+    first = starts.copy()
+    active = np.flatnonzero(first < ends)
+    while active.size:
+        full = np.zeros(len(active), dtype=bool)
+        for block in range(0, len(active), _BLOCK_LINES):
+            lines = active[block : block + _BLOCK_LINES]
+            spaces = space[windows[first[lines]]]
+            whole = spaces.all(axis=1)
+            first[lines] += np.where(whole, _WINDOW, spaces.argmin(axis=1))
+            full[block : block + _BLOCK_LINES] = whole
+        active = active[full]
+    return np.minimum(first, ends)
+
+
+def _numpy_columns(buffer, start: int, end: int) -> tuple:
+    data = np.frombuffer(buffer, dtype=np.uint8, count=end - start, offset=start)
+    size = len(data)
+    newlines = np.flatnonzero(data == 10)
+    starts = np.concatenate(([0], newlines + 1)).astype(np.int64)
+    ends = np.concatenate((newlines, [size])).astype(np.int64)
+    # Drop the "\r" of "\r\n" line endings
+    ends -= (ends > starts) & (data[np.maximum(ends - 1, 0)] == 13)
+
+    padded = np.concatenate((data, np.zeros(_WINDOW, dtype=np.uint8)))
+    first = _skip_whitespace(padded, starts, ends)
+    indents = first - starts
+    blank = first == ends
+
+    colon = padded[first] == 58
+    declaration = colon & (padded[first + 1] == 58)
+    port = colon & (padded[first + 1] == 94) & (padded[first + 2] == 58)
+    kinds = np.full(len(starts), TEXT, dtype=np.uint8)
+    kinds[declaration] = DECLARATION
+    kinds[port] = PORT
+    kinds[blank] = BLANK
+
+    def containing(pattern: bytes):
+        found = np.zeros(len(starts), dtype=bool)
+        positions = _find_all(data, pattern)
+        found[np.searchsorted(starts, positions, side="right") - 1] = True
+        return found
+
+    # The rules of check_spacing: a line starting with '::' must not
+    # contain '  ::', and ':^:' must start the line or follow one space
+    at_line_start = indents == 0
+    nested = containing(b"  ::") & at_line_start & (kinds == DECLARATION)
+    port_ok = (kinds == PORT) & (
+        at_line_start | ((indents == 1) & (padded[starts] == 32))
+    )
+    misplaced_port = containing(b":^:") & ~port_ok & ~nested
+    spacing = np.zeros(len(starts), dtype=np.uint8)
+    spacing[nested] = NESTED_SPACING_ERROR
+    spacing[misplaced_port] = PORT_SPACING_ERROR
+    return starts + start, ends + start, indents, kinds, spacing
+
+
+def _python_columns(buffer, start: int, end: int) -> tuple:
+    starts, ends, indents = array("q"), array("q"), array("q")
+    kinds, spacing = array("B"), array("B")
+    pos = start
+    while pos < end:
+        newline = buffer.find(b"\n", pos, end)
+        if newline == -1:
+            newline = end
+        stop = newline
+        if stop > pos and buffer[stop - 1] == 13:  # "\r"
+            stop -= 1
+        raw = buffer[pos:stop]
+        content = raw.lstrip(_WHITESPACE)
+        if not content:
+            kind = BLANK
+        elif content.startswith(b"::"):
+            kind = DECLARATION
+        elif content.startswith(b":^:"):
+            kind = PORT
+        else:
+            kind = TEXT
+        error = 0
+        if raw.startswith(b"::") and b"  ::" in raw:
+            error = NESTED_SPACING_ERROR
+        elif b":^:" in raw and not (
+            raw.startswith(b":^:") or raw.startswith(b" :^:")
+        ):
+            error = PORT_SPACING_ERROR
+        starts.append(pos)
+        ends.append(stop)
+        indents.append(len(raw) - len(content))
+        kinds.append(kind)
+        spacing.append(error)
+        pos = newline + 1
+    return starts, ends, indents, kinds, spacing
+
+
+class LineStructure:
+    """The structure of every line of a Barrelman document, without parsing it.
+
+    For each line the structure holds its start and end offsets in the
+    encoded buffer, its indent level, its kind (`BLANK`, `TEXT`,
+    `DECLARATION` or `PORT`) and the spacing error `check_spacing` would
+    report for it. Lines follow the same ``strip().splitlines()`` rules
+    as `BarrelmanLexer` for ``\\n`` and ``\\r\\n`` endings, so line ``i``
+    has line number ``i + 1`` in the lexer's diagnostics.
+
+    With NumPy installed the columns are computed for all lines at once
+    with vectorized operations over the byte buffer, and are NumPy
+    arrays; without it they are `array.array` columns filled by a
+    per-line scan. Either way no line is decoded: zone parsing is
+    deferred to the lines that need it, see `tree`.
+    """
+
+    def __init__(
+        self,
+        buffer: Union[bytes, mmap.mmap],
+        encoding: str = "utf-8",
+        vectorized: Optional[bool] = None,
+    ):
+        """Computes the structure of an encoded document.
+
+        ``vectorized`` selects the NumPy implementation; by default it is
+        used whenever NumPy is installed.
+        """
+        if vectorized is None:
+            vectorized = np is not None
+        elif vectorized and np is None:
+            raise ImportError("The vectorized structural pass requires NumPy")
+        self.buffer = buffer
+        self.encoding = encoding
+        self._mapping = None
+
+        # Bounds of the document once surrounding whitespace is stripped
+        start, end = 0, len(buffer)
+        whitespace = _WHITESPACE + b"\n"
+        while start < end and buffer[start] in whitespace:
+            start += 1
+        while end > start and buffer[end - 1] in whitespace:
+            end -= 1
+        if start == end:
+            columns = _python_columns(buffer, start, end)
+        elif vectorized:
+            columns = _numpy_columns(buffer, start, end)
+        else:
+            columns = _python_columns(buffer, start, end)
+        self.starts, self.ends, self.indents, self.kinds, self.spacing = columns
+
+    @classmethod
+    def from_text(cls, source: str, **kwargs) -> "LineStructure":
+        """Computes the structure of a document held in a string."""
+        encoding = kwargs.get("encoding", "utf-8")
+        return cls(source.encode(encoding), **kwargs)
+
+    @classmethod
+    def from_path(cls, path: str, **kwargs) -> "LineStructure":
+        """Computes the structure of a file through a read-only memory map.
+
+        Call `close` (or use the structure as a context manager) to
+        release the mapping.
+        """
+        with open(path, "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                return cls(b"", **kwargs)
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        structure = cls(mapping, **kwargs)
+        structure._mapping = mapping
+        return structure
+
+    def close(self):
+        """Releases the memory map of a structure created by `from_path`."""
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self) -> "LineStructure":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text(self, index: int) -> str:
+        """Decodes one line."""
+        return self.buffer[self.starts[index] : self.ends[index]].decode(self.encoding)
+
+    def token_lines(self) -> List[int]:
+        """Returns the indices of the lines that become tokens.
+
+        These are the non-blank lines without a spacing error; a line the
+        lexer fails to parse is still included.
+        """
+        if np is not None and isinstance(self.kinds, np.ndarray):
+            return np.flatnonzero((self.kinds != BLANK) & (self.spacing == 0)).tolist()
+        return [
+            index
+            for index, (kind, error) in enumerate(zip(self.kinds, self.spacing))
+            if kind != BLANK and not error
+        ]
+
+    def spacing_diagnostics(self) -> List[Diagnostic]:
+        """Returns the spacing errors of the document, in line order.
+
+        Only the offending lines are decoded, to build the same
+        diagnostics `BarrelmanLexer.check_spacing` reports.
+        """
+        if np is not None and isinstance(self.spacing, np.ndarray):
+            flagged = np.flatnonzero(self.spacing).tolist()
+        else:
+            flagged = [index for index, error in enumerate(self.spacing) if error]
+        checker = BarrelmanLexer("")
+        return [checker.check_spacing(self.text(index), index + 1) for index in flagged]
+
+    def indent_histogram(self) -> Dict[int, int]:
+        """Returns the number of token lines at each indent level."""
+        lines = self.token_lines()
+        if np is not None and isinstance(self.indents, np.ndarray):
+            counts = np.bincount(self.indents[lines]) if lines else []
+            return {indent: int(count) for indent, count in enumerate(counts) if count}
+        return dict(sorted(Counter(self.indents[index] for index in lines).items()))
+
+    def tree(self) -> BarrelmanDocument:
+        """Builds the document tree of the token lines from their indents.
+
+        The tokens of the returned document are parsed from their lines
+        only when they are read, so walking the structure costs no zone
+        parsing at all.
+        """
+        lines = self.token_lines()
+        indents = self.indents
+        return build_tree_from_indents(
+            [int(indents[index]) for index in lines], DeferredTokens(self, lines)
+        )
+
+
+class DeferredTokens(Sequence):
+    """Tokens of selected lines of a `LineStructure`, parsed on access."""
+
+    def __init__(self, structure: LineStructure, lines: List[int]):
+        """Initializes the sequence; ``lines`` are the indices of the token lines."""
+        self.structure = structure
+        self.lines = lines
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        text = self.structure.text(self.lines[index])
+        declaration, relation, modifier, trigger, indent = scan_zones(text)
+        return BarrelmanToken(
+            text,
+            declaration,
+            relation,
+            modifier,
+            trigger,
+            INFER_OUTCOME,
+            indent,
+            declaration == ":^:",
+        )
+
+    def __iter__(self) -> Iterator[BarrelmanToken]:
+        for index in range(len(self)):
+            yield self[index]
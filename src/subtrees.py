@@ -0,0 +1,249 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.tree import BarrelmanDocument, build_tree
+
+# Bytes of every subtree digest
+DIGEST_SIZE = 16
+
+
+def _node_content(token) -> bytes:
+    """Returns the bytes that identify a token's own zones.
+
+    Absent and empty zones hash alike, as every exporter renders them
+    alike. The indent level is left out; where it matters, the indent of
+    a child relative to its parent is hashed by `subtree_hashes` instead.
+    """
+    return "\x1f".join(
+        (
+            token.zone_1_declaration or "",
+            token.zone_1_relation or "",
+            token.zone_2_modifier or "",
+            token.zone_3_trigger or "",
+        )
+    ).encode("utf-8", "surrogatepass")
+
+
+def subtree_hashes(tokens: Iterable, indents: bool = False) -> List[bytes]:
+    """Computes a Merkle digest of the subtree of every node of a document.
+
+    The digest of a node hashes its own zones followed by the digests of
+    its children, in order, so two subtrees have the same digest exactly
+    when they hold the same tokens in the same shape, wherever they
+    appear in the document. Nodes are visited in reverse document order,
+    which reaches every child before its parent: each digest is handed
+    to the parent as it is computed, so the whole document is hashed in
+    a single O(n) pass.
+
+    Indentation is ignored by default, so a block repeated under parents
+    at different depths still matches. With ``indents=True`` the indent
+    of every child relative to its parent is hashed as well, so equal
+    digests also mean equal indentation relative to the subtree's root.
+    """
+    document = build_tree(tokens)
+    nodes = document.tokens
+    parents = document.parents
+    digests: List[Optional[bytes]] = [None] * len(document)
+    # Digests of the children of each node seen so far, last child first
+    children: List[Optional[List[bytes]]] = [None] * len(document)
+    for index in range(len(document) - 1, -1, -1):
+        token = nodes[index]
+        digest = blake2b(_node_content(token), digest_size=DIGEST_SIZE)
+        below = children[index]
+        if below is not None:
+            children[index] = None
+            below.reverse()
+            digest.update(b"".join(below))
+        value = digests[index] = digest.digest()
+        parent = parents[index]
+        if parent != -1:
+            if indents:
+                offset = token.indent_level - nodes[parent].indent_level
+                value = b"%d:%b" % (offset, value)
+            siblings = children[parent]
+            if siblings is None:
+                children[parent] = [value]
+            else:
+                siblings.append(value)
+    return digests
+
+
+@dataclass
+class DuplicateGroup:
+    """Identical subtrees found by `find_duplicates`.
+
+    ``nodes`` holds the root of every occurrence in document order, and
+    ``size`` the number of tokens in each of them.
+    """
+
+    digest: bytes
+    size: int
+    nodes: List[int] = field(default_factory=list)
+
+    @property
+    def redundant(self) -> int:
+        """Tokens that repeat an earlier occurrence."""
+        return self.size * (len(self.nodes) - 1)
+
+
+def find_duplicates(tokens: Iterable, min_size: int = 2) -> List[DuplicateGroup]:
+    """Finds the subtrees that occur more than once in a document.
+
+    Only subtrees of at least ``min_size`` tokens are reported. A group
+    is left out when every one of its occurrences sits directly inside
+    a subtree that is itself repeated, since the larger group already
+    covers it. Groups are sorted by the number of redundant tokens,
+    largest first.
+    """
+    document = build_tree(tokens)
+    digests = subtree_hashes(document)
+    counts = Counter(digests)
+    sizes = document.subtree_sizes
+    parents = document.parents
+
+    groups: Dict[bytes, DuplicateGroup] = {}
+    maximal = set()
+    for index, digest in enumerate(digests):
+        if counts[digest] < 2 or sizes[index] < min_size:
+            continue
+        group = groups.get(digest)
+        if group is None:
+            group = groups[digest] = DuplicateGroup(digest, sizes[index])
+        group.nodes.append(index)
+        parent = parents[index]
+        if parent == -1 or counts[digests[parent]] < 2:
+            maximal.add(digest)
+    return sorted(
+        (group for digest, group in groups.items() if digest in maximal),
+        key=lambda group: (-group.redundant, group.nodes[0]),
+    )
+
+
+def render_subtrees(
+    tokens: Iterable,
+    render_token: Callable[[object], str],
+    cache: Optional[Dict[Tuple[bytes, int], str]] = None,
+    min_size: int = 2,
+) -> Iterator[str]:
+    """Renders a document token by token, reusing the output of repeated subtrees.
+
+    ``render_token`` returns the text of one token and may depend on
+    nothing but the token, including its indent level. The first
+    occurrence of a subtree of at least ``min_size`` tokens that appears
+    more than once is rendered and stored; every later occurrence with
+    the same root indent yields the stored text without visiting its
+    tokens. The concatenated output is identical to rendering every
+    token in turn.
+
+    ``cache`` maps ``(digest, indent level)`` to rendered text. Pass the
+    same dictionary to several calls that use the same ``render_token``
+    to reuse subtrees across documents; any subtree already in it is
+    reused, even if it occurs only once in this document.
+    """
+    document = build_tree(tokens)
+    nodes = document.tokens
+    sizes = document.subtree_sizes
+    digests = subtree_hashes(document, indents=True)
+    if cache is None:
+        cache = {}
+    keys = [
+        (digest, nodes[index].indent_level) for index, digest in enumerate(digests)
+    ]
+    counts = Counter(keys)
+
+    # Repeated subtrees being rendered, as (end, key, parts), innermost last
+    captures: List[Tuple[int, Tuple[bytes, int], List[str]]] = []
+
+    def close_captures(position: int) -> Iterator[str]:
+        while captures and captures[-1][0] <= position:
+            _, key, parts = captures.pop()
+            text = cache[key] = "".join(parts)
+            if captures:
+                captures[-1][2].append(text)
+            else:
+                yield text
+
+    index = 0
+    while index < len(document):
+        yield from close_captures(index)
+        key = keys[index]
+        text = cache.get(key)
+        if text is not None:
+            index += sizes[index]
+        else:
+            if counts[key] > 1 and sizes[index] >= min_size:
+                captures.append((index + sizes[index], key, []))
+            text = render_token(nodes[index])
+            index += 1
+        if captures:
+            captures[-1][2].append(text)
+        else:
+            yield text
+    yield from close_captures(len(document))
+
+
+def shared_nodes(tokens: Iterable, min_size: int = 1) -> Dict[int, int]:
+    """Maps the nodes of repeated subtrees to those of their first occurrence.
+
+    Every later occurrence of a subtree of at least ``min_size`` tokens
+    that has a parent is mapped node for node onto the first occurrence
+    that has a parent, so an exporter can emit that one copy and point
+    the occurrence's parent at it. Nodes inside a mapped occurrence are
+    all mapped with it. Roots are never mapped, nor used as the shared
+    copy: every parent-to-child edge then leads to a strictly smaller
+    subtree, so the tree becomes a smaller DAG, as long as the exporter
+    links top-level nodes only to earlier top-level nodes.
+    """
+    document = build_tree(tokens)
+    digests = subtree_hashes(document)
+    sizes = document.subtree_sizes
+    parents = document.parents
+    first: Dict[bytes, int] = {}
+    aliases: Dict[int, int] = {}
+    index = 0
+    while index < len(document):
+        size = sizes[index]
+        if parents[index] == -1 or size < min_size:
+            index += 1
+            continue
+        canonical = first.setdefault(digests[index], index)
+        if canonical != index:
+            for offset in range(size):
+                aliases[index + offset] = canonical + offset
+            index += size
+        else:
+            index += 1
+    return aliases
+
+
+def render_duplicates(
+    document: BarrelmanDocument, groups: List[DuplicateGroup], limit: Optional[int] = None
+) -> str:
+    """Returns the report of `find_duplicates` as text.
+
+    Lists up to ``limit`` groups with their occurrence count, size and
+    redundant tokens, the first line of the subtree and the token
+    indices of its occurrences, followed by the share of the document
+    that `shared_nodes` would let an exporter skip.
+    """
+    rows = [f"{'count':>7} {'size':>7} {'redundant':>10}  subtree"]
+    for group in groups[:limit]:
+        root = document.tokens[group.nodes[0]]
+        occurrences = ", ".join(str(node) for node in group.nodes[:8])
+        if len(group.nodes) > 8:
+            occurrences += ", ..."
+        rows.append(
+            f"{len(group.nodes):>7,} {group.size:>7,} {group.redundant:>10,}  "
+            f"{root.line.strip()}  [tokens {occurrences}]"
+        )
+    if limit is not None and len(groups) > limit:
+        rows.append(f"... {len(groups) - limit:,} more groups")
+    shared = len(shared_nodes(document))
+    share = shared / len(document) if len(document) else 0.0
+    rows.append(
+        f"groups: {len(groups):,}  tokens: {len(document):,}  "
+        f"in repeated subtrees: {shared:,} ({share:.1%})"
+    )
+    return "\n".join(rows)
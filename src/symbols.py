@@ -0,0 +1,99 @@
+from typing import Dict, Iterator, List, Optional, Set
+
+KEYWORD = "keyword"
+FUNCTION = "function"
+MODIFIER = "modifier"
+TRIGGER = "trigger"
+
+KINDS = (KEYWORD, FUNCTION, MODIFIER, TRIGGER)
+
+
+class SymbolTable:
+    """Interned strings of a Barrelman document, each with a small integer id.
+
+    Interning returns one shared string object for every occurrence of
+    the same text, so a keyword repeated on thousands of lines is stored
+    once, and two interned zones can be compared by id (or identity)
+    instead of character by character. Ids are assigned in order of
+    first appearance and are shared across kinds; the table also records
+    which ids were seen as keywords, functions, modifiers and triggers.
+    """
+
+    def __init__(self):
+        """Initializes an empty table."""
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._kinds: Dict[str, Set[int]] = {kind: set() for kind in KINDS}
+        # Zones already interned by intern_token, mapped to their shared copy
+        self._relations: Dict[str, str] = {}
+        self._modifiers: Dict[str, str] = {}
+        self._triggers: Dict[str, str] = {}
+
+    def intern(self, text: str, kind: Optional[str] = None) -> str:
+        """Returns the shared copy of ``text``, adding it if it is new.
+
+        With ``kind`` set, the symbol is also recorded as one of that kind.
+        """
+        ident = self._ids.get(text)
+        if ident is None:
+            ident = self._ids[text] = len(self.strings)
+            self.strings.append(text)
+        if kind is not None:
+            self._kinds[kind].add(ident)
+        return self.strings[ident]
+
+    def intern_token(self, token):
+        """Replaces the zones of a token with their shared copies, in place.
+
+        The keyword and function are recorded from the relation zone, and
+        the modifier and trigger from their own zones. Zones seen before
+        cost a single dictionary lookup each.
+        """
+        relation = token.zone_1_relation
+        if relation:
+            shared = self._relations.get(relation)
+            if shared is None:
+                keyword, _, function = relation.partition(" // ")
+                if keyword:
+                    self.intern(keyword, KEYWORD)
+                if function:
+                    self.intern(function, FUNCTION)
+                shared = self._relations[relation] = self.intern(relation)
+            token.zone_1_relation = shared
+        modifier = token.zone_2_modifier
+        if modifier:
+            shared = self._modifiers.get(modifier)
+            if shared is None:
+                shared = self._modifiers[modifier] = self.intern(modifier, MODIFIER)
+            token.zone_2_modifier = shared
+        trigger = token.zone_3_trigger
+        if trigger:
+            shared = self._triggers.get(trigger)
+            if shared is None:
+                shared = self._triggers[trigger] = self.intern(trigger, TRIGGER)
+            token.zone_3_trigger = shared
+        return token
+
+    def id(self, text: str) -> int:
+        """Returns the id of an interned string; raises KeyError if unknown."""
+        return self._ids[text]
+
+    def ids(self, kind: str) -> List[int]:
+        """Returns the ids recorded for a kind, in order of first appearance."""
+        return sorted(self._kinds[kind])
+
+    def names(self, kind: str) -> List[str]:
+        """Returns the strings recorded for a kind, in order of first appearance."""
+        return [self.strings[ident] for ident in self.ids(kind)]
+
+    def __getitem__(self, ident: int) -> str:
+        return self.strings[ident]
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.strings)
+
+    def __len__(self) -> int:
+        return len(self.strings)
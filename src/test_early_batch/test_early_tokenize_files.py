@@ -0,0 +1,64 @@
+import pytest
+
+from src.batch import FileResult, tokenize_files
+from src.lexer import BarrelmanLexer
+
+VALID = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+)
+INVALID = VALID + "bad :^: port\n"
+
+
+@pytest.fixture
+def paths(tmp_path):
+    paths = []
+    for number in range(12):
+        path = tmp_path / f"doc_{number}.bman"
+        path.write_text(INVALID if number % 5 == 0 else VALID * (number + 1))
+        paths.append(str(path))
+    return paths
+
+
+def _expected(path):
+    with open(path) as f:
+        lexer = BarrelmanLexer(f.read())
+    return lexer.tokenize(), lexer.diagnostics.diagnostics
+
+
+class TestTokenizeFiles:
+    @pytest.mark.happy_path
+    def test_serial_results_in_order(self, paths):
+        """Test that results follow the order of the paths."""
+        results = list(tokenize_files(paths))
+        assert [result.path for result in results] == paths
+        for result in results:
+            assert (result.tokens, result.diagnostics) == _expected(result.path)
+
+    @pytest.mark.happy_path
+    @pytest.mark.parametrize("executor", ["process", "thread"])
+    def test_pool_matches_serial(self, paths, executor):
+        """Test that a worker pool yields the serial results, in order."""
+        expected = list(tokenize_files(paths))
+        results = list(
+            tokenize_files(paths, workers=3, executor=executor, files_per_task=2)
+        )
+        assert results == expected
+        assert [result.failed for result in results] == [
+            number % 5 == 0 for number in range(12)
+        ]
+
+    @pytest.mark.edge_case
+    def test_read_errors_are_per_file(self, paths, tmp_path):
+        """Test that an unreadable file does not stop the other files."""
+        missing = str(tmp_path / "missing.bman")
+        results = list(tokenize_files([missing] + paths, workers=2, executor="thread"))
+        assert results[0] == FileResult(missing, error=results[0].error)
+        assert results[0].failed and "missing.bman" in results[0].error
+        assert len(results) == len(paths) + 1
+
+    @pytest.mark.edge_case
+    def test_unknown_executor(self, paths):
+        """Test that an unknown executor raises ValueError."""
+        with pytest.raises(ValueError):
+            list(tokenize_files(paths, executor="cluster"))
@@ -0,0 +1,88 @@
+import pytest
+
+from src.bmanc import TokenFile, dump_tokens, load_document, load_tokens
+from src.lexer import INFER_OUTCOME, BarrelmanLexer, BarrelmanToken
+from src.tree import build_tree
+
+SOURCE = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+    ":: EARTH // 1 OF 302,973 % BIRTH CONSCIOUS LIFEFORM\n"
+    " :: EARTH // 1 OF 1 % ESCAPE PLANETARY SILENCE -> PLANETARY ESCAPE\n"
+    ":: EARTH BIOSPHERE // HABITABLE MATCH é\n"
+)
+
+
+@pytest.fixture
+def tokens():
+    return BarrelmanLexer(SOURCE).tokenize()
+
+
+class TestBmanc:
+    @pytest.mark.happy_path
+    def test_round_trip(self, tokens, tmp_path):
+        """Test that tokens survive a dump and load unchanged."""
+        path = str(tmp_path / "doc.bmanc")
+        dump_tokens(tokens, path)
+        loaded = load_tokens(path)
+        assert loaded == tokens
+        assert all(isinstance(token, BarrelmanToken) for token in loaded)
+
+    @pytest.mark.happy_path
+    def test_lazy_access(self, tokens, tmp_path):
+        """Test that a TokenFile decodes single records on demand."""
+        path = str(tmp_path / "doc.bmanc")
+        dump_tokens(tokens, path)
+        with TokenFile(path) as token_file:
+            assert len(token_file) == len(tokens)
+            assert token_file[1] == tokens[1]
+            assert token_file[-1] == tokens[-1]
+            assert list(token_file) == tokens
+            with pytest.raises(IndexError):
+                token_file[len(tokens)]
+
+    @pytest.mark.happy_path
+    def test_document_round_trip(self, tokens, tmp_path):
+        """Test that a stored tree is read back instead of rebuilt."""
+        path = str(tmp_path / "doc.bmanc")
+        document = build_tree(tokens)
+        dump_tokens(document, path)
+        loaded = load_document(path)
+        assert loaded.tokens == tokens
+        assert loaded.parents == document.parents
+        assert loaded.depths == document.depths
+        assert loaded.subtree_sizes == document.subtree_sizes
+
+    @pytest.mark.edge_case
+    def test_outcome_stays_lazy(self, tmp_path):
+        """Test that explicit and inferred outcomes are both preserved."""
+        inferred = BarrelmanToken(":: A // B", ":: ", "A // B", None, None)
+        explicit = BarrelmanToken(":: A // B", ":: ", "A // B", None, None, "DONE")
+        path = str(tmp_path / "doc.bmanc")
+        dump_tokens([inferred, explicit], path)
+        loaded = load_tokens(path)
+        assert loaded[0]._zone_4_outcome is INFER_OUTCOME
+        assert loaded[1].zone_4_outcome == "DONE"
+
+    @pytest.mark.edge_case
+    def test_empty_and_nul_strings(self, tmp_path):
+        """Test empty token lists and strings containing NUL."""
+        path = str(tmp_path / "empty.bmanc")
+        dump_tokens([], path)
+        assert load_tokens(path) == []
+
+        token = BarrelmanToken(":: A\0B", ":: ", "A\0B", None, None)
+        dump_tokens([token], path)
+        assert load_tokens(path) == [token]
+
+    @pytest.mark.edge_case
+    def test_rejects_other_files(self, tmp_path):
+        """Test that files without the .bmanc header raise ValueError."""
+        path = tmp_path / "doc.bman"
+        path.write_text(SOURCE)
+        with pytest.raises(ValueError):
+            load_tokens(str(path))
+        path.write_bytes(b"")
+        with pytest.raises(ValueError):
+            load_tokens(str(path))
@@ -0,0 +1,94 @@
+import pytest
+
+from src.github_actions.bmanfmt import format_content, format_tokens, parse_line
+from src.github_actions.bmanlint import lint_file, main
+from src.lexer import BarrelmanLexer
+
+SOURCE = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+    "  :: INTENT // SPECIES PRESERVATION\n"
+)
+
+
+class TestFormatter:
+    @pytest.mark.happy_path
+    def test_parse_line_uses_lexer_zones(self):
+        assert parse_line(" :^: RACE[2] // STATUS % CRITICAL -> FAILURE") == {
+            "indent": " ",
+            "port": ":^:",
+            "zone1": "RACE[2]",
+            "zone2": "STATUS",
+            "zone3": "CRITICAL",
+            "zone4": "FAILURE",
+        }
+
+    @pytest.mark.happy_path
+    def test_format_content_aligns_zones(self):
+        assert format_content(SOURCE) == [
+            "::   THREAT   // AWAKENING CANDIDATE RACE % [2]",
+            " :^:  RACE[2]  // STATUS                   % CRITICAL  -> PLANETARY SYSTEM FAILURE",
+            "  ::   INTENT   // SPECIES PRESERVATION",
+        ]
+
+    @pytest.mark.happy_path
+    def test_format_tokens_matches_format_content(self):
+        tokens = BarrelmanLexer(SOURCE).tokenize(spans=True)
+        assert format_tokens(tokens) == format_content(SOURCE)
+
+    @pytest.mark.edge_case
+    def test_format_content_without_modifiers(self):
+        assert format_content(":: A // B\n:: CC // D -> E") == [
+            "::   A  // B",
+            "::   CC // D -> E",
+        ]
+
+    @pytest.mark.edge_case
+    def test_format_content_rejects_lexer_errors(self):
+        with pytest.raises(ValueError, match="E102|':\\^:' must be"):
+            format_content(SOURCE + "bad :^: port\n")
+
+    @pytest.mark.edge_case
+    def test_lint_file_reports_syntax_and_style(self, tmp_path, capsys):
+        formatted = tmp_path / "formatted.bman"
+        formatted.write_text("\n".join(format_content(SOURCE)) + "\n")
+        unformatted = tmp_path / "unformatted.bman"
+        unformatted.write_text(SOURCE)
+        invalid = tmp_path / "invalid.bman"
+        invalid.write_text(SOURCE + "bad :^: port\n")
+
+        assert lint_file(str(formatted)) == 0
+        assert lint_file(str(unformatted)) == 1
+        assert lint_file(str(invalid)) == 1
+        output = capsys.readouterr().out
+        assert f"[OK] {formatted}" in output
+        assert f"[STYLE ERROR] {unformatted}" in output
+        assert f"[SYNTAX ERROR] {invalid}" in output
+
+    @pytest.mark.edge_case
+    def test_lint_file_rejects_blank_lines(self, tmp_path):
+        spaced = tmp_path / "spaced.bman"
+        lines = format_content(SOURCE)
+        spaced.write_text(lines[0] + "\n\n" + "\n".join(lines[1:]) + "\n")
+        assert lint_file(str(spaced)) == 1
+
+    @pytest.mark.happy_path
+    def test_main_lints_files_in_parallel_with_cache(self, tmp_path, monkeypatch, capsys):
+        formatted = tmp_path / "formatted.bman"
+        formatted.write_text("\n".join(format_content(SOURCE)) + "\n")
+        unformatted = tmp_path / "unformatted.bman"
+        unformatted.write_text(SOURCE)
+        cache_dir = tmp_path / "cache"
+        monkeypatch.setenv("BARRELMAN_CACHE_DIR", str(cache_dir))
+        argv = ["bmanlint", "--workers", "2", str(formatted), str(unformatted)]
+        monkeypatch.setattr("sys.argv", argv)
+
+        for _ in range(2):
+            with pytest.raises(SystemExit):
+                main()
+            output = capsys.readouterr().out.splitlines()
+            assert output == [
+                f"[OK] {formatted}",
+                f"[STYLE ERROR] {unformatted} is not properly formatted.",
+            ]
+        assert len(list(cache_dir.iterdir())) == 2
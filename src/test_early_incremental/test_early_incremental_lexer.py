@@ -0,0 +1,127 @@
+import random
+
+import pytest
+
+from src.incremental import IncrementalLexer
+from src.lexer import BarrelmanLexer
+
+SOURCE = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+    "  :: RACE[2] // DANGER LEVEL % ABSOLUTE\n"
+    "\n"
+    ":^: INTENT // SPECIES PRESERVATION % ANY MEANS NECESSARY\n"
+    " :: TARGET ACQUISITION // EARTH BIOSPHERE % HABITABLE MATCH\n"
+)
+
+LINE_CHOICES = [
+    ":: A // B",
+    " :^: C // D % E",
+    "  :: F // G -> H",
+    "    :: I // J",
+    "",
+    ":^: K // L",
+    "   ",
+    "bad :^: port",
+]
+
+
+def expected_parents(lexer):
+    """Recomputes every line's parent from scratch by scanning backwards."""
+    line_tokens = lexer.line_tokens
+    parents = []
+    for index, token in enumerate(line_tokens):
+        parent = None
+        if token is not None:
+            for previous in range(index - 1, -1, -1):
+                candidate = line_tokens[previous]
+                if candidate is not None and (
+                    candidate.indent_level < token.indent_level
+                ):
+                    parent = candidate
+                    break
+        parents.append(parent)
+    return parents
+
+
+class TestIncrementalLexer:
+    @pytest.mark.happy_path
+    def test_initial_tokens_match_lexer(self):
+        """Test that the initial tokens match a full tokenize."""
+        lexer = IncrementalLexer(SOURCE)
+        assert lexer.tokens == BarrelmanLexer(SOURCE).tokenize()
+        assert lexer.parent_of(2) is lexer.line_tokens[1]
+        assert lexer.parent_of(6) is lexer.line_tokens[5]
+
+    @pytest.mark.happy_path
+    def test_edit_relexes_only_edited_lines(self):
+        """Test that an edit reports the re-lexed line range."""
+        lexer = IncrementalLexer(SOURCE)
+        untouched = lexer.line_tokens[0]
+        result = lexer.edit(2, 3, "  :: RACE[2] // AWAKENING % GRANTED")
+        assert result.changed == range(2, 3)
+        assert result.reparented == []
+        assert lexer.line_tokens[0] is untouched
+        assert lexer.line_tokens[2].zone_2_modifier == "GRANTED"
+
+    @pytest.mark.happy_path
+    def test_edit_reports_reparented_lines(self):
+        """Test that inserting a shallower line re-links the lines below it."""
+        lexer = IncrementalLexer(SOURCE)
+        result = lexer.edit(2, 2, " :: NEW PARENT // X")
+        assert result.changed == range(2, 3)
+        assert result.reparented == [3, 4]
+        assert lexer.parent_of(3) is lexer.line_tokens[2]
+
+    @pytest.mark.happy_path
+    def test_random_edits_match_full_retokenize(self):
+        """Differential test: random edits agree with re-lexing from scratch."""
+        rng = random.Random(7)
+        lexer = IncrementalLexer(SOURCE)
+        for _ in range(300):
+            size = len(lexer.lines)
+            start = rng.randint(0, size)
+            end = rng.randint(start, min(size, start + 3))
+            new_text = "\n".join(
+                rng.choice(LINE_CHOICES) for _ in range(rng.randint(0, 3))
+            )
+            lexer.edit(start, end, new_text)
+            relexed = [
+                BarrelmanLexer("").tokenize_line(text, i + 1)
+                for i, text in enumerate(lexer.lines)
+            ]
+            assert lexer.line_tokens == relexed
+            parents = [lexer.parent_of(i) for i in range(len(lexer.lines))]
+            assert parents == expected_parents(lexer)
+            full = BarrelmanLexer("\n".join(lexer.lines))
+            assert lexer.tokens == full.tokenize()
+            assert lexer.diagnostics == full.diagnostics.diagnostics
+
+    @pytest.mark.edge_case
+    def test_diagnostics_follow_their_line(self):
+        """Test that diagnostics are renumbered when lines move."""
+        lexer = IncrementalLexer(":: ROOT // TEST\nbad :^: port")
+        assert [d.line for d in lexer.diagnostics] == [2]
+        lexer.edit(0, 0, ":: FIRST // TEST\n:: SECOND // TEST")
+        assert [d.line for d in lexer.diagnostics] == [4]
+        lexer.edit(3, 4, " :^: PORT // TEST")
+        assert lexer.diagnostics == []
+
+    @pytest.mark.edge_case
+    def test_document_is_stripped_like_tokenize(self):
+        """Test that leading blank lines and indentation are normalized."""
+        lexer = IncrementalLexer(":: ROOT // TEST\nbad :^: port")
+        lexer.edit(0, 1, "\n   \n  :: ROOT // TEST")
+        full = BarrelmanLexer("\n".join(lexer.lines))
+        assert lexer.tokens == full.tokenize()
+        assert lexer.tokens[0].indent_level == 0
+        assert lexer.line_tokens[2].indent_level == 2
+        assert [d.line for d in lexer.diagnostics] == [2]
+
+    @pytest.mark.edge_case
+    def test_edit_out_of_range(self):
+        """Test that an edit outside the document raises IndexError."""
+        lexer = IncrementalLexer(SOURCE)
+        with pytest.raises(IndexError):
+            lexer.edit(5, 20, "")
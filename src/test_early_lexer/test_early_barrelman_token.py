@@ -0,0 +1,69 @@
+import pickle
+
+import pytest
+
+from src.lexer import INFER_OUTCOME, BarrelmanLexer, BarrelmanToken
+
+
+def make_token(**overrides):
+    fields = dict(
+        line=":: A // B % C",
+        zone_1_declaration="::",
+        zone_1_relation="A // B",
+        zone_2_modifier="C",
+        zone_3_trigger=None,
+        zone_4_outcome="Modifier only outcome: C",
+    )
+    fields.update(overrides)
+    return BarrelmanToken(**fields)
+
+
+class TestBarrelmanToken:
+    @pytest.mark.happy_path
+    def test_token_has_no_instance_dict(self):
+        """Test that tokens are slotted and carry no per-instance __dict__."""
+        token = make_token()
+        assert not hasattr(token, "__dict__")
+        with pytest.raises(AttributeError):
+            token.unknown_field = 1
+
+    @pytest.mark.happy_path
+    def test_token_defaults_and_equality(self):
+        """Test field defaults and value-based equality."""
+        token = make_token()
+        assert token.indent_level == 0
+        assert token.is_nesting_port is False
+        assert token == make_token()
+        assert token != make_token(indent_level=2)
+
+    @pytest.mark.happy_path
+    def test_token_repr_lists_fields(self):
+        """Test that repr shows every field."""
+        assert repr(make_token()).startswith("BarrelmanToken(line=':: A // B % C', ")
+
+    @pytest.mark.edge_case
+    def test_token_pickles(self):
+        """Test that slotted tokens survive a pickle round trip."""
+        token = make_token(indent_level=3, is_nesting_port=True)
+        assert pickle.loads(pickle.dumps(token)) == token
+
+    @pytest.mark.happy_path
+    def test_outcome_is_inferred_lazily(self):
+        """Test that the lexer defers the outcome string until it is read."""
+        token = BarrelmanLexer(":: A // B % C -> D").tokenize()[0]
+        assert token._zone_4_outcome is INFER_OUTCOME
+        assert token.zone_4_outcome == "Outcome inferred from % C -> D"
+        assert token._zone_4_outcome == "Outcome inferred from % C -> D"
+
+    @pytest.mark.happy_path
+    def test_lazy_outcome_equals_explicit_outcome(self):
+        """Test that a lazy token equals one built with the inferred outcome."""
+        assert make_token(zone_4_outcome=INFER_OUTCOME) == make_token()
+        assert make_token(zone_4_outcome=None).zone_4_outcome is None
+
+    @pytest.mark.edge_case
+    def test_lazy_outcome_survives_pickle(self):
+        """Test that pickling keeps an uninferred outcome lazy."""
+        token = pickle.loads(pickle.dumps(make_token(zone_4_outcome=INFER_OUTCOME)))
+        assert token._zone_4_outcome is INFER_OUTCOME
+        assert token.zone_4_outcome == "Modifier only outcome: C"
@@ -0,0 +1,102 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.diagnostics import (
+    ERROR,
+    NESTED_SPACING,
+    PARSE_FAILURE,
+    PORT_SPACING,
+    WARNING,
+    Diagnostic,
+    DiagnosticCollector,
+)
+from src.lexer import BarrelmanLexer
+
+SOURCE = (
+    ":: ROOT // TEST\n"
+    "bad :^: port\n"
+    " :^: PORT // TEST\n"
+    ":: NESTED   :: BLOCK\n"
+    "  :: CHILD // TEST\n"
+    "also bad :^: port\n"
+)
+
+
+class TestDiagnostics:
+    @pytest.mark.happy_path
+    def test_errors_are_collected_not_printed(self, capsys):
+        """Test that tokenize records diagnostics instead of printing them."""
+        lexer = BarrelmanLexer(SOURCE)
+        tokens = lexer.tokenize()
+        assert capsys.readouterr().out == ""
+        assert len(tokens) == 3
+        assert list(lexer.diagnostics) == [
+            Diagnostic(
+                2,
+                5,
+                PORT_SPACING,
+                ERROR,
+                "':^:' must be at the start of the line or have a single space before it.",
+            ),
+            Diagnostic(
+                4, 11, NESTED_SPACING, ERROR, "Extra spacing on nested '::' block."
+            ),
+            Diagnostic(
+                6,
+                10,
+                PORT_SPACING,
+                ERROR,
+                "':^:' must be at the start of the line or have a single space before it.",
+            ),
+        ]
+
+    @pytest.mark.happy_path
+    def test_render_matches_legacy_output(self):
+        """Test that rendered diagnostics keep the [Line N] ERROR: format."""
+        lexer = BarrelmanLexer(SOURCE)
+        lexer.tokenize()
+        assert lexer.diagnostics.render().splitlines() == [
+            lexer.validate_spacing("bad :^: port", 2),
+            lexer.validate_spacing(":: NESTED   :: BLOCK", 4),
+            lexer.validate_spacing("also bad :^: port", 6),
+        ]
+
+    @pytest.mark.happy_path
+    def test_parse_failure_is_recorded(self):
+        """Test that an exception while parsing becomes a diagnostic."""
+        lexer = BarrelmanLexer("")
+        with patch("src.lexer.find_markers", side_effect=ValueError("boom")):
+            assert lexer.tokenize_line(":: ROOT // TEST", 3) is None
+        (diagnostic,) = lexer.diagnostics
+        assert (diagnostic.line, diagnostic.code) == (3, PARSE_FAILURE)
+        assert str(diagnostic).startswith("[Line 3] ERROR: Failed to parse syntax")
+
+    @pytest.mark.edge_case
+    def test_stop_on_first_error(self):
+        """Test that tokenizing stops at the first error."""
+        lexer = BarrelmanLexer(SOURCE, DiagnosticCollector(stop_on_first_error=True))
+        tokens = lexer.tokenize()
+        assert len(tokens) == 1
+        assert [d.line for d in lexer.diagnostics] == [2]
+        assert lexer.diagnostics.stopped
+
+    @pytest.mark.edge_case
+    def test_max_errors(self):
+        """Test that tokenizing stops once max_errors errors were recorded."""
+        lexer = BarrelmanLexer(SOURCE, DiagnosticCollector(max_errors=2))
+        tokens = lexer.tokenize()
+        assert len(tokens) == 2
+        assert [d.line for d in lexer.diagnostics] == [2, 4]
+
+    @pytest.mark.edge_case
+    def test_warnings_do_not_count_towards_limit(self):
+        """Test that only errors count towards max_errors."""
+        collector = DiagnosticCollector(max_errors=1)
+        collector.add(Diagnostic(1, 1, "W001", WARNING, "first"))
+        assert not collector.stopped
+        collector.add(Diagnostic(2, 1, "E001", ERROR, "second"))
+        collector.add(Diagnostic(3, 1, "E001", ERROR, "dropped"))
+        assert collector.stopped
+        assert [d.message for d in collector] == ["first", "second"]
+        assert str(collector.diagnostics[0]) == "[Line 1] WARNING: first"
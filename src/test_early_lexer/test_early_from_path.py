@@ -0,0 +1,62 @@
+import pytest
+
+from src.lexer import BarrelmanLexer, MappedSource
+
+SOURCE = (
+    "\n\n"
+    "  :: INTELLIGENCE // EARTH NOT RARE % HUMAN RARE\n"
+    " :^: EARTH // 1 OF 302,973 % BIRTH CONSCIOUS LIFEFORM\n"
+    "\n"
+    "  :: EARTH // 1 OF 1 % ESCAPE PLANETARY SILENCE\n"
+    "\n"
+)
+
+
+@pytest.fixture
+def bman_file(tmp_path):
+    path = tmp_path / "doc.bman"
+    path.write_text(SOURCE, encoding="utf-8")
+    return str(path)
+
+
+class TestFromPath:
+    @pytest.mark.happy_path
+    def test_from_path_mmap_matches_in_memory_lexer(self, bman_file):
+        """Test that a memory-mapped lexer produces the same tokens."""
+        expected = BarrelmanLexer(SOURCE).tokenize()
+        with BarrelmanLexer.from_path(bman_file) as lexer:
+            assert isinstance(lexer.source, MappedSource)
+            assert lexer.tokenize() == expected
+
+    @pytest.mark.happy_path
+    def test_from_path_without_mmap_reads_source(self, bman_file):
+        """Test that mmap=False falls back to reading the file."""
+        lexer = BarrelmanLexer.from_path(bman_file, mmap=False)
+        assert lexer.source == BarrelmanLexer(SOURCE).source
+        assert len(lexer.tokenize()) == 3
+
+    @pytest.mark.happy_path
+    def test_mapped_source_lines_match_splitlines(self, bman_file):
+        """Test that mapped lines and line numbers follow strip().splitlines()."""
+        source = MappedSource(bman_file)
+        try:
+            assert list(source) == SOURCE.strip().splitlines()
+        finally:
+            source.close()
+
+    @pytest.mark.edge_case
+    def test_from_path_crlf_line_endings(self, tmp_path):
+        """Test that CRLF line endings are removed from mapped lines."""
+        path = tmp_path / "crlf.bman"
+        path.write_bytes(b":: A // B\r\n  :: C // D % E\r\n")
+        with BarrelmanLexer.from_path(str(path)) as lexer:
+            tokens = lexer.tokenize()
+        assert [t.line for t in tokens] == [":: A // B", "  :: C // D % E"]
+
+    @pytest.mark.edge_case
+    def test_from_path_empty_file(self, tmp_path):
+        """Test that an empty file can be opened and yields no tokens."""
+        path = tmp_path / "empty.bman"
+        path.write_bytes(b"")
+        with BarrelmanLexer.from_path(str(path)) as lexer:
+            assert lexer.tokenize() == []
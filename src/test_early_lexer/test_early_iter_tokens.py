@@ -0,0 +1,87 @@
+import io
+import tracemalloc
+
+import pytest
+
+from src.exporters.markdown_exporter import export_markdown
+from src.lexer import BarrelmanLexer, iter_source_lines, iter_tokens
+
+SOURCE = (
+    "\n"
+    "   :: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+    "\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+    "some text :^: invalid position\n"
+    ":^: INTENT // SPECIES PRESERVATION % ANY MEANS NECESSARY\n"
+)
+
+
+class TestIterTokens:
+    @pytest.mark.happy_path
+    def test_iter_tokens_matches_tokenize(self):
+        """Test that streaming a file object yields the same tokens as tokenize."""
+        expected = BarrelmanLexer(SOURCE).tokenize()
+        streamed = list(iter_tokens(io.StringIO(SOURCE)))
+        assert streamed == expected
+
+    @pytest.mark.happy_path
+    def test_iter_tokens_is_lazy(self):
+        """Test that tokens are produced one at a time from the file object."""
+        stream = io.StringIO(SOURCE)
+        tokens = iter_tokens(stream)
+        first = next(tokens)
+        assert first.zone_1_relation == "THREAT // AWAKENING CANDIDATE RACE"
+        assert first.indent_level == 0
+        assert stream.tell() < len(SOURCE)
+
+    @pytest.mark.happy_path
+    def test_lexer_iter_tokens_does_not_fill_token_list(self):
+        """Test that the lexer's own source can be streamed without storing tokens."""
+        lexer = BarrelmanLexer(SOURCE)
+        assert len(list(lexer.iter_tokens())) == 4
+        assert lexer.tokens == []
+
+    @pytest.mark.happy_path
+    def test_exporter_consumes_generator(self, tmp_path):
+        """Test that an exporter accepts the token generator directly."""
+        out = tmp_path / "out.md"
+        export_markdown(iter_tokens(io.StringIO(SOURCE)), str(out))
+        assert "RACE[2] // AWAKENING" in out.read_text()
+
+    @pytest.mark.edge_case
+    def test_iter_source_lines_mirrors_strip_splitlines(self):
+        """Test that line splitting matches the in-memory lexer."""
+        source = "\n\n  :: a\r\n\n   :: b\n\n"
+        assert list(iter_source_lines(io.StringIO(source))) == [
+            ":: a",
+            "",
+            "   :: b",
+            "",
+        ]
+        assert BarrelmanLexer(source).source == [":: a", "", "   :: b"]
+
+    @pytest.mark.edge_case
+    def test_iter_tokens_empty_file(self):
+        """Test that an empty file yields no tokens."""
+        assert list(iter_tokens(io.StringIO(""))) == []
+
+    @pytest.mark.edge_case
+    def test_iter_tokens_memory_is_flat(self):
+        """Test that streaming memory does not grow with the number of lines."""
+
+        def peak(lines):
+            source = (
+                f":: KEYWORD {n} // FUNCTION {n} % MODIFIER {n} -> TRIGGER {n}\n"
+                for n in range(lines)
+            )
+            tracemalloc.start()
+            for _ in iter_tokens(source):
+                pass
+            result = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return result
+
+        small, large = peak(2_000), peak(20_000)
+        # Every zone is distinct, so interning would grow tenfold here
+        assert large < small + 64 * 1024
@@ -0,0 +1,71 @@
+import pytest
+
+from src.diagnostics import DiagnosticCollector
+from src.lexer import BarrelmanLexer
+from src.profiling import PHASES, LexerProfile
+
+SOURCE = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+    "\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+    "bad :^: port\n"
+    ":: EARTH // HABITABLE MATCH\n"
+)
+
+
+class TestLexerProfile:
+    @pytest.mark.happy_path
+    def test_profiled_tokens_match(self):
+        """Test that profiling does not change tokens or diagnostics."""
+        plain = BarrelmanLexer(SOURCE)
+        profiled = BarrelmanLexer(SOURCE, profile=LexerProfile())
+        assert profiled.tokenize() == plain.tokenize()
+        assert profiled.diagnostics.diagnostics == plain.diagnostics.diagnostics
+
+    @pytest.mark.happy_path
+    def test_profiled_spans_match(self):
+        """Test that profiling does not change span tokens or diagnostics."""
+        plain = BarrelmanLexer(SOURCE)
+        profiled = BarrelmanLexer(SOURCE, profile=LexerProfile())
+        expected = [t.line for t in plain.tokenize(spans=True)]
+        assert [t.line for t in profiled.tokenize(spans=True)] == expected
+        assert profiled.diagnostics.diagnostics == plain.diagnostics.diagnostics
+
+    @pytest.mark.happy_path
+    def test_counts(self):
+        """Test that lines, tokens, skipped lines and errors are counted."""
+        profile = LexerProfile()
+        BarrelmanLexer(SOURCE, profile=profile).tokenize()
+        assert (profile.lines, profile.tokens, profile.skipped, profile.errors) == (
+            6,
+            4,
+            1,
+            1,
+        )
+        assert profile.calls["read"] == 7
+        assert profile.calls["spacing"] == 3
+        assert profile.calls["scan"] == 4
+        for phase in ("construct", "intern"):
+            assert profile.calls[phase] == 4
+        assert profile.total == pytest.approx(sum(profile.times.values()))
+        assert all(phase in profile.summary() for phase in PHASES)
+
+    @pytest.mark.happy_path
+    def test_callback(self):
+        """Test that the callback receives every measurement."""
+        seen = []
+        profile = LexerProfile(callback=lambda phase, seconds: seen.append(phase))
+        BarrelmanLexer(SOURCE, profile=profile).tokenize(spans=True)
+        assert len(seen) == sum(profile.calls.values())
+        assert "intern" not in seen
+
+    @pytest.mark.edge_case
+    def test_stops_at_error_limit(self):
+        """Test that a profiled run stops where an unprofiled one does."""
+        profile = LexerProfile()
+        lexer = BarrelmanLexer(
+            SOURCE, DiagnosticCollector(stop_on_first_error=True), profile
+        )
+        assert len(lexer.tokenize(workers=2)) == 3
+        assert profile.lines == 5 and profile.errors == 1
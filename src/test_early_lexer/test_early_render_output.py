@@ -0,0 +1,70 @@
+import io
+
+import pytest
+
+from src.lexer import BarrelmanLexer, write_lines
+
+SOURCE = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+    "INTENT -> SPECIES PRESERVATION\n"
+)
+
+
+@pytest.fixture
+def lexer():
+    lexer = BarrelmanLexer(SOURCE)
+    lexer.tokenize()
+    return lexer
+
+
+class TestRenderOutput:
+    @pytest.mark.happy_path
+    def test_outputs_match_stdout(self, lexer, capsys):
+        """Test that writing to a stream matches printing to stdout."""
+        for method in (lexer.render_syntax_tree, lexer.highlight):
+            method()
+            printed = capsys.readouterr().out
+            out = io.StringIO()
+            method(out=out)
+            assert out.getvalue() == printed
+            assert capsys.readouterr().out == ""
+
+    @pytest.mark.happy_path
+    def test_tree_visible_range_keeps_depth(self, lexer):
+        """Test that a visible range renders only its tokens, at their depth."""
+        out = io.StringIO()
+        lexer.render_syntax_tree(out=out, start=2, end=3)
+        assert out.getvalue() == (
+            "\nBARRELMAN SYNTAX TREE:\n\n"
+            "│   │   ├── RACE[2] // AWAKENING\n"
+            "│   │   │   ├── Modifier: DENIED\n"
+            "│   │   │   └── Outcome: Modifier only outcome: DENIED\n"
+        )
+
+    @pytest.mark.happy_path
+    def test_highlight_visible_range(self, lexer):
+        """Test that highlight renders only the tokens in the range."""
+        out = io.StringIO()
+        lexer.highlight(out=out, start=1)
+        lines = out.getvalue().splitlines()[3:]
+        assert len(lines) == 3
+        assert "STATUS" in lines[0]
+        assert "AWAKENING CANDIDATE" not in out.getvalue()
+
+    @pytest.mark.edge_case
+    def test_write_lines_batches(self, monkeypatch):
+        """Test that lines are written in batches with a trailing newline."""
+        monkeypatch.setattr("src.lexer.WRITE_BATCH_LINES", 2)
+        writes = []
+
+        class Recorder:
+            def write(self, text):
+                writes.append(text)
+
+        write_lines(Recorder(), ["a", "b", "c"])
+        assert writes == ["a\nb\n", "c\n"]
+        writes.clear()
+        write_lines(Recorder(), [])
+        assert writes == []
@@ -0,0 +1,57 @@
+import pytest
+
+from src.lexer import BarrelmanLexer, SpanToken, scan_spans
+
+LINES = [
+    ":: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE",
+    " :^: EARTH // 1 OF 302,973 % BIRTH CONSCIOUS LIFEFORM",
+    "  :: RACE[2] // AWAKENING -> DENIED",
+    ":: first // second // third",
+    ":: keyword //",
+    ":: invalid_syntax %",
+    "relation % modifier -> trigger",
+    "relation -> trigger",
+    "   bare relation   ",
+    "::// %->",
+]
+
+
+class TestScanSpans:
+    @pytest.mark.happy_path
+    @pytest.mark.parametrize("line", LINES)
+    def test_span_token_matches_token(self, line):
+        """Test that span tokens materialize exactly the default token fields."""
+        lexer = BarrelmanLexer("")
+        token = lexer.tokenize_line(line, 1)
+        span_token = lexer.tokenize_line(line, 1, spans=True)
+        assert isinstance(span_token, SpanToken)
+        assert span_token.to_token() == token
+
+    @pytest.mark.happy_path
+    def test_scan_spans_returns_offsets(self):
+        """Test the layout of the span tuple."""
+        line = " :^: EARTH // ONE % BIRTH -> LIFE"
+        spans = scan_spans(line)
+        assert spans[:2] == (1, 3)
+        assert line[spans[2] : spans[3]] == "EARTH"
+        assert line[spans[4] : spans[5]] == "ONE"
+        assert line[spans[6] : spans[7]] == "BIRTH"
+        assert line[spans[8] : spans[9]] == "LIFE"
+
+    @pytest.mark.happy_path
+    def test_tokenize_spans_mode(self):
+        """Test that tokenize(spans=True) yields lazily sliced tokens."""
+        tokens = BarrelmanLexer("\n".join(LINES[:3])).tokenize(spans=True)
+        assert [t.keyword for t in tokens] == ["RACE[2]", "EARTH", "RACE[2]"]
+        assert tokens[1].is_nesting_port is True
+        assert tokens[2].zone_3_trigger == "DENIED"
+
+    @pytest.mark.edge_case
+    def test_absent_zones_are_marked(self):
+        """Test that missing zones have a start of -1 and read as None."""
+        spans = scan_spans("bare relation")
+        assert spans[1] == 0
+        assert spans[4:] == (-1, -1, -1, -1, -1, -1)
+        token = SpanToken("bare relation", spans)
+        assert token.zone_1_declaration is None
+        assert token.zone_2_modifier is None
@@ -0,0 +1,64 @@
+import pytest
+
+from src.diagnostics import DiagnosticCollector
+from src.lexer import BarrelmanLexer
+
+BLOCK = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+    "\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+)
+SOURCE = BLOCK * 20 + "bad :^: port\n" + BLOCK * 20
+
+
+class TestTokenizeWorkers:
+    @pytest.mark.happy_path
+    def test_parallel_tokens_match_serial(self):
+        """Test that worker processes produce the serial result, in order."""
+        serial = BarrelmanLexer(SOURCE)
+        expected = serial.tokenize()
+
+        parallel = BarrelmanLexer(SOURCE)
+        assert parallel.tokenize(workers=2, chunk_size=7) == expected
+        assert parallel.diagnostics.diagnostics == serial.diagnostics.diagnostics
+
+    @pytest.mark.happy_path
+    def test_parallel_errors_keep_line_numbers(self):
+        """Test that errors from workers report original line numbers."""
+        lexer = BarrelmanLexer(SOURCE)
+        lexer.tokenize(workers=3, chunk_size=5)
+        assert [d.line for d in lexer.diagnostics] == [81]
+
+    @pytest.mark.edge_case
+    @pytest.mark.parametrize(
+        "max_errors, count, lines", [(0, 0, []), (1, 60, [81]), (2, 120, [81, 162])]
+    )
+    def test_parallel_stops_where_serial_stops(self, max_errors, count, lines):
+        """Test that an error limit cuts a parallel run at the same token."""
+        source = SOURCE + "bad :^: port\n" + BLOCK
+        serial = BarrelmanLexer(source, DiagnosticCollector(max_errors=max_errors))
+        expected = serial.tokenize()
+
+        parallel = BarrelmanLexer(source, DiagnosticCollector(max_errors=max_errors))
+        assert parallel.tokenize(workers=2, chunk_size=7) == expected
+        assert len(expected) == count
+        assert [d.line for d in parallel.diagnostics] == lines
+
+    @pytest.mark.happy_path
+    def test_parallel_spans_mode(self):
+        """Test that span tokens can be produced by worker processes."""
+        tokens = BarrelmanLexer(BLOCK * 4).tokenize(
+            spans=True, workers=2, chunk_size=3
+        )
+        assert [t.keyword for t in tokens[:3]] == ["THREAT", "RACE[2]", "RACE[2]"]
+
+    @pytest.mark.edge_case
+    def test_single_worker_runs_serially(self):
+        """Test that workers=1 tokenizes in-process."""
+        assert len(BarrelmanLexer(BLOCK).tokenize(workers=1)) == 3
+
+    @pytest.mark.edge_case
+    def test_parallel_empty_source(self):
+        """Test that an empty source yields no tokens with workers."""
+        assert BarrelmanLexer("").tokenize(workers=2) == []
@@ -0,0 +1,169 @@
+import random
+
+import pytest
+
+from src.lexer import BarrelmanLexer, BarrelmanToken
+from src.ports import keyword_words, reference_words, resolve_ports, token_keyword
+from src.tree import build_tree
+
+SOURCE = (
+    ":: INTELLIGENCE // EARTH NOT RARE % HUMAN RARE\n"
+    "  :: EARTH // 1 OF 302,973\n"
+    " :^: EARTH // 1 OF 302,973 % BIRTH CONSCIOUS LIFEFORM\n"
+    "  :: EARTH // 1 OF 1 % ESCAPE PLANETARY SILENCE\n"
+    ":: GENUS HOMO // 17,851 OF 302,973\n"
+    " :^: PLANETARY SILENCE // HIDDEN\n"
+    ":^: INTELLIGENCE // REFERENCE\n"
+)
+
+
+def make_token(indent, keyword, port=False):
+    declaration = ":^:" if port else "::"
+    return BarrelmanToken(keyword, declaration, keyword, None, None, None, indent, port)
+
+
+def brute_force_targets(tokens):
+    """Resolves every port by scanning backwards through visible tokens."""
+    document = build_tree(tokens)
+    targets = {}
+    for index, token in enumerate(tokens):
+        if not token.is_nesting_port:
+            continue
+        wanted = keyword_words(token_keyword(token))
+        if not wanted:
+            continue
+        scopes = set(document.ancestors(index)) | {-1}
+        declarations = [
+            candidate
+            for candidate in range(index - 1, -1, -1)
+            if not tokens[candidate].is_nesting_port
+            and token_keyword(tokens[candidate])
+            and document.parents[candidate] in scopes
+        ]
+        for candidate in declarations:
+            if wanted <= reference_words(tokens[candidate]):
+                targets[index] = candidate
+                break
+        else:
+            if document.parents[index] == -1:
+                roots = [c for c in declarations if document.parents[c] == -1]
+                if roots:
+                    targets[index] = roots[0]
+    return targets
+
+
+class TestResolvePorts:
+    @pytest.mark.happy_path
+    def test_ports_link_to_visible_declarations(self):
+        """Test that ports resolve to the most recent visible declaration."""
+        tokens = BarrelmanLexer(SOURCE).tokenize()
+        links = resolve_ports(tokens)
+        assert links.targets == {2: 1, 6: 0}
+        assert links.target(2) == 1
+        assert links.target(0) is None
+
+    @pytest.mark.happy_path
+    def test_closed_blocks_hide_their_declarations(self):
+        """Test that a declaration inside a closed block is not visible."""
+        links = resolve_ports(BarrelmanLexer(SOURCE).tokenize())
+        assert links.unresolved == [5]
+
+    @pytest.mark.edge_case
+    def test_inner_declaration_shadows_outer(self):
+        """Test that the nearest declaration wins and scopes restore on close."""
+        tokens = [
+            make_token(0, "A"),
+            make_token(1, "B"),
+            make_token(2, "A"),
+            make_token(3, "A", port=True),
+            make_token(1, "A", port=True),
+        ]
+        assert resolve_ports(tokens).targets == {3: 2, 4: 0}
+
+    @pytest.mark.edge_case
+    def test_port_without_keyword_is_unresolved(self):
+        """Test that an empty port keyword never resolves."""
+        tokens = [make_token(0, ""), make_token(1, "", port=True)]
+        assert resolve_ports(tokens).unresolved == [1]
+
+    @pytest.mark.happy_path
+    def test_random_documents_match_brute_force(self):
+        """Differential test against a backwards scan of visible tokens."""
+        rng = random.Random(5)
+        for _ in range(200):
+            tokens = [
+                make_token(
+                    rng.randint(0, 4),
+                    rng.choice(["A", "B", "A B", "C[2]", "B C"]),
+                    rng.random() < 0.3,
+                )
+                for _ in range(rng.randint(0, 40))
+            ]
+            links = resolve_ports(tokens)
+            expected = brute_force_targets(tokens)
+            assert links.targets == expected
+            ports = [i for i, t in enumerate(tokens) if t.is_nesting_port]
+            assert links.unresolved == [i for i in ports if i not in expected]
+
+    @pytest.mark.happy_path
+    def test_syntax_examples_resolve(self):
+        """Test that the OK examples of SYNTAX.md resolve every port."""
+        source = (
+            ":: INTELLIGENCE // EARTH NOT RARE % HUMAN RARE\n"
+            " :^: EARTH // 1 OF 302,973 % BIRTH CONSCIOUS LIFEFORM\n"
+            "  :: EARTH // 1 OF 1 % ESCAPE PLANETARY SILENCE\n"
+            ":: INTELLIGENCE // HUMAN RACE % YOUNGEST OF [4]\n"
+            " :^: HUMAN RACE // EVOLUTION RATE % +476 PERCENTILE\n"
+            ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+            " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+            "  :: RACE[2] // AWAKENING % DENIED\n"
+            ":^: INTENT // SPECIES PRESERVATION % ANY MEANS NECESSARY\n"
+            " :: TARGET ACQUISITION // EARTH BIOSPHERE % HABITABLE MATCH\n"
+            ":: CONDITIONAL // ASSISTANCE % RACE[1]\n"
+            " :^: RACE[1] // POSSIBLE HUMAN ASSISTANCE % PENDING -> AWAKENING\n"
+        )
+        links = resolve_ports(BarrelmanLexer(source).tokenize())
+        assert links.unresolved == []
+        # INTENT is the hierarchical modifier port of the THREAT block
+        assert links.targets == {1: 0, 4: 3, 6: 5, 8: 5, 11: 10}
+
+    @pytest.mark.happy_path
+    @pytest.mark.parametrize("path", ["src/barrelman.bman", "docs/BARRELEXAMPLE.bman"])
+    def test_bundled_documents_resolve(self, path):
+        """Test that the example documents have no unresolved port."""
+        with BarrelmanLexer.from_path(path) as lexer:
+            tokens = lexer.tokenize()
+        assert any(token.is_nesting_port for token in tokens)
+        assert resolve_ports(tokens).unresolved == []
+
+    @pytest.mark.edge_case
+    def test_syntax_example_with_double_spaced_port(self):
+        """Test the INCORRECT example of SYNTAX.md with two spaces before ':^:'."""
+        lexer = BarrelmanLexer(
+            ":: INTELLIGENCE // EARTH NOT RARE % HUMAN RARE\n"
+            "  :^: EARTH // 1 OF 302,973 % BIRTH CONSCIOUS LIFEFORM\n"
+            "    :: EARTH // 1 OF 1 % ESCAPE PLANETARY SILENCE\n"
+        )
+        links = resolve_ports(lexer.tokenize())
+        assert [d.code for d in lexer.diagnostics] == ["E102"]
+        assert links.targets == {} and links.unresolved == []
+
+    @pytest.mark.edge_case
+    def test_syntax_example_with_misaligned_line_string(self):
+        """Test that a misaligned line string under a port leaves the port valid."""
+        tokens = BarrelmanLexer(
+            ":: INTELLIGENCE // EARTH NOT RARE % HUMAN RARE\n"
+            " :^: EARTH // 1 OF 302,973 % BIRTH CONSCIOUS LIFEFORM\n"
+            "   :: EARTH // 1 OF 1 % ESCAPE PLANETARY SILENCE\n"
+        ).tokenize()
+        assert resolve_ports(tokens).targets == {1: 0}
+
+    @pytest.mark.edge_case
+    def test_port_needs_every_keyword_word(self):
+        """Test that a keyword matching only part of a line does not resolve."""
+        tokens = BarrelmanLexer(
+            ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+            " :^: RACE[3] // STATUS % CRITICAL\n"
+            " :^: HUMAN RACE // STATUS % CRITICAL\n"
+        ).tokenize()
+        assert resolve_ports(tokens).unresolved == [1, 2]
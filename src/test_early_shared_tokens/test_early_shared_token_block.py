@@ -0,0 +1,58 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from src.lexer import BarrelmanLexer
+from src.shared_tokens import SharedTokenBlock, read_shared_tokens
+from src.tree import build_tree
+
+SOURCE = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+    ":: EARTH // 1 OF 302,973 % BIRTH CONSCIOUS LIFEFORM\n"
+)
+
+
+@pytest.fixture
+def tokens():
+    return BarrelmanLexer(SOURCE * 10).tokenize()
+
+
+class TestSharedTokenBlock:
+    @pytest.mark.happy_path
+    def test_attach_reads_owner_tokens(self, tokens):
+        """Test that a reader decodes the tokens the owner shared."""
+        with SharedTokenBlock.create(tokens) as block:
+            assert block.owner
+            with SharedTokenBlock.attach(block.name) as reader:
+                assert not reader.owner
+                assert len(reader) == len(tokens)
+                assert reader[5] == tokens[5]
+                assert reader.tokens() == tokens
+
+    @pytest.mark.happy_path
+    def test_fan_out_to_workers(self, tokens):
+        """Test that pool workers attach to the block by name."""
+        with SharedTokenBlock.create(build_tree(tokens)) as block:
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                results = list(pool.map(read_shared_tokens, [block.name] * 3))
+        assert results == [tokens] * 3
+
+    @pytest.mark.edge_case
+    def test_owner_unlinks_on_exit(self, tokens):
+        """Test that the segment is gone once the owner's block exits."""
+        with SharedTokenBlock.create(tokens) as block:
+            name = block.name
+        with pytest.raises(FileNotFoundError):
+            SharedTokenBlock.attach(name)
+
+    @pytest.mark.edge_case
+    def test_reader_cannot_unlink(self, tokens):
+        """Test that only the owner may unlink the segment."""
+        with SharedTokenBlock.create(tokens) as block:
+            with SharedTokenBlock.attach(block.name) as reader:
+                decoded = reader.tokens()
+                with pytest.raises(ValueError):
+                    reader.unlink()
+        assert decoded == tokens
@@ -0,0 +1,142 @@
+import random
+from collections import Counter
+
+import pytest
+
+from src.lexer import BarrelmanLexer
+from src.stats import CorpusStats, HeavyHitters, corpus_stats, parse_stats_args
+from src.tree import build_tree
+
+SOURCE = (
+    ":: THREAT // AWAKENING % CANDIDATE -> STATUS\n"
+    " :^: THREAT // STATUS % CRITICAL\n"
+    " :: EARTH // BIOSPHERE\n"
+    "  :: MATCH // SELECTED -> STATUS\n"
+    "\n"
+    "  :: HUMAN // RARE\n"
+    ":: THREAT // INTENT % CRITICAL\n"
+    "bad :^: port\n"
+)
+
+
+class TestHeavyHitters:
+    @pytest.mark.happy_path
+    def test_exact_below_capacity(self):
+        hitters = HeavyHitters(10)
+        hitters.update("abracadabra")
+        assert hitters.top(2) == [("a", 5, 0), ("b", 2, 0)]
+        assert hitters.total == 11
+
+    @pytest.mark.happy_path
+    def test_counts_are_bounded_by_their_errors(self):
+        rng = random.Random(0)
+        items = [f"k{int(rng.paretovariate(1.1))}" for _ in range(20000)]
+        hitters = HeavyHitters(20)
+        for item in items:
+            hitters.add(item)
+        exact = Counter(items)
+        assert len(hitters) == 20
+        for item, count, error in hitters.top(20):
+            assert exact[item] <= count <= exact[item] + error
+        # Every item above total / capacity is tracked
+        frequent = {item for item, count in exact.items() if count > len(items) / 20}
+        assert frequent <= set(hitters.counts)
+        assert [item for item, _, _ in hitters.top(3)] == [
+            item for item, _ in exact.most_common(3)
+        ]
+
+    @pytest.mark.edge_case
+    def test_rejects_empty_capacity(self):
+        with pytest.raises(ValueError):
+            HeavyHitters(0)
+
+
+class TestCorpusStats:
+    @pytest.mark.happy_path
+    def test_counts(self):
+        stats = CorpusStats()
+        stats.add_text(SOURCE)
+        assert (stats.lines, stats.blank_lines, stats.tokens) == (8, 1, 6)
+        assert stats.bytes == len(SOURCE)
+        assert stats.ports == 1
+        assert stats.port_ratio == pytest.approx(1 / 6)
+        assert stats.diagnostics == {"E102": 1}
+        assert stats.errors == 1
+        assert stats.depths == {0: 2, 1: 2, 2: 2}
+        # THREAT has two children, EARTH two, the rest none
+        assert stats.fan_out == {0: 4, 2: 2}
+        assert stats.keywords.top(1) == [("THREAT", 3, 0)]
+        assert stats.modifiers.top(1) == [("CRITICAL", 2, 0)]
+        assert stats.triggers.top(1) == [("STATUS", 2, 0)]
+
+    @pytest.mark.happy_path
+    def test_matches_the_document_tree(self):
+        indents = [0, 1, 2, 4, 4, 2, 1, 0, 1, 2, 4, 6, 1]
+        source = "\n".join(
+            f"{' ' * indent}:: K{index} // F" for index, indent in enumerate(indents)
+        )
+        stats = CorpusStats()
+        stats.add_text(source)
+        document = build_tree(BarrelmanLexer(source).tokenize())
+        assert stats.depths == Counter(document.depths)
+        assert stats.fan_out == Counter(
+            len(list(document.children(index))) for index in range(len(document))
+        )
+
+    @pytest.mark.happy_path
+    def test_directory(self, tmp_path):
+        (tmp_path / "a.bman").write_text(SOURCE)
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "nested" / "b.bman").write_text(SOURCE)
+        (tmp_path / "notes.txt").write_text("not barrelman")
+        stats = corpus_stats([str(tmp_path)], top=2)
+        assert stats.files == 2
+        assert stats.tokens == 12
+        assert stats.keywords.capacity == 20
+        data = stats.as_dict(top=2)
+        assert data["keywords"][0] == {"value": "THREAT", "count": 6, "error": 0}
+        assert data["diagnostics"] == {"E102": 2}
+        assert "THREAT" in stats.summary(top=2)
+
+    @pytest.mark.edge_case
+    def test_top_zero_keeps_one_counter(self, tmp_path):
+        path = tmp_path / "a.bman"
+        path.write_text(SOURCE)
+        stats = corpus_stats([str(path)], top=0)
+        assert stats.keywords.capacity == 1
+        assert stats.as_dict(top=0)["keywords"] == []
+
+    @pytest.mark.edge_case
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.bman"
+        path.write_text("")
+        stats = corpus_stats([str(path)])
+        assert (stats.files, stats.lines, stats.tokens, stats.errors) == (1, 0, 0, 0)
+        assert stats.port_ratio == 0.0
+        stats.summary()
+
+
+class TestParseStatsArgs:
+    @pytest.mark.happy_path
+    def test_defaults(self):
+        args = parse_stats_args(["docs"])
+        assert (args.paths, args.top, args.capacity, args.json) == (
+            ["docs"],
+            10,
+            None,
+            False,
+        )
+
+    @pytest.mark.edge_case
+    @pytest.mark.parametrize(
+        "option, message",
+        [
+            ("--top", "--top must be at least 1"),
+            ("--capacity", "--capacity must be at least 1"),
+        ],
+    )
+    def test_rejects_zero(self, option, message, capsys):
+        with pytest.raises(SystemExit) as exit_info:
+            parse_stats_args(["docs", option, "0"])
+        assert exit_info.value.code == 2
+        assert message in capsys.readouterr().err
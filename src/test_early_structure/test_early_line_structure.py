@@ -0,0 +1,80 @@
+import pytest
+
+from src.lexer import BarrelmanLexer
+from src.structure import BLANK, DECLARATION, PORT, TEXT, LineStructure
+from src.tree import build_tree
+
+SOURCE = (
+    "\n"
+    "   :: THREAT // AWAKENING CANDIDATE RACE % [2]\r\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+    "\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+    "   \t\n"
+    "bad :^: port\n"
+    "  :^: indented port\n"
+    ":: NESTED // ONE  :: TWO\n"
+    "    :: ÉTAT // ÉLAN % ÜBER\n"
+    "plain text // only\n"
+    ":^: INTENT // SPECIES PRESERVATION\n"
+)
+
+IMPLEMENTATIONS = [
+    pytest.param(False, id="python"),
+    pytest.param(True, id="numpy"),
+]
+
+
+def _structure(source, vectorized):
+    if vectorized:
+        pytest.importorskip("numpy")
+    return LineStructure.from_text(source, vectorized=vectorized)
+
+
+@pytest.mark.parametrize("vectorized", IMPLEMENTATIONS)
+class TestLineStructure:
+    @pytest.mark.happy_path
+    def test_columns(self, vectorized):
+        """Test the indents and kinds of every line."""
+        structure = _structure(SOURCE, vectorized)
+        assert len(structure) == 11
+        assert list(structure.indents) == [0, 1, 0, 2, 4, 0, 2, 0, 4, 0, 0]
+        assert list(structure.kinds) == [
+            DECLARATION, PORT, BLANK, DECLARATION, BLANK, TEXT,
+            PORT, DECLARATION, DECLARATION, TEXT, PORT,
+        ]
+        assert structure.text(0) == ":: THREAT // AWAKENING CANDIDATE RACE % [2]"
+        assert structure.text(8) == "    :: ÉTAT // ÉLAN % ÜBER"
+
+    @pytest.mark.happy_path
+    def test_matches_lexer(self, vectorized):
+        """Test that diagnostics, tokens and tree match the lexer's."""
+        lexer = BarrelmanLexer(SOURCE)
+        tokens = lexer.tokenize()
+        structure = _structure(SOURCE, vectorized)
+        assert structure.spacing_diagnostics() == lexer.diagnostics.diagnostics
+        assert structure.indent_histogram() == {0: 3, 1: 1, 2: 1, 4: 1}
+
+        document = structure.tree()
+        assert list(document.tokens) == tokens
+        expected = build_tree(tokens)
+        assert document.parents == expected.parents
+        assert document.subtree_sizes == expected.subtree_sizes
+
+    @pytest.mark.edge_case
+    def test_empty_and_single_line(self, vectorized):
+        """Test documents without lines and without a final newline."""
+        assert len(_structure(" \n\n ", vectorized)) == 0
+        structure = _structure(":: ONE // TWO", vectorized)
+        assert structure.token_lines() == [0]
+        assert len(structure.tree()) == 1
+
+
+class TestLineStructureFromPath:
+    @pytest.mark.happy_path
+    def test_from_path(self, tmp_path):
+        """Test that a mapped file gives the structure of its text."""
+        path = tmp_path / "doc.bman"
+        path.write_bytes(SOURCE.encode("utf-8"))
+        with LineStructure.from_path(str(path), vectorized=False) as structure:
+            assert structure.token_lines() == [0, 1, 3, 8, 9, 10]
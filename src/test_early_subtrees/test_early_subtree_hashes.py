@@ -0,0 +1,185 @@
+import re
+
+import pytest
+
+from src.exporters.graphviz.dot_exporter import export_dot_graph
+from src.lexer import BarrelmanLexer
+from src.subtrees import (
+    find_duplicates,
+    render_duplicates,
+    render_subtrees,
+    shared_nodes,
+    subtree_hashes,
+)
+from src.tree import build_tree
+from tools.gen_corpus import generate
+
+# The EARTH block appears under both top-level declarations, and again
+# two levels deeper, where its children are double spaced
+SOURCE = """
+:: THREAT // AWAKENING
+ :: EARTH // BIOSPHERE % HABITABLE
+  :: MATCH // SELECTED
+  :: HUMAN // RARE
+:: INTENT // SPECIES
+ :: EARTH // BIOSPHERE % HABITABLE
+  :: MATCH // SELECTED
+  :: HUMAN // RARE
+ :: TARGET // ACQUISITION
+  :: EARTH // BIOSPHERE % HABITABLE
+    :: MATCH // SELECTED
+    :: HUMAN // RARE
+"""
+
+
+@pytest.fixture
+def document():
+    return build_tree(BarrelmanLexer(SOURCE).tokenize())
+
+
+class TestSubtreeHashes:
+    @pytest.mark.happy_path
+    def test_identical_blocks_share_a_digest(self, document):
+        digests = subtree_hashes(document)
+        assert digests[1] == digests[5] == digests[9]
+        assert digests[2] == digests[6] == digests[10]
+        assert digests[0] != digests[4]
+        assert len(set(digests)) == 6
+
+    @pytest.mark.happy_path
+    def test_relative_indents_are_hashed_on_request(self, document):
+        digests = subtree_hashes(document, indents=True)
+        assert digests[1] == digests[5]
+        assert digests[1] != digests[9]
+        # Leaves have no children, whose indents could differ
+        assert digests[2] == digests[10]
+
+    @pytest.mark.edge_case
+    def test_child_order_matters(self):
+        swapped = SOURCE.replace(
+            "  :: MATCH // SELECTED\n  :: HUMAN // RARE\n:: INTENT",
+            "  :: HUMAN // RARE\n  :: MATCH // SELECTED\n:: INTENT",
+        )
+        digests = subtree_hashes(BarrelmanLexer(swapped).tokenize())
+        assert digests[1] != digests[5]
+        assert digests[5] == digests[9]
+
+    @pytest.mark.edge_case
+    def test_empty_document(self):
+        assert subtree_hashes([]) == []
+        assert find_duplicates([]) == []
+
+
+class TestFindDuplicates:
+    @pytest.mark.happy_path
+    def test_reports_maximal_groups(self, document):
+        groups = find_duplicates(document)
+        assert [(group.nodes, group.size, group.redundant) for group in groups] == [
+            ([1, 5, 9], 3, 6)
+        ]
+
+    @pytest.mark.happy_path
+    def test_min_size_one_reports_repeated_leaves_once(self, document):
+        groups = find_duplicates(document, min_size=1)
+        # The leaves only ever repeat inside the repeated EARTH blocks
+        assert [group.nodes for group in groups] == [[1, 5, 9]]
+
+    @pytest.mark.happy_path
+    def test_report(self, document):
+        report = render_duplicates(document, find_duplicates(document))
+        assert ":: EARTH // BIOSPHERE % HABITABLE  [tokens 1, 5, 9]" in report
+        assert report.endswith("groups: 1  tokens: 12  in repeated subtrees: 6 (50.0%)")
+
+
+class TestRenderOnce:
+    @pytest.mark.happy_path
+    def test_output_matches_plain_rendering(self, document):
+        calls = []
+
+        def render(token):
+            calls.append(token)
+            return f"{token.indent_level}|{token.line.strip()}\n"
+
+        expected = "".join(f"{t.indent_level}|{t.line.strip()}\n" for t in document.tokens)
+        assert "".join(render_subtrees(document, render)) == expected
+        # The second EARTH block at indent 1 is reused; the deeper one is not
+        assert len(calls) == len(document) - 3
+
+    @pytest.mark.happy_path
+    def test_cache_is_shared_across_calls(self, document):
+        cache = {}
+        first = "".join(
+            render_subtrees(document, lambda token: token.line + "\n", cache=cache)
+        )
+        calls = []
+
+        def render(token):
+            calls.append(token)
+            return token.line + "\n"
+
+        assert "".join(render_subtrees(document, render, cache=cache)) == first
+        # Both EARTH blocks at indent 1 now come from the cache
+        assert [document.tokens.index(token) for token in calls] == [0, 4, 8, 9, 10, 11]
+        assert len(cache) == 1
+
+
+class TestSharedNodes:
+    @pytest.mark.happy_path
+    def test_maps_later_occurrences(self, document):
+        assert shared_nodes(document) == {
+            5: 1, 6: 2, 7: 3, 9: 1, 10: 2, 11: 3,
+        }
+
+    @pytest.mark.happy_path
+    def test_dot_dedupe_points_parents_at_one_copy(self, document, tmp_path):
+        plain, deduped = tmp_path / "plain.dot", tmp_path / "deduped.dot"
+        export_dot_graph(document, str(plain))
+        export_dot_graph(document, str(deduped), {"dedupe": True})
+        text = deduped.read_text()
+        assert text.count("[label=") == 6
+        assert plain.read_text().count("[label=") == 12
+        assert "  node4 -> node1;\n" in text
+        assert "  node8 -> node1;\n" in text
+        assert text.count("  node1 -> node2;\n") == 1
+
+    @pytest.mark.edge_case
+    @pytest.mark.parametrize(
+        "source",
+        [
+            ":: R // x\n :: A // y\n:: S // z\n :: A // y",
+            # The first occurrence is a root, the later one a child
+            ":: A // y\n:: S // z\n :: A // y\n:: T // w\n :: A // y",
+            "\n".join(generate(400, vocab=8, repeat_rate=0.9, line_length=8)),
+        ],
+    )
+    def test_dot_dedupe_is_acyclic_and_reaches_every_node(self, source, tmp_path):
+        document = build_tree(BarrelmanLexer(source).tokenize())
+        aliases = shared_nodes(document)
+        path = tmp_path / "deduped.dot"
+        export_dot_graph(document, str(path), {"dedupe": True})
+        text = path.read_text()
+        nodes = {int(n) for n in re.findall(r"^  node(\d+) \[label=", text, re.M)}
+        edges = re.findall(r"^  node(\d+) -> node(\d+);", text, re.M)
+        edges = [(int(source_node), int(target)) for source_node, target in edges]
+        successors = {node: [] for node in nodes}
+        for source_node, target in edges:
+            assert source_node in nodes and target in nodes
+            successors[source_node].append(target)
+
+        # Depth-first search from the first node, failing on a back edge
+        state = dict.fromkeys(nodes, 0)
+        stack = [(0, iter(successors[0]))]
+        state[0] = 1
+        while stack:
+            node, pending = stack[-1]
+            for target in pending:
+                assert state[target] != 1, f"cycle through node{target}"
+                if state[target] == 0:
+                    state[target] = 1
+                    stack.append((target, iter(successors[target])))
+                    break
+            else:
+                state[node] = 2
+                stack.pop()
+        reached = {node for node, seen in state.items() if seen}
+        assert {aliases.get(i, i) for i in range(len(document))} == reached == nodes
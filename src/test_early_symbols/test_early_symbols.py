@@ -0,0 +1,74 @@
+import pytest
+
+from src.lexer import BarrelmanLexer
+from src.symbols import FUNCTION, KEYWORD, MODIFIER, TRIGGER, SymbolTable
+from src.token_cache import TokenCache
+
+SOURCE = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+    "  :: RACE[2] // STATUS % CRITICAL\n"
+    "  :: EARTH\n"
+    "INTENT -> PLANETARY SYSTEM FAILURE\n"
+)
+
+
+class TestSymbolTable:
+    @pytest.mark.happy_path
+    def test_intern_assigns_ids_in_order(self):
+        """Test that interning returns shared strings with sequential ids."""
+        symbols = SymbolTable()
+        first = symbols.intern("".join(["EAR", "TH"]))
+        second = symbols.intern("".join(["EA", "RTH"]))
+        assert first is second
+        assert symbols.intern("MOON") == "MOON"
+        assert symbols.id("EARTH") == 0
+        assert symbols[1] == "MOON"
+        assert len(symbols) == 2
+        assert "MOON" in symbols and "SUN" not in symbols
+
+    @pytest.mark.happy_path
+    def test_lexer_interns_token_zones(self):
+        """Test that equal zones of different tokens share one string."""
+        lexer = BarrelmanLexer(SOURCE)
+        tokens = lexer.tokenize()
+        assert tokens[1].zone_1_relation is tokens[2].zone_1_relation
+        assert tokens[1].zone_2_modifier is tokens[2].zone_2_modifier
+        assert tokens[1].zone_3_trigger is tokens[4].zone_3_trigger
+
+    @pytest.mark.happy_path
+    def test_lexer_records_kinds(self):
+        """Test that keywords, functions, modifiers and triggers are recorded."""
+        lexer = BarrelmanLexer(SOURCE)
+        lexer.tokenize()
+        symbols = lexer.symbols
+        assert symbols.names(KEYWORD) == ["THREAT", "RACE[2]", "EARTH", "INTENT"]
+        assert symbols.names(FUNCTION) == ["AWAKENING CANDIDATE RACE", "STATUS"]
+        assert symbols.names(MODIFIER) == ["[2]", "CRITICAL"]
+        assert symbols.names(TRIGGER) == ["PLANETARY SYSTEM FAILURE"]
+        assert symbols.id("RACE[2]") in symbols.ids(KEYWORD)
+
+    @pytest.mark.edge_case
+    def test_spans_mode_is_not_interned(self):
+        """Test that span tokens leave the symbol table empty."""
+        lexer = BarrelmanLexer(SOURCE)
+        lexer.tokenize(spans=True)
+        assert len(lexer.symbols) == 0
+
+    @pytest.mark.edge_case
+    def test_parallel_tokens_are_interned(self):
+        """Test that tokens from worker processes share the parent's strings."""
+        lexer = BarrelmanLexer(SOURCE * 4)
+        tokens = lexer.tokenize(workers=2, chunk_size=3)
+        assert tokens[1].zone_1_relation is tokens[-3].zone_1_relation
+        assert lexer.symbols.names(KEYWORD) == ["THREAT", "RACE[2]", "EARTH", "INTENT"]
+
+    @pytest.mark.edge_case
+    def test_cache_hit_fills_symbol_table(self, tmp_path):
+        """Test that tokens loaded from the cache are interned too."""
+        cache = TokenCache(str(tmp_path))
+        BarrelmanLexer(SOURCE).tokenize(cache=cache)
+        lexer = BarrelmanLexer(SOURCE)
+        tokens = lexer.tokenize(cache=cache)
+        assert tokens[1].zone_1_relation is lexer.symbols.intern("RACE[2] // STATUS")
+        assert lexer.symbols.names(TRIGGER) == ["PLANETARY SYSTEM FAILURE"]
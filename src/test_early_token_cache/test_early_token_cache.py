@@ -0,0 +1,165 @@
+import contextlib
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.lexer import BarrelmanLexer
+from src.token_cache import TokenCache
+
+SOURCE = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] //STATUS% CRITICAL ->PLANETARY SYSTEM FAILURE\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+    "INTENT -> SPECIES PRESERVATION\n"
+)
+
+
+def cache_entries(cache):
+    return sorted(name for name in os.listdir(cache.directory) if name.endswith(".tokens"))
+
+
+class TestTokenCache:
+    @pytest.mark.happy_path
+    def test_miss_then_hit_returns_same_tokens(self, tmp_path):
+        """Test that a cached document yields the tokens of a fresh parse."""
+        cache = TokenCache(str(tmp_path))
+        expected = BarrelmanLexer(SOURCE).tokenize()
+        assert BarrelmanLexer(SOURCE).tokenize(cache=cache) == expected
+        assert BarrelmanLexer(SOURCE).tokenize(cache=cache) == expected
+        assert len(cache_entries(cache)) == 1
+
+    @pytest.mark.happy_path
+    def test_hit_skips_parsing(self, tmp_path):
+        """Test that a cache hit never calls tokenize_line."""
+        cache = TokenCache(str(tmp_path))
+        BarrelmanLexer(SOURCE).tokenize(cache=cache)
+        with patch.object(BarrelmanLexer, "tokenize_line") as mock_tokenize_line:
+            tokens = BarrelmanLexer(SOURCE).tokenize(cache=cache)
+        mock_tokenize_line.assert_not_called()
+        assert len(tokens) == 4
+
+    @pytest.mark.happy_path
+    def test_diagnostics_are_restored_on_hit(self, tmp_path):
+        """Test that errors recorded on a miss are reported again on a hit."""
+        cache = TokenCache(str(tmp_path))
+        source = ":: ROOT // TEST\n   :^: MISALIGNED // TEST"
+        first = BarrelmanLexer(source)
+        first.tokenize(cache=cache)
+        second = BarrelmanLexer(source)
+        second.tokenize(cache=cache)
+        assert len(first.diagnostics) == 1
+        assert second.diagnostics.diagnostics == first.diagnostics.diagnostics
+
+    @pytest.mark.edge_case
+    def test_lexer_version_is_part_of_key(self, tmp_path):
+        """Test that a new lexer version does not reuse old entries."""
+        cache = TokenCache(str(tmp_path))
+        lines = SOURCE.strip().splitlines()
+        key = cache.key(lines)
+        with patch("src.token_cache.LEXER_VERSION", "test"):
+            assert cache.key(lines) != key
+        assert cache.key(lines, spans=True) != key
+        assert cache.key(lines, max_errors=1) != key
+
+    @pytest.mark.edge_case
+    def test_corrupt_entry_is_dropped(self, tmp_path):
+        """Test that an unreadable entry is removed and treated as a miss."""
+        cache = TokenCache(str(tmp_path))
+        BarrelmanLexer(SOURCE).tokenize(cache=cache)
+        (entry,) = cache_entries(cache)
+        with open(os.path.join(cache.directory, entry), "wb") as f:
+            f.write(b"not a pickle")
+        assert cache.get(entry[: -len(".tokens")]) is None
+        assert cache_entries(cache) == []
+        assert len(BarrelmanLexer(SOURCE).tokenize(cache=cache)) == 4
+
+    @pytest.mark.edge_case
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the oldest entries are evicted once max_bytes is exceeded."""
+        cache = TokenCache(str(tmp_path), max_bytes=0)
+        cache.put("old", [], "")
+        assert cache_entries(cache) == []
+
+        cache.max_bytes = 10**6
+        cache.put("old", [], "")
+        cache.put("new", [], "")
+        old_path = os.path.join(cache.directory, "old.tokens")
+        os.utime(old_path, (0, 0))
+        cache.max_bytes = os.path.getsize(old_path)
+        cache.evict()
+        assert cache_entries(cache) == ["new.tokens"]
+
+    @pytest.mark.edge_case
+    def test_directory_is_created_lazily(self, tmp_path):
+        """Test that the cache directory is only created on the first write."""
+        cache = TokenCache(str(tmp_path / "cache"))
+        assert cache.get(cache.key(["x"])) is None
+        assert not os.path.exists(cache.directory)
+        cache.clear()
+        BarrelmanLexer(SOURCE).tokenize(cache=cache)
+        assert len(cache_entries(cache)) == 1
+        cache.clear()
+        assert cache_entries(cache) == []
+
+    @pytest.mark.edge_case
+    def test_unwritable_directory_still_returns_tokens(self, tmp_path, monkeypatch):
+        """Test that a cache directory that cannot be created is skipped."""
+        (tmp_path / "notadir").write_text("")
+        monkeypatch.setenv("BARRELMAN_CACHE_DIR", str(tmp_path / "notadir" / "x"))
+        cache = TokenCache()
+        expected = BarrelmanLexer(SOURCE).tokenize()
+        assert BarrelmanLexer(SOURCE).tokenize(cache=cache) == expected
+        assert cache.put("key", expected) is expected
+
+    @pytest.mark.edge_case
+    def test_failed_write_removes_temporary_file(self, tmp_path):
+        """Test that an entry that cannot be stored leaves no file behind."""
+        cache = TokenCache(str(tmp_path))
+        tokens = BarrelmanLexer(SOURCE).tokenize()
+        with patch("src.token_cache.os.replace", side_effect=PermissionError):
+            assert cache.put("key", tokens) is tokens
+        assert os.listdir(tmp_path) == []
+
+    @pytest.mark.edge_case
+    def test_hit_on_read_only_cache(self, tmp_path):
+        """Test that a hit is returned when its access time cannot be refreshed."""
+        cache = TokenCache(str(tmp_path))
+        expected = BarrelmanLexer(SOURCE).tokenize(cache=cache)
+        with patch("src.token_cache.os.utime", side_effect=PermissionError):
+            assert BarrelmanLexer(SOURCE).tokenize(cache=cache) == expected
+
+    @pytest.mark.edge_case
+    def test_writes_scan_only_when_full(self, tmp_path):
+        """Test that writes rescan the directory only when an eviction is due."""
+        cache = TokenCache(str(tmp_path))
+        cache.put("first", [], ())
+        size = os.path.getsize(os.path.join(cache.directory, "first.tokens"))
+        cache.max_bytes = 10 * size
+        with patch("src.token_cache.os.scandir", wraps=os.scandir) as scandir:
+            for n in range(9):
+                cache.put(f"entry{n}", [], ())
+            assert scandir.call_count == 0
+            cache.put("overflow", [], ())
+            assert scandir.call_count == 1
+        assert len(cache_entries(cache)) == 7
+
+    @pytest.mark.edge_case
+    def test_evict_skips_entries_removed_concurrently(self, tmp_path):
+        """Test that an entry deleted by another process during a scan is skipped."""
+        cache = TokenCache(str(tmp_path), max_bytes=0)
+        cache.put("a", [], ())
+        cache.max_bytes = 10**6
+        cache.put("b", [], ())
+        real_scandir = os.scandir
+
+        def racing_scandir(path):
+            listing = list(real_scandir(path))
+            for entry in listing:
+                os.remove(entry.path)
+            return contextlib.nullcontext(listing)
+
+        cache.max_bytes = 0
+        with patch("src.token_cache.os.scandir", racing_scandir):
+            cache.evict()
+        assert cache_entries(cache) == []
@@ -0,0 +1,90 @@
+import pickle
+
+import pytest
+
+from src.lexer import BarrelmanLexer
+from src.token_index import TokenIndex
+
+SOURCE = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL -> PLANETARY SYSTEM FAILURE\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+    ":: EARTH // 1 OF 302,973 % BIRTH CONSCIOUS LIFEFORM\n"
+    " :: EARTH // 1 OF 1 % ESCAPE PLANETARY SILENCE -> PLANETARY ESCAPE\n"
+    ":: EARTH BIOSPHERE // HABITABLE MATCH\n"
+)
+
+
+@pytest.fixture
+def index():
+    return TokenIndex.from_tokens(BarrelmanLexer(SOURCE).tokenize())
+
+
+class TestTokenIndex:
+    @pytest.mark.happy_path
+    def test_exact_lookup(self, index):
+        """Test exact lookups on each zone."""
+        assert len(index) == 6
+        assert index.lookup("keyword", "RACE[2]") == [1, 2]
+        assert index.lookup("function", "AWAKENING") == [2]
+        assert index.lookup("modifier", "DENIED") == [2]
+        assert index.lookup("trigger", "PLANETARY ESCAPE") == [4]
+        assert index.lookup("keyword", "MOON") == []
+
+    @pytest.mark.happy_path
+    def test_word_search(self, index):
+        """Test that word search finds every value containing the word."""
+        assert index.search("trigger", "PLANETARY") == [1, 4]
+        assert index.search("modifier", "planetary") == [4]
+        assert index.search("function", "OF") == [3, 4]
+
+    @pytest.mark.happy_path
+    def test_prefix_lookup(self, index):
+        """Test that prefix lookups match values starting with the prefix."""
+        assert index.prefix("keyword", "EARTH") == [3, 4, 5]
+        assert index.prefix("keyword", "R") == [1, 2]
+        assert index.prefix("keyword", "Z") == []
+        assert index.prefix("trigger", "") == [1, 4]
+
+    @pytest.mark.happy_path
+    def test_values_of_ids(self, index):
+        """Test reading zone values back, e.g. all modifiers on keyword EARTH."""
+        ids = index.lookup("keyword", "EARTH")
+        assert index.values("modifier", ids) == [
+            "BIRTH CONSCIOUS LIFEFORM",
+            "ESCAPE PLANETARY SILENCE",
+        ]
+        assert index.value("trigger", 0) is None
+        assert index.terms("keyword") == [
+            "THREAT",
+            "RACE[2]",
+            "EARTH",
+            "EARTH BIOSPHERE",
+        ]
+
+    @pytest.mark.edge_case
+    def test_unknown_zone(self, index):
+        """Test that an unknown zone raises ValueError."""
+        with pytest.raises(ValueError):
+            index.lookup("outcome", "X")
+
+    @pytest.mark.edge_case
+    def test_save_and_load(self, index, tmp_path):
+        """Test that a saved index answers the same queries after loading."""
+        path = str(tmp_path / "doc.index")
+        index.save(path)
+        loaded = TokenIndex.load(path)
+        assert len(loaded) == 6
+        assert loaded.search("trigger", "PLANETARY") == [1, 4]
+        assert loaded.prefix("keyword", "EARTH") == [3, 4, 5]
+        assert loaded.lookup("keyword", "RACE[2]") == [1, 2]
+        loaded.add(BarrelmanLexer(":: EARTH // NEW").tokenize()[0])
+        assert loaded.lookup("keyword", "EARTH") == [3, 4, 6]
+
+    @pytest.mark.edge_case
+    def test_load_rejects_other_versions(self, tmp_path):
+        """Test that an index from another format version is rejected."""
+        path = tmp_path / "old.index"
+        path.write_bytes(pickle.dumps((0, "0", 0, {})))
+        with pytest.raises(ValueError):
+            TokenIndex.load(str(path))
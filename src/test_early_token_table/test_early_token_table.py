@@ -0,0 +1,69 @@
+import pytest
+
+from src.exporters.markdown_exporter import export_markdown
+from src.lexer import BarrelmanLexer, BarrelmanToken
+from src.token_table import TokenTable
+
+SOURCE = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] //STATUS% CRITICAL ->PLANETARY SYSTEM FAILURE\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+    "INTENT -> SPECIES PRESERVATION\n"
+)
+
+
+class TestTokenTable:
+    @pytest.mark.happy_path
+    def test_table_rows_match_tokens(self):
+        """Test that every row of the table equals the original token."""
+        tokens = BarrelmanLexer(SOURCE).tokenize()
+        table = TokenTable.from_tokens(tokens)
+        assert len(table) == len(tokens)
+        assert list(table) == tokens
+        assert table[-1] == tokens[-1]
+
+    @pytest.mark.happy_path
+    def test_tokenize_returns_table(self):
+        """Test that tokenize(table=True) returns a populated TokenTable."""
+        lexer = BarrelmanLexer(SOURCE)
+        table = lexer.tokenize(table=True)
+        assert isinstance(table, TokenTable)
+        assert lexer.tokens is table
+        assert list(table.indent_levels) == [0, 1, 2, 0]
+        assert list(table.flags) == [0, TokenTable.FLAG_NESTING_PORT, 0, 0]
+
+    @pytest.mark.happy_path
+    def test_text_reads_single_field(self):
+        """Test that a single zone can be read without building a token."""
+        table = BarrelmanLexer(SOURCE).tokenize(table=True)
+        assert table.text(1, "zone_1_relation") == "RACE[2] // STATUS"
+        assert table.text(1, "zone_3_trigger") == "PLANETARY SYSTEM FAILURE"
+        assert table.text(3, "zone_1_declaration") is None
+
+    @pytest.mark.happy_path
+    def test_exporter_accepts_table(self, tmp_path):
+        """Test that exporters accept a table in place of a token list."""
+        table = BarrelmanLexer(SOURCE).tokenize(table=True)
+        out = tmp_path / "out.md"
+        export_markdown(table, str(out))
+        assert ":: RACE[2] // AWAKENING // % DENIED" in out.read_text()
+
+    @pytest.mark.edge_case
+    def test_zones_not_in_line_are_stored_separately(self):
+        """Test that zones absent from the line text still round-trip."""
+        token = BarrelmanToken(
+            line="original",
+            zone_1_declaration="::",
+            zone_1_relation="rewritten",
+            zone_2_modifier=None,
+            zone_3_trigger=None,
+            zone_4_outcome=None,
+        )
+        table = TokenTable.from_tokens([token])
+        assert table[0] == token
+
+    @pytest.mark.edge_case
+    def test_index_out_of_range(self):
+        """Test that indexing past the end raises IndexError."""
+        with pytest.raises(IndexError):
+            TokenTable()[0]
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from src.exporters.graphviz.dot_exporter import export_dot_graph
+from src.lexer import BarrelmanLexer, BarrelmanToken
+from src.tree import BarrelmanDocument, build_tree
+
+SOURCE = (
+    ":: THREAT // AWAKENING CANDIDATE RACE % [2]\n"
+    " :^: RACE[2] // STATUS % CRITICAL\n"
+    "  :: RACE[2] // AWAKENING % DENIED\n"
+    "  :: EARTH // WATCH\n"
+    " :^: EARTH // STATUS\n"
+    "INTENT -> SPECIES PRESERVATION\n"
+)
+
+
+def make_tokens(indents):
+    return [
+        BarrelmanToken("X", "::", "X", None, None, None, indent)
+        for indent in indents
+    ]
+
+
+def brute_force_parents(tokens):
+    parents = []
+    for i, token in enumerate(tokens):
+        parent = -1
+        for j in range(i - 1, -1, -1):
+            if tokens[j].indent_level < token.indent_level:
+                parent = j
+                break
+        parents.append(parent)
+    return parents
+
+
+class TestBuildTree:
+    @pytest.mark.happy_path
+    def test_structure_of_example(self):
+        """Test parents, depths, subtree sizes and children of a document."""
+        document = build_tree(BarrelmanLexer(SOURCE).tokenize())
+        assert list(document.parents) == [-1, 0, 1, 1, 0, -1]
+        assert list(document.depths) == [0, 1, 2, 2, 1, 0]
+        assert list(document.subtree_sizes) == [5, 3, 1, 1, 1, 1]
+        assert list(document.children(0)) == [1, 4]
+        assert list(document.children(1)) == [2, 3]
+        assert list(document.roots()) == [0, 5]
+        assert document.subtree(1) == range(1, 4)
+        assert document.child_range(0) == range(1, 5)
+        assert document.ancestors(3) == [1, 0]
+        assert document.parent(5) is None
+
+    @pytest.mark.happy_path
+    def test_random_documents_match_brute_force(self):
+        """Differential test against the nearest-smaller-indent rule."""
+        rng = random.Random(12)
+        for _ in range(200):
+            indents = [rng.randint(0, 5) for _ in range(rng.randint(0, 40))]
+            tokens = make_tokens(indents)
+            document = build_tree(tokens)
+            assert list(document.parents) == brute_force_parents(tokens)
+            for index in range(len(document)):
+                members = set(document.subtree(index))
+                descendants = {
+                    j
+                    for j in range(len(tokens))
+                    if index in [j] + document.ancestors(j)
+                }
+                assert members == descendants
+
+    @pytest.mark.edge_case
+    def test_accepts_generators_and_documents(self):
+        """Test that generators are collected and documents pass through."""
+        document = build_tree(iter(make_tokens([0, 1])))
+        assert isinstance(document, BarrelmanDocument)
+        assert len(document.tokens) == 2
+        assert build_tree(document) is document
+        assert len(build_tree([])) == 0
+
+    @pytest.mark.edge_case
+    def test_slowly_deepening_document_is_linear(self):
+        """Test that a deep staircase document builds in a single pass."""
+        document = build_tree(make_tokens(range(200_000)))
+        assert document.depths[-1] == 199_999
+        assert document.subtree_sizes[0] == 200_000
+
+    @pytest.mark.edge_case
+    def test_dot_export_uses_tree_parents(self, tmp_path, capsys):
+        """Test that DOT edges link each nested node to its parent."""
+        filename = tmp_path / "tree.dot"
+        document = build_tree(BarrelmanLexer(SOURCE).tokenize())
+        export_dot_graph(document, str(filename))
+        edges = [
+            line.strip()
+            for line in filename.read_text().splitlines()
+            if "->" in line and "label" not in line
+        ]
+        assert edges == [
+            "node0 -> node1;",
+            "node1 -> node2;",
+            "node1 -> node3;",
+            "node0 -> node4;",
+            "node4 -> node5;",
+        ]
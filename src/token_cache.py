@@ -0,0 +1,211 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Iterable, List, Optional, Tuple
+
+from src.diagnostics import Diagnostic, DiagnosticCollector
+from src.lexer import LEXER_VERSION
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "barrelman"
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Share of ``max_bytes`` that an eviction triggered by a write frees the
+# cache down to, so the directory is rescanned once per this much headroom
+# written rather than on every write
+EVICT_TO = 0.75
+
+_SUFFIX = ".tokens"
+
+
+class TokenCache:
+    """Persistent cache of tokenized documents, keyed by content hash.
+
+    Each entry is stored in its own file, named after the SHA-256 of the
+    lexer version and the document text, so a new lexer version never
+    reads tokens produced by an older one. Entries are evicted least
+    recently used first once the directory grows past ``max_bytes``; a
+    cache hit refreshes the entry's modification time.
+
+    The directory is scanned on the first write only. After that, its
+    size is tracked by adding up the bytes written, and it is scanned
+    again only when that total passes ``max_bytes``. The eviction then
+    brings the cache down to `EVICT_TO` of ``max_bytes``. Every process
+    sharing a directory tracks its own writes, so the directory can
+    briefly outgrow ``max_bytes`` until one of them evicts.
+
+    Entries are pickled, so only point the cache at a directory you own.
+    """
+
+    def __init__(
+        self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        """Initializes the cache.
+
+        The directory defaults to ``$BARRELMAN_CACHE_DIR`` when set, and to
+        ``~/.cache/barrelman`` otherwise. It is created on the first write.
+        """
+        self.directory = (
+            directory or os.environ.get("BARRELMAN_CACHE_DIR") or DEFAULT_CACHE_DIR
+        )
+        self.max_bytes = max_bytes
+        # Estimated size of the directory; None until the first write
+        self._size: Optional[int] = None
+
+    def key(
+        self,
+        lines: Iterable[str],
+        spans: bool = False,
+        max_errors: Optional[int] = None,
+    ) -> str:
+        """Returns the cache key for a document given as source lines.
+
+        ``max_errors`` is part of the key because an error limit can cut
+        tokenization short.
+        """
+        digest = hashlib.sha256(
+            f"{LEXER_VERSION}\0{int(spans)}\0{max_errors}\0".encode()
+        )
+        for line in lines:
+            digest.update(line.encode("utf-8", "surrogatepass"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[Tuple[list, List[Diagnostic]]]:
+        """Returns the cached ``(tokens, diagnostics)`` for a key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Unreadable or truncated entry; drop it and parse again
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Read-only or shared cache; the entry is still good
+            pass
+        return entry
+
+    def put(
+        self, key: str, tokens: list, diagnostics: Iterable[Diagnostic] = ()
+    ) -> list:
+        """Stores tokens under a key, then evicts old entries if needed.
+
+        Returns ``tokens``. The cache is best effort: when the entry
+        cannot be written, for instance because the directory cannot be
+        created, the temporary file is removed and nothing is stored.
+        """
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(
+                    (tokens, list(diagnostics)), f, pickle.HIGHEST_PROTOCOL
+                )
+                written = f.tell()
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if tmp_path is not None:
+                self._remove(tmp_path)
+            return tokens
+        except BaseException:
+            if tmp_path is not None:
+                self._remove(tmp_path)
+            raise
+        if self._size is None:
+            self._size = self._scan()[1]
+        else:
+            self._size += written
+        if self._size > self.max_bytes:
+            self.evict(int(self.max_bytes * EVICT_TO))
+        return tokens
+
+    def load_or_store(
+        self,
+        lines: Iterable[str],
+        tokens: Iterable,
+        spans: bool = False,
+        diagnostics: Optional[DiagnosticCollector] = None,
+    ) -> list:
+        """Returns cached tokens for ``lines``, or consumes and caches ``tokens``.
+
+        ``tokens`` is only iterated on a cache miss, so passing a lazy
+        token generator skips parsing entirely for unchanged documents.
+        The diagnostics recorded while parsing are stored with the tokens
+        and added to ``diagnostics`` again on a hit, so callers see the
+        same errors either way.
+        """
+        if diagnostics is None:
+            diagnostics = DiagnosticCollector()
+        key = self.key(lines, spans, diagnostics.remaining)
+        entry = self.get(key)
+        if entry is not None:
+            cached, reported = entry
+            diagnostics.extend(reported)
+            return cached
+
+        already_reported = len(diagnostics)
+        return self.put(
+            key, list(tokens), diagnostics.diagnostics[already_reported:]
+        )
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, str]], int]:
+        """Returns ``(mtime, size, path)`` of every entry, and their total size."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(_SUFFIX):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        # Evicted by another process since it was listed
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            pass
+        return entries, sum(size for _, size, _ in entries)
+
+    def evict(self, target: Optional[int] = None):
+        """Removes least recently used entries until the cache fits ``target``.
+
+        ``target`` defaults to ``max_bytes``.
+        """
+        if target is None:
+            target = self.max_bytes
+        entries, total = self._scan()
+        entries.sort()
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+        self._size = total
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        self._size = None
+        if not os.path.isdir(self.directory):
+            return
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(_SUFFIX):
+                    self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
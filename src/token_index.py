@@ -0,0 +1,209 @@
+import os
+import pickle
+import tempfile
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
+from src.lexer import LEXER_VERSION
+from src.symbols import KINDS
+
+ZONES = KINDS
+
+# Bump whenever the on-disk layout of a saved index changes
+_FORMAT_VERSION = 1
+
+
+def _zone_values(token):
+    """Returns the (keyword, function, modifier, trigger) of a token."""
+    keyword, _, function = (token.zone_1_relation or "").partition(" // ")
+    return keyword, function, token.zone_2_modifier, token.zone_3_trigger
+
+
+class _ZoneIndex:
+    """Inverted index over the distinct values of one zone."""
+
+    __slots__ = ("terms", "term_ids", "column", "postings", "words", "_sorted")
+
+    def __init__(self):
+        self.terms: List[str] = []
+        self.term_ids: Dict[str, int] = {}
+        # Term id of every token, -1 where the zone is empty
+        self.column = array("i")
+        # Token ids of every term, in ascending order
+        self.postings: List[array] = []
+        # Upper-cased word -> ids of the terms containing it
+        self.words: Dict[str, array] = {}
+        self._sorted: Optional[List[str]] = None
+
+    def add(self, token_id: int, value: Optional[str]):
+        if not value:
+            self.column.append(-1)
+            return
+        term_id = self.term_ids.get(value)
+        if term_id is None:
+            term_id = self.term_ids[value] = len(self.terms)
+            self.terms.append(value)
+            self.postings.append(array("I"))
+            for word in set(value.upper().split()):
+                self.words.setdefault(word, array("I")).append(term_id)
+            self._sorted = None
+        self.column.append(term_id)
+        self.postings[term_id].append(token_id)
+
+    def sorted_terms(self) -> List[str]:
+        if self._sorted is None:
+            self._sorted = sorted(self.terms)
+        return self._sorted
+
+    def __getstate__(self):
+        return (self.terms, self.column, self.postings, self.words)
+
+    def __setstate__(self, state):
+        self.terms, self.column, self.postings, self.words = state
+        self.term_ids = {term: term_id for term_id, term in enumerate(self.terms)}
+        self._sorted = None
+
+
+def _merge(postings: Iterable[array]) -> List[int]:
+    """Returns the sorted union of several posting lists."""
+    postings = list(postings)
+    if len(postings) == 1:
+        return postings[0].tolist()
+    merged = set()
+    for posting in postings:
+        merged.update(posting)
+    return sorted(merged)
+
+
+class TokenIndex:
+    """Inverted indexes over the keyword, function, modifier and trigger zones.
+
+    Built once from `BarrelmanLexer.tokenize` output, the index answers
+    lookups by exact value, by value prefix and by whole word without
+    scanning the tokens. Every query returns token ids: positions in the
+    token list the index was built from, in ascending order. The zone
+    values of a token can be read back with `value`, so questions such as
+    "all modifiers on keyword EARTH" need no access to the tokens at all.
+
+    Each zone stores its distinct values once, a column with the value id
+    of every token, and the ascending token ids of every value. Prefix
+    lookups bisect the sorted distinct values, so their cost depends on
+    the number of distinct values rather than on the number of tokens.
+    """
+
+    def __init__(self):
+        """Initializes an empty index."""
+        self._zones: Dict[str, _ZoneIndex] = {zone: _ZoneIndex() for zone in ZONES}
+        self._size = 0
+
+    @classmethod
+    def from_tokens(cls, tokens: Iterable) -> "TokenIndex":
+        """Builds an index from any iterable of tokens."""
+        index = cls()
+        index.extend(tokens)
+        return index
+
+    def add(self, token) -> int:
+        """Indexes one more token and returns its id."""
+        token_id = self._size
+        for zone, value in zip(ZONES, _zone_values(token)):
+            self._zones[zone].add(token_id, value)
+        self._size += 1
+        return token_id
+
+    def extend(self, tokens: Iterable):
+        """Indexes every token from an iterable, in order."""
+        for token in tokens:
+            self.add(token)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _zone(self, zone: str) -> _ZoneIndex:
+        try:
+            return self._zones[zone]
+        except KeyError:
+            raise ValueError(
+                f"Unknown zone {zone!r}; expected one of {', '.join(ZONES)}"
+            ) from None
+
+    def lookup(self, zone: str, value: str) -> List[int]:
+        """Returns the ids of the tokens whose zone equals ``value``."""
+        index = self._zone(zone)
+        term_id = index.term_ids.get(value)
+        return [] if term_id is None else index.postings[term_id].tolist()
+
+    def prefix(self, zone: str, prefix: str) -> List[int]:
+        """Returns the ids of the tokens whose zone starts with ``prefix``."""
+        index = self._zone(zone)
+        terms = index.sorted_terms()
+        matches = []
+        for position in range(bisect_left(terms, prefix), len(terms)):
+            term = terms[position]
+            if not term.startswith(prefix):
+                break
+            matches.append(index.postings[index.term_ids[term]])
+        return _merge(matches) if matches else []
+
+    def search(self, zone: str, word: str) -> List[int]:
+        """Returns the ids of the tokens whose zone contains ``word``.
+
+        Words are whitespace separated and matched case-insensitively.
+        """
+        index = self._zone(zone)
+        term_ids = index.words.get(word.upper())
+        if term_ids is None:
+            return []
+        return _merge(index.postings[term_id] for term_id in term_ids)
+
+    def value(self, zone: str, token_id: int) -> Optional[str]:
+        """Returns the zone value of one token, or None if it is empty."""
+        index = self._zone(zone)
+        term_id = index.column[token_id]
+        return None if term_id == -1 else index.terms[term_id]
+
+    def values(self, zone: str, token_ids: Iterable[int]) -> List[str]:
+        """Returns the distinct zone values of some tokens, in first-seen order."""
+        index = self._zone(zone)
+        seen = {}
+        for token_id in token_ids:
+            term_id = index.column[token_id]
+            if term_id != -1 and term_id not in seen:
+                seen[term_id] = index.terms[term_id]
+        return list(seen.values())
+
+    def terms(self, zone: str) -> List[str]:
+        """Returns the distinct values of a zone, in first-seen order."""
+        return list(self._zone(zone).terms)
+
+    def save(self, path: str):
+        """Writes the index to ``path``, replacing any existing file atomically."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(
+                    (_FORMAT_VERSION, LEXER_VERSION, self._size, self._zones),
+                    f,
+                    pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "TokenIndex":
+        """Reads an index written by `save`.
+
+        Raises ValueError if the file was written by an incompatible
+        version. Saved indexes are pickled, so only load files you trust.
+        """
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state[:2] != (_FORMAT_VERSION, LEXER_VERSION):
+            raise ValueError(f"{path} was written by an incompatible version")
+        index = cls()
+        index._size, index._zones = state[2], state[3]
+        return index
@@ -0,0 +1,122 @@
+from array import array
+from typing import Iterable, Iterator, List, Optional
+
+from src.lexer import BarrelmanToken
+
+
+class TokenTable:
+    """Columnar storage for a sequence of Barrelman tokens.
+
+    Indent levels and flags are kept in compact `array` columns, and the
+    text of every zone is stored as a (start, end) offset pair into one
+    shared string buffer. Zones that occur verbatim in their source line
+    point into the stored line, so most zones cost no extra text at all.
+
+    The table behaves like a read-only sequence of `BarrelmanToken`
+    objects: indexing and iteration build token views on demand, so the
+    exporters accept a table wherever they accept a list of tokens. The
+    outcome zone is not stored; views infer it from the modifier and
+    trigger when it is read.
+    """
+
+    FIELDS = (
+        "line",
+        "zone_1_declaration",
+        "zone_1_relation",
+        "zone_2_modifier",
+        "zone_3_trigger",
+    )
+    FLAG_NESTING_PORT = 1
+
+    _STRIDE = 2 * len(FIELDS)
+
+    def __init__(self):
+        """Initializes an empty table."""
+        self.indent_levels = array("I")
+        self.flags = array("B")
+        # Flat (start, end) pairs, one pair per field per row; None is -1, -1
+        self.spans = array("q")
+        self._buffer = ""
+        self._pending: List[str] = []
+        self._size = 0
+
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[BarrelmanToken]) -> "TokenTable":
+        """Builds a table from any iterable of tokens."""
+        table = cls()
+        table.extend(tokens)
+        return table
+
+    def _store(self, text: str) -> int:
+        """Appends text to the shared buffer and returns its start offset."""
+        start = self._size
+        self._pending.append(text)
+        self._size += len(text)
+        return start
+
+    def _text_buffer(self) -> str:
+        if self._pending:
+            self._buffer += "".join(self._pending)
+            self._pending = []
+        return self._buffer
+
+    def append(self, token: BarrelmanToken):
+        """Adds a token to the end of the table."""
+        line = token.line
+        line_start = self._store(line)
+        spans = [line_start, line_start + len(line)]
+        for name in self.FIELDS[1:]:
+            text = getattr(token, name)
+            if text is None:
+                spans += (-1, -1)
+                continue
+            pos = line.find(text)
+            start = line_start + pos if pos != -1 else self._store(text)
+            spans += (start, start + len(text))
+        self.spans.extend(spans)
+        self.indent_levels.append(token.indent_level)
+        self.flags.append(self.FLAG_NESTING_PORT if token.is_nesting_port else 0)
+
+    def extend(self, tokens: Iterable[BarrelmanToken]):
+        """Adds every token from an iterable to the end of the table."""
+        for token in tokens:
+            self.append(token)
+
+    def text(self, index: int, field: str) -> Optional[str]:
+        """Returns the text of one field of one row, or None if it is unset."""
+        offset = index * self._STRIDE + 2 * self.FIELDS.index(field)
+        start = self.spans[offset]
+        if start == -1:
+            return None
+        return self._text_buffer()[start : self.spans[offset + 1]]
+
+    def __len__(self) -> int:
+        return len(self.indent_levels)
+
+    def __getitem__(self, index: int) -> BarrelmanToken:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TokenTable index out of range")
+        buffer = self._text_buffer()
+        spans = self.spans
+        base = index * self._STRIDE
+        values = []
+        for offset in range(base, base + self._STRIDE, 2):
+            start = spans[offset]
+            end = spans[offset + 1]
+            values.append(None if start == -1 else buffer[start:end])
+        line, declaration, relation, modifier, trigger = values
+        return BarrelmanToken(
+            line=line,
+            zone_1_declaration=declaration,
+            zone_1_relation=relation,
+            zone_2_modifier=modifier,
+            zone_3_trigger=trigger,
+            indent_level=self.indent_levels[index],
+            is_nesting_port=bool(self.flags[index] & self.FLAG_NESTING_PORT),
+        )
+
+    def __iter__(self) -> Iterator[BarrelmanToken]:
+        for index in range(len(self)):
+            yield self[index]
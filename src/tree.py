@@ -0,0 +1,120 @@
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+
+class BarrelmanDocument:
+    """The tokens of a Barrelman document with their tree structure.
+
+    Nodes are token indices in document order. For every node the
+    document stores its parent (-1 for roots), its depth (0 for roots)
+    and the size of its subtree, including itself. Tokens are in
+    pre-order, so the subtree of node ``i`` is the contiguous range
+    ``i .. i + subtree_size[i]`` and its children are found by hopping
+    over their subtrees; no per-node child lists are stored.
+
+    A token's parent is the nearest previous token with a smaller
+    indent level, the rule the lexer's other consumers have always
+    used.
+    """
+
+    def __init__(self, tokens: Sequence):
+        """Initializes an empty structure for ``tokens``; see `build_tree`."""
+        self.tokens = tokens
+        self.parents = array("q")
+        self.depths = array("I")
+        self.subtree_sizes = array("Q")
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def parent(self, index: int) -> Optional[int]:
+        """Returns the parent of a node, or None for a root."""
+        parent = self.parents[index]
+        return None if parent == -1 else parent
+
+    def subtree(self, index: int) -> range:
+        """Returns the node range of a subtree, the node itself first."""
+        return range(index, index + self.subtree_sizes[index])
+
+    def children(self, index: int) -> Iterator[int]:
+        """Yields the children of a node in document order."""
+        child = index + 1
+        end = index + self.subtree_sizes[index]
+        sizes = self.subtree_sizes
+        while child < end:
+            yield child
+            child += sizes[child]
+
+    def child_range(self, index: int) -> range:
+        """Returns the range of descendants of a node, excluding itself."""
+        return range(index + 1, index + self.subtree_sizes[index])
+
+    def roots(self) -> Iterator[int]:
+        """Yields the top-level nodes in document order."""
+        node = 0
+        sizes = self.subtree_sizes
+        while node < len(sizes):
+            yield node
+            node += sizes[node]
+
+    def ancestors(self, index: int) -> List[int]:
+        """Returns the ancestors of a node, innermost first."""
+        result = []
+        parent = self.parents[index]
+        while parent != -1:
+            result.append(parent)
+            parent = self.parents[parent]
+        return result
+
+
+def build_tree(tokens: Iterable) -> BarrelmanDocument:
+    """Builds a `BarrelmanDocument` from tokens in a single stack pass.
+
+    ``tokens`` may be any iterable of tokens; one that cannot be indexed,
+    such as a generator, is collected into a list first. Passing an
+    existing `BarrelmanDocument` returns it unchanged, so callers can
+    share one structure. Runs in O(n) time with O(depth) extra stack,
+    whatever the shape of the document.
+    """
+    if isinstance(tokens, BarrelmanDocument):
+        return tokens
+    if not hasattr(tokens, "__getitem__"):
+        tokens = list(tokens)
+
+    return build_tree_from_indents(
+        [token.indent_level for token in tokens], tokens
+    )
+
+
+def build_tree_from_indents(
+    indents: Iterable[int], tokens: Sequence
+) -> BarrelmanDocument:
+    """Builds the `BarrelmanDocument` of ``tokens`` from their indent levels.
+
+    ``indents`` holds the indent level of every token, in order, so the
+    structure can be computed without reading the tokens themselves;
+    see `LineStructure.tree`.
+    """
+    document = BarrelmanDocument(tokens)
+    parents = document.parents
+    depths = document.depths
+    sizes = document.subtree_sizes
+    # Open nodes as (indent level, index), innermost last
+    stack = []
+    for index, indent in enumerate(indents):
+        while stack and stack[-1][0] >= indent:
+            closed = stack.pop()[1]
+            sizes[closed] = index - closed
+        if stack:
+            parent = stack[-1][1]
+            parents.append(parent)
+            depths.append(depths[parent] + 1)
+        else:
+            parents.append(-1)
+            depths.append(0)
+        sizes.append(1)
+        stack.append((indent, index))
+    end = len(parents)
+    for _, index in stack:
+        sizes[index] = end - index
+    return document
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+BARRELMAN Lexer Benchmark
+
+Measures BarrelmanLexer.tokenize on synthetic corpora of several sizes
+and shapes:
+
+    example   docs/BARRELEXAMPLE.bman repeated
+    flat      top-level declarations only
+    deep      declarations nested up to 64 levels deep
+    ports     blocks where most lines are :^: ports
+    long      flat declarations with ~500 character lines
+    mixed     tools/gen_corpus.py output with its default parameters
+
+For every case, size and mode it reports lines/sec and tokens/sec (best
+of --repeat runs), the peak memory traced by tracemalloc while
+tokenizing, and the memory blocks still allocated per line while the
+tokens are alive. Each corpus is written to a temporary file and read
+through a memory map, so only the tokens have to fit in memory.
+
+Results can be written as JSON with --json, to compare lexer versions.
+
+Usage:
+    python tools/bench_lexer.py [--sizes 1k,100k,10m] [--cases flat,deep]
+                                [--modes tokens,spans] [--repeat N]
+                                [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.lexer import LEXER_VERSION, BarrelmanLexer  # noqa: E402
+from tools.gen_corpus import generate  # noqa: E402
+
+EXAMPLE = os.path.join(ROOT, "docs", "BARRELEXAMPLE.bman")
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+MODES = {"tokens": False, "spans": True}
+
+# Corpora larger than this are timed once, whatever --repeat says
+SINGLE_RUN_LINES = 1_000_000
+
+
+def parse_size(text):
+    """Parses a line count such as ``1000``, ``100k`` or ``10m``."""
+    text = text.strip().lower()
+    multiplier = SIZE_SUFFIXES.get(text[-1:], 1)
+    if multiplier != 1:
+        text = text[:-1]
+    return int(text) * multiplier
+
+
+def _declaration(index, indent=0, port=False):
+    marker = ":^:" if port else "::"
+    return (
+        f"{' ' * indent}{marker} KEYWORD {index % 1000} // FUNCTION {index % 97}"
+        f" % MODIFIER {index % 13} -> TRIGGER {index % 7}"
+    )
+
+
+def example_lines():
+    with open(EXAMPLE) as f:
+        example = [line for line in f.read().splitlines() if line.strip()]
+    while True:
+        yield from example
+
+
+def flat_lines():
+    index = 0
+    while True:
+        yield _declaration(index)
+        index += 1
+
+
+def deep_lines():
+    index = 0
+    while True:
+        # Nested '::' blocks are double spaced; climb 64 levels, then restart
+        yield _declaration(index, indent=2 * (index % 64))
+        index += 1
+
+
+def port_lines():
+    index = 0
+    while True:
+        yield _declaration(index)
+        yield _declaration(index, indent=1, port=True)
+        yield _declaration(index + 1, indent=2)
+        yield _declaration(index, indent=1, port=True)
+        index += 2
+
+
+def long_lines():
+    padding = " ".join(f"WORD{word}" for word in range(40))
+    index = 0
+    while True:
+        yield (
+            f":: KEYWORD {index % 1000} {padding} // FUNCTION {index % 97} {padding}"
+            f" % MODIFIER {index % 13} {padding} -> TRIGGER {index % 7}"
+        )
+        index += 1
+
+
+def mixed_lines():
+    return generate(sys.maxsize)
+
+
+CASES = {
+    "example": example_lines,
+    "flat": flat_lines,
+    "deep": deep_lines,
+    "ports": port_lines,
+    "long": long_lines,
+    "mixed": mixed_lines,
+}
+
+
+def write_corpus(path, case, lines):
+    """Streams ``lines`` lines of a case to ``path``."""
+    with open(path, "w", encoding="utf-8") as f:
+        for line in islice(CASES[case](), lines):
+            f.write(line)
+            f.write("\n")
+
+
+def measure_speed(path, spans, repeat):
+    """Returns (best seconds, token count) over ``repeat`` runs."""
+    best = float("inf")
+    token_count = 0
+    for _ in range(repeat):
+        with BarrelmanLexer.from_path(path) as lexer:
+            start = time.perf_counter()
+            tokens = lexer.tokenize(spans=spans)
+            best = min(best, time.perf_counter() - start)
+            token_count = len(tokens)
+            del tokens
+    return best, token_count
+
+
+def measure_memory(path, spans):
+    """Returns (peak bytes, live blocks) of one run, keeping the tokens alive."""
+    with BarrelmanLexer.from_path(path) as lexer:
+        blocks = sys.getallocatedblocks()
+        tracemalloc.start()
+        tokens = lexer.tokenize(spans=spans)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        blocks = sys.getallocatedblocks() - blocks
+        del tokens
+    return peak, blocks
+
+
+def run_case(case, lines, mode, repeat):
+    """Benchmarks one case at one size and returns its result record."""
+    fd, path = tempfile.mkstemp(suffix=".bman")
+    os.close(fd)
+    try:
+        write_corpus(path, case, lines)
+        if lines > SINGLE_RUN_LINES:
+            repeat = 1
+        seconds, token_count = measure_speed(path, MODES[mode], repeat)
+        peak, blocks = measure_memory(path, MODES[mode])
+    finally:
+        os.remove(path)
+    return {
+        "case": case,
+        "mode": mode,
+        "lines": lines,
+        "tokens": token_count,
+        "seconds": seconds,
+        "lines_per_sec": lines / seconds,
+        "tokens_per_sec": token_count / seconds,
+        "peak_bytes": peak,
+        "blocks_per_line": blocks / lines,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BARRELMAN lexer benchmark")
+    parser.add_argument(
+        "--sizes", default="1k,100k", help="Comma separated line counts, e.g. 1k,100k,10m"
+    )
+    parser.add_argument(
+        "--cases", default=",".join(CASES), help="Comma separated corpus shapes"
+    )
+    parser.add_argument(
+        "--modes", default=",".join(MODES), help="Comma separated tokenizer modes"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    cases = args.cases.split(",")
+    modes = args.modes.split(",")
+    for name, values, known in (("case", cases, CASES), ("mode", modes, MODES)):
+        for value in values:
+            if value not in known:
+                parser.error(f"unknown {name} {value!r}; expected one of {', '.join(known)}")
+
+    print(
+        f"{'case':<8} {'mode':<7} {'lines':>10} {'lines/sec':>12} {'tokens/sec':>12}"
+        f" {'peak MiB':>10} {'blocks/line':>12}"
+    )
+    results = []
+    for lines in sizes:
+        for case in cases:
+            for mode in modes:
+                result = run_case(case, lines, mode, args.repeat)
+                results.append(result)
+                print(
+                    f"{case:<8} {mode:<7} {lines:>10,} {result['lines_per_sec']:>12,.0f}"
+                    f" {result['tokens_per_sec']:>12,.0f}"
+                    f" {result['peak_bytes'] / 2**20:>10.1f}"
+                    f" {result['blocks_per_line']:>12.2f}"
+                )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {
+                    "lexer_version": LEXER_VERSION,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+BARRELMAN Synthetic Corpus Generator
+
+Streams valid (and optionally invalid) .bman documents of any size,
+following the nesting rules of docs/SYNTAX.md:
+
+- top-level lines start with '::' or ':^:'
+- children of a top-level line are single spaced (' :: ' / ' :^: ')
+- deeper '::' blocks are double spaced ('  ::', '    ::', ...)
+- ':^:' ports only appear at the top level or single spaced, and always
+  reference the keyword of a visible declaration
+
+The document is generated depth first with a stack of open blocks, so
+memory use is bounded by --max-depth whatever the number of lines, and
+output is written in batches as it is produced. The same --seed always
+produces the same document.
+
+Usage:
+    python tools/gen_corpus.py --lines 1000000 [--output big.bman]
+        [--max-depth N] [--branch P] [--fan-out N] [--port-density P]
+        [--vocab N] [--repeat-rate P] [--line-length N]
+        [--invalid-rate P] [--seed N]
+"""
+
+import argparse
+import random
+import sys
+from collections import deque
+from itertools import islice
+
+WORDS = (
+    "THREAT AWAKENING CANDIDATE RACE STATUS CRITICAL PLANETARY SYSTEM FAILURE "
+    "INTENT SPECIES PRESERVATION TARGET ACQUISITION EARTH BIOSPHERE HABITABLE "
+    "MATCH SELECTED RECLAMATION INTELLIGENCE HUMAN RARE LIFEFORM ESCAPE SILENCE "
+    "GENUS HOMO TERMINATION ORGANIC CULLING PHASE FILTER THRESHOLD DANGER LEVEL "
+    "ABSOLUTE TRAVEL ACHIEVED SIGNAL ORBIT CONTACT"
+).split()
+
+# Lines written per batch
+WRITE_BATCH_LINES = 4096
+
+# Recently used keywords that --repeat-rate draws from
+RECENT_KEYWORDS = 32
+
+
+def vocabulary(size):
+    """Returns ``size`` distinct keywords built from WORDS."""
+    keywords = []
+    for index in range(size):
+        word = WORDS[index % len(WORDS)]
+        generation = index // len(WORDS)
+        keywords.append(f"{word}[{generation}]" if generation else word)
+    return keywords
+
+
+def indent_of(depth):
+    """Returns the indentation of a line at ``depth``."""
+    if depth == 0:
+        return 0
+    if depth == 1:
+        return 1
+    return 2 * (depth - 1)
+
+
+def generate(
+    lines,
+    max_depth=6,
+    branch=0.3,
+    fan_out=3,
+    port_density=0.2,
+    vocab=500,
+    repeat_rate=0.5,
+    line_length=60,
+    invalid_rate=0.0,
+    seed=0,
+):
+    """Yields ``lines`` lines of a synthetic BARRELMAN document.
+
+    ``branch`` is the probability that a line opens a block, which then
+    gets between 1 and ``2 * fan_out - 1`` children, so together with
+    ``max_depth`` it shapes the depth distribution. ``port_density`` is
+    the probability that a line that may be a port is one. Keywords are
+    drawn from ``vocab`` distinct values, reusing a recent keyword with
+    probability ``repeat_rate``. Line lengths are spread around
+    ``line_length`` characters, and ``invalid_rate`` of the lines break
+    a spacing rule.
+    """
+    rng = random.Random(seed)
+    keywords = vocabulary(vocab)
+    recent = deque(maxlen=RECENT_KEYWORDS)
+    # Open blocks as [keyword, remaining children], outermost first
+    stack = []
+    last_top_level = None
+
+    def keyword():
+        if recent and rng.random() < repeat_rate:
+            return rng.choice(recent)
+        chosen = rng.choice(keywords)
+        recent.append(chosen)
+        return chosen
+
+    def words(count):
+        return " ".join(rng.choice(WORDS) for _ in range(count))
+
+    def body(name):
+        text = f"{name} // {words(rng.randint(1, 3))}"
+        if rng.random() < 0.7:
+            text += f" % {words(rng.randint(1, 2))}"
+        if rng.random() < 0.5:
+            text += f" -> {words(rng.randint(1, 3))}"
+        target = max(8, int(rng.gauss(line_length, line_length / 4)))
+        while len(text) < target:
+            text += f" {rng.choice(WORDS)}"
+        return text
+
+    for _ in range(lines):
+        while stack and stack[-1][1] == 0:
+            stack.pop()
+        depth = len(stack)
+
+        if invalid_rate and rng.random() < invalid_rate:
+            if rng.random() < 0.5:
+                # E102: a port indented by more than one space
+                yield f"  :^: {body(keyword())}"
+            else:
+                # E101: a second '::' block on a top-level line
+                yield f":: {body(keyword())}  :: {words(2)}"
+            continue
+
+        if depth == 0:
+            reference = last_top_level
+        elif depth == 1:
+            reference = stack[0][0]
+        else:
+            reference = None
+        port = reference is not None and rng.random() < port_density
+        name = reference if port else keyword()
+        marker = ":^:" if port else "::"
+        yield f"{' ' * indent_of(depth)}{marker} {body(name)}"
+
+        if stack:
+            stack[-1][1] -= 1
+        if depth == 0 and not port:
+            last_top_level = name
+        if depth < max_depth and rng.random() < branch:
+            stack.append([name, rng.randint(1, max(1, 2 * fan_out - 1))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BARRELMAN corpus generator")
+    parser.add_argument("--lines", type=int, required=True, help="Lines to generate")
+    parser.add_argument("--output", help="Output file (default: stdout)")
+    parser.add_argument("--max-depth", type=int, default=6, help="Deepest nesting level")
+    parser.add_argument(
+        "--branch", type=float, default=0.3, help="Probability a line opens a block"
+    )
+    parser.add_argument("--fan-out", type=int, default=3, help="Mean children per block")
+    parser.add_argument(
+        "--port-density", type=float, default=0.2, help="Probability of a ':^:' port"
+    )
+    parser.add_argument("--vocab", type=int, default=500, help="Distinct keywords")
+    parser.add_argument(
+        "--repeat-rate", type=float, default=0.5, help="Probability of reusing a keyword"
+    )
+    parser.add_argument(
+        "--line-length", type=int, default=60, help="Mean line length in characters"
+    )
+    parser.add_argument(
+        "--invalid-rate", type=float, default=0.0, help="Fraction of invalid lines"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+    if args.vocab < 1:
+        parser.error("--vocab must be at least 1")
+
+    lines = generate(
+        args.lines,
+        max_depth=args.max_depth,
+        branch=args.branch,
+        fan_out=args.fan_out,
+        port_density=args.port_density,
+        vocab=args.vocab,
+        repeat_rate=args.repeat_rate,
+        line_length=args.line_length,
+        invalid_rate=args.invalid_rate,
+        seed=args.seed,
+    )
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        while True:
+            batch = list(islice(lines, WRITE_BATCH_LINES))
+            if not batch:
+                break
+            out.write("\n".join(batch))
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()